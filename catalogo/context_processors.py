@@ -1,5 +1,5 @@
 # file: catalogo/context_processors.py
-from products.models import Category, Brand
+from catalogo.facetas import listas_catalogo
 from decimal import Decimal
 from django.conf import settings
 
@@ -7,10 +7,13 @@ def categorias_marcas(request):
     """
     Devuelve todas las categorías y marcas ordenadas alfabéticamente
     para usarlas en el footer y donde se necesiten.
+
+    Son callables (el template los evalúa sólo si los usa) y salen de la
+    caché del catálogo, que se invalida al sincronizar.
     """
     return {
-        "footer_categorias": Category.objects.order_by("name"),
-        "footer_marcas":    Brand.objects.order_by("name"),
+        "footer_categorias": lambda: listas_catalogo()["categorias"],
+        "footer_marcas":    lambda: listas_catalogo()["marcas"],
     }
 
 def cart_summary(request):
@@ -0,0 +1,133 @@
+# file: catalogo/facetas.py
+# -----------------------------------------------------------------------------
+# Facetas (categorías y marcas con conteo) del catálogo público.
+#
+#   • `contar_facetas` devuelve las categorías y marcas presentes en el
+#     resultado filtrado, con su número de productos, en UNA consulta
+#     (UNION ALL de dos GROUP BY). Cada faceta se cuenta sin su propio
+#     filtro para que al marcar una categoría sigan visibles las demás.
+#   • El resultado se guarda en la caché compartida por combinación de
+#     filtros; las claves llevan la "versión" del catálogo, que cambia al
+#     terminar una sincronización o al cambiar el tipo de cambio
+#     (`invalidar_catalogo`). `CATALOGO_FACETAS_CACHE` es sólo un tope.
+#   • `listas_catalogo` es la lista completa (footer), con la misma caché.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import hashlib
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, Value
+
+from products.models import Brand, Category, Product, ProductCategory
+
+FACETAS_CACHE = getattr(settings, "CATALOGO_FACETAS_CACHE", 3600)
+VERSION_KEY = "catalogo:version"
+
+
+@dataclass
+class Faceta:
+    id: int
+    name: str
+    slug: str
+    total: int
+
+
+# --- BLOQUE VERSIÓN DE CACHÉ -------------------------------------------------
+
+
+def version_catalogo() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(VERSION_KEY, version, timeout=None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidar_catalogo() -> None:
+    """Cambia la versión: todas las facetas, totales y listas se recalculan."""
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def clave_catalogo(prefijo: str, consulta) -> str:
+    """Clave de caché para `consulta` (queryset o texto) en la versión vigente."""
+    texto = str(getattr(consulta, "query", consulta))
+    return f"catalogo:{prefijo}:{version_catalogo()}:{hashlib.md5(texto.encode()).hexdigest()}"
+
+
+# --- BLOQUE FILTROS ----------------------------------------------------------
+
+
+def ids_seleccionados(valores) -> list[int]:
+    """IDs enteros de `request.GET.getlist(...)`; ignora los inválidos."""
+    return sorted({int(v) for v in valores if str(v).isdigit()})
+
+
+def aplicar_facetas(qs, categorias=(), marcas=()):
+    """Filtra por categorías y marcas (OR dentro de cada faceta, AND entre ellas)."""
+    if categorias:
+        qs = qs.filter(pk__in=ProductCategory.objects.filter(category_id__in=categorias).values("product_id"))
+    if marcas:
+        qs = qs.filter(brand_id__in=marcas)
+    return qs
+
+
+# --- BLOQUE CONTEO -----------------------------------------------------------
+
+
+def contar_facetas(qs, categorias=(), marcas=()) -> dict:
+    """
+    Categorías y marcas del queryset `qs` (sin los filtros de facetas) con su
+    conteo, considerando la selección actual de la otra faceta.
+
+    Returns
+    -------
+    dict
+        {"categorias": [Faceta, ...], "marcas": [Faceta, ...]}, por nombre.
+    """
+    en_categorias = aplicar_facetas(qs, marcas=marcas).values("pk")
+    en_marcas = aplicar_facetas(qs, categorias=categorias).values("pk")
+
+    por_categoria = (
+        ProductCategory.objects.filter(product__in=en_categorias)
+        .annotate(tipo=Value(0, output_field=IntegerField()))
+        .values_list("tipo", "category_id", "category__name", "category__slug")
+        .annotate(total=Count("product_id"))
+        .order_by()
+    )
+    por_marca = (
+        Product.objects.filter(pk__in=en_marcas, brand__isnull=False)
+        .annotate(tipo=Value(1, output_field=IntegerField()))
+        .values_list("tipo", "brand_id", "brand__name", "brand__slug")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    consulta = por_categoria.union(por_marca, all=True)
+
+    clave = clave_catalogo("facetas", consulta)
+    facetas = cache.get(clave)
+    if facetas is None:
+        facetas = {"categorias": [], "marcas": []}
+        for tipo, pk, nombre, slug, total in consulta:
+            facetas["marcas" if tipo else "categorias"].append(Faceta(pk, nombre, slug, total))
+        for lista in facetas.values():
+            lista.sort(key=lambda f: f.name.lower())
+        cache.set(clave, facetas, timeout=FACETAS_CACHE)
+    return facetas
+
+
+def listas_catalogo() -> dict:
+    """Todas las categorías y marcas por nombre (footer), en caché."""
+    clave = clave_catalogo("listas", "footer")
+    listas = cache.get(clave)
+    if listas is None:
+        listas = {
+            "categorias": list(Category.objects.order_by("name")),
+            "marcas": list(Brand.objects.order_by("name")),
+        }
+        cache.set(clave, listas, timeout=FACETAS_CACHE)
+    return listas
@@ -0,0 +1,211 @@
+# file: catalogo/paginacion.py
+# -----------------------------------------------------------------------------
+# Paginación por cursor ("keyset") del catálogo público.
+#
+# En lugar de `OFFSET n` cada página pide "las siguientes N filas después de
+# la última que vi" sobre un orden estable que termina en `pk`, así que la
+# página 200 cuesta lo mismo que la primera: el orden por defecto usa el
+# índice `(title, id)` de `Product` y el cursor arranca en la fila frontera.
+#
+#   • El cursor es opaco en la URL (`?cursor=`): base64 de la dirección
+#     (siguiente / anterior), el orden y los valores de la fila frontera.
+#   • Un cursor inválido o de otro orden lleva a la primera página.
+#   • El total exacto es opcional: se cuenta una vez por combinación de
+#     filtros y se guarda hasta la siguiente sincronización (ver
+#     `facetas.invalidar_catalogo`) o `CATALOGO_TOTAL_CACHE` segundos
+#     (0 = no contar).
+#
+# Los valores NULL (productos sin precio) van al final en ambos sentidos,
+# igual que `core.precios.ORDENES_PRECIO`.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+
+from .facetas import clave_catalogo
+
+TOTAL_CACHE = getattr(settings, "CATALOGO_TOTAL_CACHE", 300)
+
+# Orden (valor de `?orden=`) → claves (campo, descendente); la última es `pk`
+ORDENES = {
+    "": (("title", False), ("pk", False)),
+    "precio": (("price_mxn", False), ("pk", False)),
+    "-precio": (("price_mxn", True), ("pk", True)),
+}
+_DECIMALES = {"price_mxn"}
+_NULABLES = {"price_mxn"}
+
+
+# --- BLOQUE CURSOR -----------------------------------------------------------
+
+
+def codificar_cursor(direccion: str, orden: str, valores) -> str:
+    datos = [direccion, orden, [str(v) if isinstance(v, Decimal) else v for v in valores]]
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, orden: str):
+    """(direccion, valores) del cursor, o None si es inválido o de otro orden."""
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direccion, orden_cursor, valores = json.loads(crudo)
+        claves = ORDENES[orden_cursor]
+        if orden_cursor != orden or direccion not in ("s", "a") or len(valores) != len(claves):
+            return None
+        valores = [
+            Decimal(v) if campo in _DECIMALES and v is not None else v
+            for (campo, _), v in zip(claves, valores)
+        ]
+    except (ValueError, TypeError, KeyError, InvalidOperation, binascii.Error):
+        return None
+    return direccion, valores
+
+
+# --- BLOQUE CONSULTA ---------------------------------------------------------
+
+
+def _despues_de(claves, valores) -> Q:
+    """
+    Filas que van después de `valores` en el orden de `claves` (NULL al final):
+    OR sobre cada clave de "iguales en las anteriores y mayor en ésta".
+    """
+    condicion = Q(pk__in=[])
+    iguales = Q()
+    for (campo, desc), valor in zip(claves, valores):
+        if valor is None:
+            mayor = Q(pk__in=[])
+            igual = Q(**{f"{campo}__isnull": True})
+        else:
+            mayor = Q(**{f"{campo}__{'lt' if desc else 'gt'}": valor})
+            if campo in _NULABLES:
+                mayor |= Q(**{f"{campo}__isnull": True})
+            igual = Q(**{campo: valor})
+        condicion |= iguales & mayor
+        iguales &= igual
+    return condicion & _cota(claves[0], valores[0], "gte", "lte")
+
+
+def _antes_de(claves, valores) -> Q:
+    """Filas que van antes de `valores` en el orden de `claves` (NULL al final)."""
+    condicion = Q(pk__in=[])
+    iguales = Q()
+    for (campo, desc), valor in zip(claves, valores):
+        if valor is None:
+            menor = Q(**{f"{campo}__isnull": False})
+            igual = Q(**{f"{campo}__isnull": True})
+        else:
+            menor = Q(**{f"{campo}__{'gt' if desc else 'lt'}": valor})
+            igual = Q(**{campo: valor})
+        condicion |= iguales & menor
+        iguales &= igual
+    return condicion & _cota(claves[0], valores[0], "lte", "gte")
+
+
+def _cota(clave, valor, asc: str, desc: str) -> Q:
+    """
+    Cota redundante sobre la primera clave (p. ej. `title >= valor`) para que
+    la BD busque en el índice a partir de la frontera en vez de recorrerlo
+    desde el principio (el OR de `_despues_de` no es un rango). Con NULL al
+    final la cota no es un rango, así que en columnas nulables se omite.
+    """
+    campo, es_desc = clave
+    if campo in _NULABLES:
+        return Q()
+    return Q(**{f"{campo}__{desc if es_desc else asc}": valor})
+
+
+def _ordenar(qs, claves, invertido=False):
+    expresiones = []
+    for campo, desc in claves:
+        if invertido:
+            desc = not desc
+        # NULL al final en el sentido normal, al principio al ir hacia atrás
+        nulos = {}
+        if campo in _NULABLES:
+            nulos = {"nulls_first": True} if invertido else {"nulls_last": True}
+        expresiones.append(F(campo).desc(**nulos) if desc else F(campo).asc(**nulos))
+    return qs.order_by(*expresiones)
+
+
+def _total(qs):
+    if not TOTAL_CACHE:
+        return None
+    clave = clave_catalogo("total", qs.order_by())
+    total = cache.get(clave)
+    if total is None:
+        total = qs.order_by().count()
+        cache.set(clave, total, timeout=TOTAL_CACHE)
+    return total
+
+
+@dataclass
+class PaginaCursor:
+    object_list: list
+    orden: str = ""
+    siguiente: str | None = None
+    anterior: str | None = None
+    total: int | None = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self) -> bool:
+        return self.siguiente is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.anterior is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+
+def paginar_por_cursor(qs, cursor: str | None, por_pagina: int, orden: str = "") -> PaginaCursor:
+    """
+    Página de `qs` a partir de `cursor` (None = primera) en el orden `orden`
+    (ver `ORDENES`; uno desconocido usa el de título). Pide `por_pagina + 1`
+    filas para saber si hay más, sin COUNT ni OFFSET.
+    """
+    orden = orden if orden in ORDENES else ""
+    claves = ORDENES[orden]
+    total = _total(qs)
+
+    decodificado = decodificar_cursor(cursor, orden) if cursor else None
+    direccion, valores = decodificado or ("s", None)
+
+    if valores is None:
+        filas = list(_ordenar(qs, claves)[: por_pagina + 1])
+        hay_mas, hay_menos = len(filas) > por_pagina, False
+        filas = filas[:por_pagina]
+    elif direccion == "s":
+        filas = list(_ordenar(qs.filter(_despues_de(claves, valores)), claves)[: por_pagina + 1])
+        hay_mas, hay_menos = len(filas) > por_pagina, True
+        filas = filas[:por_pagina]
+    else:
+        filas = list(_ordenar(qs.filter(_antes_de(claves, valores)), claves, invertido=True)[: por_pagina + 1])
+        hay_mas, hay_menos = True, len(filas) > por_pagina
+        filas = filas[:por_pagina][::-1]
+
+    def frontera(obj):
+        return [getattr(obj, campo) for campo, _ in claves]
+
+    return PaginaCursor(
+        object_list=filas,
+        orden=orden,
+        siguiente=codificar_cursor("s", orden, frontera(filas[-1])) if filas and hay_mas else None,
+        anterior=codificar_cursor("a", orden, frontera(filas[0])) if filas and hay_menos else None,
+        total=total,
+    )
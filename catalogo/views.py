@@ -1,12 +1,14 @@
 # catalogo/views.js
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
 from django.db.models import Q, Sum, OuterRef, Subquery, DecimalField, Prefetch,  IntegerField
 from products.models import Product, Price, BranchStock, Branch, Category, Brand  # Asegúrate de importar los modelos necesarios
 from django.http import JsonResponse
 from .agent import run_agent
 from django.http import StreamingHttpResponse
 from core.utils import calculate_mxn_price, calculate_mxn_subtotal
+from core.precios import filtrar_por_precio
+from .facetas import aplicar_facetas, contar_facetas, ids_seleccionados
+from .paginacion import paginar_por_cursor
 from decimal import Decimal
 from django.conf import settings
 from django.views.decorators.http import require_POST
@@ -20,23 +22,44 @@ from products.models import Branch, BranchStock
 SLP_SLUG = "san_luis_potosi"
 
 
-def catalogo_publico(request, categoria=None, marca=None):
-    # Restaurar lógica de stock
-    try:
-        slp_branch = Branch.objects.get(slug=SLP_SLUG)
-        slp_stock_qs = BranchStock.objects.filter(branch=slp_branch)
-    except Branch.DoesNotExist:
-        slp_branch = None
-        slp_stock_qs = BranchStock.objects.none()
+# Columnas que el listado no muestra y que pesan (HTML y JSON de Syscom)
+CAMPOS_DIFERIDOS = ('description', 'sync_hash', 'sync_hashes')
 
-    productos_list = Product.objects.filter(visible=True)
-    
-    # Anotación de stock (versión que funcionaba)
-    productos_list = productos_list.annotate(
-        slp_stock_sum=Sum('branch_stocks__quantity', 
-                          filter=Q(branch_stocks__branch__slug=SLP_SLUG))
+
+def productos_catalogo():
+    """
+    Queryset base del listado público: producto, marca, precio y existencia
+    SLP en una sola consulta (JOIN de `brand` y `prices`, existencia como
+    subconsulta), sin las columnas pesadas de `CAMPOS_DIFERIDOS`.
+    """
+    slp_stock = BranchStock.objects.filter(
+        product=OuterRef('pk'), branch__slug=SLP_SLUG
+    ).values('quantity')[:1]
+    return (
+        Product.objects.filter(visible=True)
+        .select_related('prices', 'brand')
+        .defer(*CAMPOS_DIFERIDOS)
+        .annotate(slp_stock_sum=Subquery(slp_stock, output_field=IntegerField()))
     )
-    
+
+
+def precio_listado(producto, user=None):
+    """
+    Precio MXN para el listado sin consultas extra: el materializado
+    (`price_mxn`) o, si el cliente tiene descuento, el cálculo sobre el
+    `Price` ya cargado con el tipo de cambio en caché.
+    """
+    precio = getattr(producto, 'prices', None)
+    if not precio or not precio.discount:
+        return None
+    if user and user.is_authenticated and user.descuento_cliente:
+        return calculate_mxn_price(precio, user)
+    return producto.price_mxn if producto.price_mxn is not None else calculate_mxn_price(precio)
+
+
+def catalogo_publico(request, categoria=None, marca=None):
+    productos_list = productos_catalogo()
+
     # Filtros por categoría y marca
     if categoria:
         productos_list = productos_list.filter(categories__slug=categoria)
@@ -44,29 +67,29 @@ def catalogo_publico(request, categoria=None, marca=None):
     if marca:
         productos_list = productos_list.filter(brand__slug=marca)
     
-    # Obtener todas las categorías y marcas para el panel de filtros
-    categorias = Category.objects.all()
-    marcas = Brand.objects.all()
+    # Rango de precio y orden por precio (columna materializada, en SQL)
+    productos_list, filtros_precio = filtrar_por_precio(productos_list, request.GET)
     
-    # Paginación (12 productos por página)
-    paginator = Paginator(productos_list, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Facetas del panel de filtros (?categoria=<id>&marca=<id>), con conteo
+    categorias_sel = ids_seleccionados(request.GET.getlist('categoria'))
+    marcas_sel = ids_seleccionados(request.GET.getlist('marca'))
+    facetas = contar_facetas(productos_list, categorias_sel, marcas_sel)
+    productos_list = aplicar_facetas(productos_list, categorias_sel, marcas_sel)
     
-    # Precio para cada producto
+    # Paginación por cursor (12 productos por página, sin OFFSET ni COUNT por página)
+    page_obj = paginar_por_cursor(productos_list, request.GET.get('cursor'), 12, filtros_precio['orden'])
+    
+    # Precio para cada producto (sin consultas por producto)
     for p in page_obj:
-        # Versión funcional anterior (sin cambios)
-        if hasattr(p, 'prices') and p.prices.discount:
-            p.mxn_price = calculate_mxn_price(p.prices, request.user)
-        else:
-            p.mxn_price = None
+        p.mxn_price = precio_listado(p, request.user)
 
     return render(request, 'catalogo/cat_completo.html', {
         'productos': page_obj,
-        'categorias': categorias,
-        'marcas': marcas,
-        'categorias_seleccionadas': categoria,
-        'marcas_seleccionadas': marca,
+        'categorias': facetas['categorias'],
+        'marcas': facetas['marcas'],
+        'categorias_seleccionadas': categorias_sel,
+        'marcas_seleccionadas': marcas_sel,
+        **filtros_precio,
     })
 def detalle_producto(request, slug):
     # Recupera el producto con sus relaciones y el stock SLP
@@ -0,0 +1,19 @@
+# file: core/celery.py
+"""
+Aplicación Celery del proyecto.
+
+La configuración se lee de `settings` con el prefijo `CELERY_`; las tareas se
+descubren en `<app>/tasks.py`. Arranque del worker::
+
+    celery -A core worker -l info
+    celery -A core beat -l info      # tareas periódicas (CELERY_BEAT_SCHEDULE)
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,174 @@
+# file: core/precios.py
+# -----------------------------------------------------------------------------
+# Precio base en MXN materializado en `Product.price_mxn`.
+#
+# Es `calculate_mxn_price(price, user=None)`: con margen, descuento de
+# producto e IVA, sin el descuento por cliente (que es un factor por usuario y
+# no cambia el orden). Se guarda indexado para que el catálogo pueda ordenar y
+# filtrar por precio en la BD.
+#
+# Se recalcula:
+#   • al guardar un `Price` (señal) o al escribirlos por lotes (sync_writer);
+#   • para todo el catálogo cuando cambia el tipo de cambio
+#     (`tipo_cambio_cambiado` → tarea `recalcular_precios_catalogo`).
+#
+# El recálculo masivo es vectorizado (NumPy, centavos enteros) y da el mismo
+# resultado que el cálculo escalar con `Decimal`.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import logging
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db.models import F
+
+from core.tipo_cambio import tipo_cambio_actual
+from core.utils import calculate_mxn_price
+from products.models import ExchangeRate, Price, Product
+
+try:
+    import numpy as np
+except ImportError:
+    # Sin NumPy el recálculo usa el camino escalar (Decimal)
+    np = None
+
+logger = logging.getLogger(__name__)
+
+LOTE = 1000
+# Distancia relativa a un medio centavo bajo la cual se recalcula en Decimal
+TOLERANCIA = 1e-9
+
+# Valores de `?orden=` que ordenan por precio en SQL
+ORDENES_PRECIO = {
+    "precio": (F("price_mxn").asc(nulls_last=True), "pk"),
+    "-precio": (F("price_mxn").desc(nulls_last=True), "-pk"),
+}
+
+
+# --- BLOQUE RECÁLCULO --------------------------------------------------------
+
+
+def precio_base_mxn(price_obj):
+    """Precio base MXN de un `Price`; None si no tiene precio con descuento."""
+    if not price_obj or not price_obj.discount:
+        return None
+    return calculate_mxn_price(price_obj)
+
+
+def precios_mxn_lote(descuentos, margenes, descuentos_prod, tipo) -> list:
+    """
+    `precio_base_mxn` de un lote, vectorizado con NumPy en centavos enteros.
+
+    `descuentos` son `Decimal` (USD con 2 decimales), `margenes` y
+    `descuentos_prod` floats y `tipo` el tipo de cambio (`Decimal` de
+    `tipo_cambio_actual`). El resultado es idéntico al escalar: se calcula en
+    float64 y las filas que quedan a menos de `TOLERANCIA` de un medio
+    centavo (donde el error de float64 podría cambiar el redondeo) se
+    recalculan con `Decimal`. Sin NumPy todo el lote va por el camino escalar.
+    """
+    if np is None or not descuentos:
+        return [_precio_escalar(d, m, dp) for d, m, dp in zip(descuentos, margenes, descuentos_prod)]
+
+    con_precio = np.array([bool(d) for d in descuentos])
+    centavos_usd = np.array([int(d * 100) if d else 0 for d in descuentos], dtype=np.int64)
+    valor = (
+        centavos_usd
+        * float(tipo)
+        * (1 + np.asarray(margenes, dtype=np.float64))
+        * (1 - np.asarray(descuentos_prod, dtype=np.float64))
+        * (1 + settings.IVA)
+    )
+    # np.rint redondea al par, igual que Decimal.quantize (ROUND_HALF_EVEN)
+    centavos = np.rint(valor).astype(np.int64)
+    dudosos = np.abs(valor - np.floor(valor) - 0.5) <= TOLERANCIA * np.maximum(1.0, np.abs(valor))
+
+    resultado = []
+    for i, cents in enumerate(centavos.tolist()):
+        if not con_precio[i]:
+            resultado.append(None)
+        elif dudosos[i]:
+            resultado.append(_precio_escalar(descuentos[i], margenes[i], descuentos_prod[i]))
+        else:
+            resultado.append(Decimal(cents).scaleb(-2))
+    return resultado
+
+
+def _precio_escalar(descuento, margen, descuento_prod):
+    return precio_base_mxn(SimpleNamespace(discount=descuento, margen_prod=margen, descuento_prod=descuento_prod))
+
+
+def recalcular_precios_mxn(product_ids=None) -> int:
+    """
+    Recalcula `Product.price_mxn` de `product_ids` (o de todo el catálogo)
+    leyendo `Price` en bloques de `LOTE` filas (ver `precios_mxn_lote`) y
+    escribe con `bulk_update` sólo las filas cuyo valor cambió. Devuelve
+    cuántas se escribieron.
+    """
+    try:
+        tipo = tipo_cambio_actual()
+    except ExchangeRate.DoesNotExist:
+        return 0
+
+    precios = Price.objects.all()
+    if product_ids is not None:
+        precios = precios.filter(product_id__in=list(product_ids))
+    filas = precios.values_list(
+        "product_id", "discount", "margen_prod", "descuento_prod", "product__price_mxn"
+    ).iterator(chunk_size=LOTE)
+
+    escritos = 0
+    while bloque := list(islice(filas, LOTE)):
+        ids, descuentos, margenes, descuentos_prod, actuales = zip(*bloque)
+        nuevos = precios_mxn_lote(list(descuentos), margenes, descuentos_prod, tipo)
+        cambios = [
+            Product(pk=pk, price_mxn=nuevo)
+            for pk, nuevo, actual in zip(ids, nuevos, actuales)
+            if nuevo != actual
+        ]
+        if cambios:
+            Product.objects.bulk_update(cambios, ["price_mxn"])
+            escritos += len(cambios)
+
+    if product_ids is None:
+        logger.info(f"💲 Precio MXN recalculado en {escritos} productos")
+    return escritos
+
+
+# --- BLOQUE CONSULTAS --------------------------------------------------------
+
+
+def _decimal_o_none(valor):
+    try:
+        numero = Decimal(valor) if valor not in (None, "") else None
+    except (InvalidOperation, ValueError):
+        return None
+    return numero if numero is None or numero.is_finite() else None
+
+
+def filtrar_por_precio(qs, params):
+    """
+    Aplica `precio_min`, `precio_max` y `orden` (ver `ORDENES_PRECIO`) de
+    `params` (p. ej. `request.GET`) sobre un queryset de `Product`.
+
+    Returns
+    -------
+    tuple
+        (queryset, {"precio_min": ..., "precio_max": ..., "orden": ...}) con
+        los valores válidos, para repintar el formulario.
+    """
+    precio_min = _decimal_o_none(params.get("precio_min"))
+    precio_max = _decimal_o_none(params.get("precio_max"))
+    orden = params.get("orden", "")
+
+    if precio_min is not None:
+        qs = qs.filter(price_mxn__gte=precio_min)
+    if precio_max is not None:
+        qs = qs.filter(price_mxn__lte=precio_max)
+    if orden in ORDENES_PRECIO:
+        qs = qs.order_by(*ORDENES_PRECIO[orden])
+    else:
+        orden = ""
+    return qs, {"precio_min": precio_min, "precio_max": precio_max, "orden": orden}
@@ -213,6 +213,72 @@ APPEND_SLASH = True
 
 IVA = env.float('IVA', 16.0) / 100
 
+# API de Syscom (se puede apuntar a un servidor local para pruebas)
+SYSCOM_BASE_URL = env('SYSCOM_BASE_URL', default='https://developers.syscom.mx')
+SYSCOM_SYNC_WORKERS = env.int('SYSCOM_SYNC_WORKERS', default=4)   # hilos de descarga en sync
+SYSCOM_RATE_LIMIT = env.float('SYSCOM_RATE_LIMIT', default=5.0)   # peticiones por segundo
+SYSCOM_RATE_BURST = env.int('SYSCOM_RATE_BURST', default=5)
+SYSCOM_RATE_MIN = env.float('SYSCOM_RATE_MIN', default=0.5)       # piso del limitador adaptativo
+SYSCOM_LATENCIA_OBJETIVO = env.float('SYSCOM_LATENCIA_OBJETIVO', default=2.0)  # seg; arriba se reduce el ritmo
+SYSCOM_SYNC_BATCH_SIZE = env.int('SYSCOM_SYNC_BATCH_SIZE', default=50)  # productos por transacción
+SYSCOM_ARCHIVE_PAYLOADS = env.bool('SYSCOM_ARCHIVE_PAYLOADS', default=True)  # guardar respuestas crudas por corrida
+SYSCOM_ARCHIVE_DIR = env('SYSCOM_ARCHIVE_DIR', default=str(BASE_DIR / 'var' / 'syscom_archive'))
+SYSCOM_ARCHIVE_FORMAT = env('SYSCOM_ARCHIVE_FORMAT', default='gz')   # gz | zst (requiere zstandard)
+SYSCOM_ARCHIVE_RETENTION_DAYS = env.int('SYSCOM_ARCHIVE_RETENTION_DAYS', default=14)  # días que se guardan los segmentos (0 = siempre)
+SYSCOM_TOKEN_REFRESH_MARGIN = env.int('SYSCOM_TOKEN_REFRESH_MARGIN', default=300)  # renovar token N s antes de expirar
+SYSCOM_STOCK_REFRESH_MINUTES = env.int('SYSCOM_STOCK_REFRESH_MINUTES', default=15)  # periodo del refresco de existencias
+SYSCOM_STOCK_REFRESH_LIMIT = env.int('SYSCOM_STOCK_REFRESH_LIMIT', default=0)   # productos por corrida (0 = todos)
+SYSCOM_STOCK_LOW_THRESHOLD = env.int('SYSCOM_STOCK_LOW_THRESHOLD', default=5)   # existencia "baja" → prioridad
+SYSCOM_STOCK_RECENT_HOURS = env.int('SYSCOM_STOCK_RECENT_HOURS', default=24)    # cambio "reciente" → prioridad
+SYSCOM_STOCK_REFRESH_KEEP_DAYS = env.int('SYSCOM_STOCK_REFRESH_KEEP_DAYS', default=2)  # días que se guardan los SyncJob de refresco
+SYSCOM_STOCK_REFRESH_STALE_MINUTES = env.int('SYSCOM_STOCK_REFRESH_STALE_MINUTES', default=30)  # refresco sin actividad → FAILED
+SYNC_STREAM_MAX_SECONDS = env.int('SYNC_STREAM_MAX_SECONDS', default=60)  # tope de cada stream SSE de progreso (ocupa un hilo)
+
+# --------------------------------------------------
+#  Caché compartida
+# --------------------------------------------------
+# Con varios workers (gunicorn, celery) debe apuntar a un backend compartido,
+# p. ej. CACHE_URL=redis://localhost:6379/1. Por defecto: memoria local.
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+TIPO_CAMBIO_REVALIDAR = env.int('TIPO_CAMBIO_REVALIDAR', default=30)  # seg. que cada proceso confía en su copia
+TIPO_CAMBIO_HORA = env.int('TIPO_CAMBIO_HORA', default=9)   # hora local de la actualización automática
+CATALOGO_TOTAL_CACHE = env.int('CATALOGO_TOTAL_CACHE', default=300)  # seg. que se guarda el total del catálogo (0 = no contar)
+CATALOGO_FACETAS_CACHE = env.int('CATALOGO_FACETAS_CACHE', default=3600)  # tope en seg. de facetas en caché (se invalidan al sincronizar)
+
+# --------------------------------------------------
+#  Cola de tareas (Celery + Redis)
+# --------------------------------------------------
+CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=False)  # True en pruebas
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_IGNORE_RESULT = True      # el estado vive en dashboard.SyncJob
+CELERY_TASK_ACKS_LATE = True          # si el worker muere, la tarea se reentrega
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = TIME_ZONE
+# Tareas periódicas: `celery -A core beat -l info`
+from celery.schedules import crontab
+
+CELERY_BEAT_SCHEDULE = {
+    'refresco-existencias': {
+        'task': 'dashboard.tasks.programar_refresco_existencias',
+        'schedule': SYSCOM_STOCK_REFRESH_MINUTES * 60,
+    },
+    'tipo-cambio-diario': {
+        'task': 'dashboard.tasks.actualizar_tipo_cambio_programado',
+        'schedule': crontab(hour=TIPO_CAMBIO_HORA, minute=0),
+    },
+    'historial-diario': {
+        'task': 'dashboard.tasks.consolidar_historial_programado',
+        'schedule': crontab(minute=5),
+    },
+    'limpieza-diaria': {
+        'task': 'dashboard.tasks.limpieza_programada',
+        'schedule': crontab(hour=3, minute=30),
+    },
+}
+
 CKEDITOR_5_CONFIGS = {
     'default': {
         'toolbar': ['bold', 'italic', 'underline', 'link', 'bulletedList', 'numberedList', 'removeFormat', 'sourceEditing'],
@@ -10,11 +10,13 @@ register = template.Library()
 def param_remove(context, key, value):  # Recibimos context automáticamente
     """
     Elimina un valor específico de un parámetro GET en la URL.
+    También quita `cursor`: al cambiar los filtros se vuelve a la primera página.
     Ejemplo de uso en template: 
     {% param_remove 'categoria' 123 %}
     """
     # Obtenemos los parámetros GET actuales
     params = context['request'].GET.copy()
+    params.pop('cursor', None)
     
     # Obtenemos todos los valores del parámetro como lista
     values = params.getlist(key)
@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from core.celery import app as celery_app
+from core.tipo_cambio import invalidar_tipo_cambio
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    # Tipo de cambio, facetas y totales no deben pasar de una prueba a otra
+    cache.clear()
+    invalidar_tipo_cambio()
+    yield
+    cache.clear()
+    invalidar_tipo_cambio()
+
+
+@pytest.fixture(autouse=True)
+def archivo_tmp(tmp_path):
+    # Los segmentos de respuestas crudas no deben quedar en el repo
+    with patch('dashboard.sync_archivo.ARCHIVO_DIR', tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def eager_celery():
+    # Ejecuta las tareas en el mismo proceso, sin broker
+    # (con namespace='CELERY' la clave lleva el prefijo)
+    celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+    yield
+    celery_app.conf.CELERY_TASK_ALWAYS_EAGER = False
+
+
+@pytest.fixture
+def payload():
+    """Constructor de respuestas de `/productos/<id>` con existencia en SLP."""
+    def _payload(pid, precio='9.00', existencia=3):
+        return {
+            'producto_id': pid,
+            'modelo': f'M-{pid}',
+            'titulo': f'Producto {pid}',
+            'marca': 'Hikvision',
+            'precios': {'precio_1': '10.00', 'precio_descuento': precio, 'precio_lista': '12.00'},
+            'existencia': {'detalle': {'nuevo': {'san_luis_potosi': existencia}}},
+        }
+    return _payload
@@ -0,0 +1,26 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from products.models import Product, SyscomCredential
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_syncs_synthetic_products_against_fake_syscom(tmp_path):
+    SyscomCredential.objects.create(client_id='real', client_secret='real', token='token-real')
+    out = StringIO()
+    with patch('dashboard.sync_archivo.ARCHIVO_DIR', tmp_path):
+        call_command('benchmark_sync', '--productos', '30', '--latencia', '0',
+                     '--noinput', '--json', stdout=out)
+
+    resultado = json.loads(out.getvalue())
+    assert (resultado['exitosos'], resultado['errores']) == (30, 0)
+    assert resultado['productos_por_segundo'] > 0
+    assert set(resultado['etapas']) == {'fetch', 'parse', 'write'}
+    assert resultado['http']['GET /api/v1/productos/<id>']['llamadas'] == 30
+    assert Product.objects.count() == 30
+    # El token real se restaura al terminar
+    assert SyscomCredential.objects.get().token == 'token-real'
@@ -0,0 +1,152 @@
+import pytest
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+
+from catalogo.facetas import contar_facetas, invalidar_catalogo, listas_catalogo
+from catalogo.paginacion import paginar_por_cursor
+from catalogo.views import productos_catalogo
+from core.precios import filtrar_por_precio
+from core.templatetags.custom_filters import param_remove
+from products.models import Branch, BranchStock, Brand, Category, ExchangeRate, Price, Product, ProductCategory
+
+
+@pytest.fixture(autouse=True)
+def catalogo_base(django_user_model, settings):
+    # Con al menos un usuario el middleware no redirige a /setup/
+    django_user_model.objects.create_user(email='cliente@example.com', password='x')
+    settings.IVA = 0.0
+    ExchangeRate.objects.create(rate=10.0)
+
+
+def _crear_productos(n, inicio=0):
+    marca, _ = Brand.objects.get_or_create(name='Hikvision')
+    slp, _ = Branch.objects.get_or_create(slug='san_luis_potosi', defaults={'name': 'San Luis Potosí'})
+    for i in range(inicio, inicio + n):
+        producto = Product.objects.create(syscom_id=str(i), model=f'M-{i}', title=f'P {i:03d}',
+                                          brand=marca, description='<p>larga</p>' * 100)
+        Price.objects.create(product=producto, normal=Decimal('2.00'), list_price=Decimal('2.00'),
+                             discount=Decimal('2.00'), margen_prod=0.0, descuento_prod=0.0)
+        BranchStock.objects.create(product=producto, branch=slp, quantity=i + 1)
+
+
+def _consultas_listado(client):
+    cache.clear()   # que ambas corridas cuenten el total
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/catalogo/')
+    assert response.status_code == 200
+    return response, ctx.captured_queries
+
+
+@pytest.mark.django_db
+def test_catalog_listing_uses_constant_queries_for_any_page_size(client):
+    _crear_productos(2)
+    response, pocas = _consultas_listado(client)
+    assert len(response.context['productos']) == 2
+
+    _crear_productos(10, inicio=2)
+    response, muchas = _consultas_listado(client)
+    productos = list(response.context['productos'])
+    assert len(productos) == 12
+
+    assert len(muchas) == len(pocas)
+    assert productos[0].mxn_price == Decimal('20.00')
+    assert productos[0].slp_stock_sum == 1
+    assert not any('"description"' in q['sql'] for q in muchas if 'products_product' in q['sql'])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('orden', ['', 'precio', '-precio'])
+def test_cursor_pagination_walks_every_product_once_in_both_directions(orden):
+    _crear_productos(11)
+    # Empates de precio y productos sin precio (van al final)
+    Product.objects.filter(syscom_id__in=['1', '2', '3']).update(price_mxn=Decimal('50.00'))
+    Product.objects.filter(syscom_id__in=['4', '5']).update(price_mxn=None)
+    qs, _ = filtrar_por_precio(productos_catalogo().order_by('title', 'pk'), {'orden': orden})
+    esperado = [p.pk for p in qs]
+    assert len(esperado) == 11
+
+    paginas, pagina = [], paginar_por_cursor(productos_catalogo(), None, 3, orden)
+    while True:
+        paginas.append([p.pk for p in pagina])
+        if not pagina.has_next:
+            break
+        pagina = paginar_por_cursor(productos_catalogo(), pagina.siguiente, 3, orden)
+    assert sum(paginas, []) == esperado
+    assert pagina.total == 11
+
+    atras = []
+    while pagina.has_previous:
+        pagina = paginar_por_cursor(productos_catalogo(), pagina.anterior, 3, orden)
+        atras.append([p.pk for p in pagina])
+    assert atras == paginas[-2::-1]
+
+    # Cursor de otro orden o corrupto → primera página
+    assert [p.pk for p in paginar_por_cursor(productos_catalogo(), 'basura', 3, orden)] == paginas[0]
+
+
+@pytest.mark.django_db
+def test_facets_count_filtered_result_in_one_cached_query(django_assert_num_queries):
+    _crear_productos(4)
+    epcom = Brand.objects.create(name='Epcom')
+    redes, video = Category.objects.create(name='Redes'), Category.objects.create(name='Video')
+    productos = list(Product.objects.order_by('syscom_id'))
+    Product.objects.filter(pk=productos[3].pk).update(brand=epcom)
+    for producto, categoria in zip(productos, (redes, redes, video, video)):
+        ProductCategory.objects.create(product=producto, category=categoria)
+
+    def resumen(facetas):
+        return {clave: {f.name: f.total for f in lista} for clave, lista in facetas.items()}
+
+    with django_assert_num_queries(1):
+        facetas = contar_facetas(productos_catalogo(), marcas=[epcom.pk])
+    # La faceta de marca ignora su propio filtro; la de categoría lo respeta
+    assert resumen(facetas) == {'categorias': {'Video': 1}, 'marcas': {'Epcom': 1, 'Hikvision': 3}}
+
+    with django_assert_num_queries(0):
+        contar_facetas(productos_catalogo(), marcas=[epcom.pk])
+
+    Product.objects.filter(pk=productos[0].pk).update(brand=epcom)
+    invalidar_catalogo()   # lo hace la sincronización al terminar
+    assert resumen(contar_facetas(productos_catalogo(), marcas=[epcom.pk]))['categorias'] == {'Redes': 1, 'Video': 1}
+
+
+@pytest.mark.django_db
+def test_admin_edits_invalidate_catalog_cache():
+    _crear_productos(2)
+    redes = Category.objects.create(name='Redes')
+    assert [c.name for c in listas_catalogo()['categorias']] == ['Redes']
+    assert contar_facetas(productos_catalogo())['categorias'] == []
+
+    # Sin invalidar a mano: las señales de los modelos cambian la versión
+    video = Category.objects.create(name='Video')
+    ProductCategory.objects.create(product=Product.objects.first(), category=redes)
+    assert [c.name for c in listas_catalogo()['categorias']] == ['Redes', 'Video']
+    assert [(f.name, f.total) for f in contar_facetas(productos_catalogo())['categorias']] == [('Redes', 1)]
+
+    video.delete()
+    assert [c.name for c in listas_catalogo()['categorias']] == ['Redes']
+
+
+def test_removing_a_facet_chip_drops_the_cursor(rf):
+    request = rf.get('/catalogo/', {'marca': ['1', '2'], 'cursor': 'abc', 'q': 'cámara'})
+    assert QueryDict(param_remove({'request': request}, 'marca', 1)) == QueryDict('marca=2&q=cámara')
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='plan de consulta de SQLite')
+def test_cursor_page_seeks_title_index_without_sorting():
+    _crear_productos(30)
+    pagina = paginar_por_cursor(productos_catalogo(), None, 3)
+    with CaptureQueriesContext(connection) as ctx:
+        paginar_por_cursor(productos_catalogo(), pagina.siguiente, 3)
+    sql = ctx.captured_queries[-1]['sql']
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = ' '.join(str(fila[-1]) for fila in cursor.fetchall())
+    assert 'USING INDEX products_pr_title' in plan and '(title>?)' in plan
+    assert 'TEMP B-TREE' not in plan
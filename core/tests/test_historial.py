@@ -0,0 +1,67 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.utils import timezone
+
+from dashboard.buscar_sincronizar import sincronizar_productos_background
+from dashboard.historial import bajadas_de_precio, consolidar_historial, serie_producto
+from products.models import Branch, PriceDaily, PriceHistory, Product, StockDaily, StockHistory
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_sync_appends_history_only_on_change_and_rollups_feed_queries(mock_fetch, payload):
+    for precio, existencia in (('9.00', 3), ('9.00', 3), ('8.00', 3), ('7.50', 1)):
+        mock_fetch.return_value = payload('1', precio, existencia)
+        sincronizar_productos_background(['1'])
+
+    assert list(PriceHistory.objects.order_by('pk').values_list('discount', flat=True)) == [
+        Decimal('9.00'), Decimal('8.00'), Decimal('7.50'),
+    ]
+    assert list(StockHistory.objects.order_by('pk').values_list('quantity', flat=True)) == [3, 1]
+
+    assert consolidar_historial() == (1, 1)
+    dia = PriceDaily.objects.get()
+    assert (dia.discount_min, dia.discount_max, dia.discount_close, dia.changes) == (
+        Decimal('7.50'), Decimal('9.00'), Decimal('7.50'), 3,
+    )
+    assert StockDaily.objects.get().quantity_close == 1
+
+    # Cierre de hace 10 días más caro: aparece como bajada en la ventana de 7
+    producto = Product.objects.get()
+    PriceDaily.objects.create(product=producto, day=timezone.localdate() - timedelta(days=10),
+                              discount_close=Decimal('10.00'), changes=1)
+    baja, = bajadas_de_precio(7)
+    assert (baja.precio_anterior, baja.precio_actual, baja.baja) == (Decimal('10.00'), Decimal('7.50'), Decimal('25.00'))
+
+    serie = serie_producto(producto.pk, dias=10)['series']
+    assert serie[0]['price'] == '10.00' and serie[-1] == {
+        'day': timezone.localdate().isoformat(), 'price': '7.50', 'stock': 1,
+    }
+
+
+@pytest.mark.django_db
+def test_product_series_reads_only_the_window_and_the_previous_close(django_assert_num_queries):
+    hoy = timezone.localdate()
+    producto = Product.objects.create(syscom_id='1', model='M-1', title='P 1')
+    slp = Branch.objects.create(slug='san_luis_potosi', name='San Luis Potosí')
+    gdl = Branch.objects.create(slug='guadalajara', name='Guadalajara')
+
+    def hace(dias):
+        return hoy - timedelta(days=dias)
+
+    # Historia vieja que no debe recorrerse: sólo cuenta el último cierre de cada serie
+    for dias in (400, 300, 20):
+        PriceDaily.objects.create(product=producto, day=hace(dias), discount_close=Decimal(dias))
+        StockDaily.objects.create(product=producto, branch=slp, day=hace(dias), quantity_close=dias)
+    StockDaily.objects.create(product=producto, branch=gdl, day=hace(100), quantity_close=5)
+    StockDaily.objects.create(product=producto, branch=slp, day=hace(2), quantity_close=1)
+
+    with django_assert_num_queries(4):
+        serie = serie_producto(producto.pk, dias=7)['series']
+
+    assert len(serie) == 8
+    assert serie[0] == {'day': hace(7).isoformat(), 'price': '20.00', 'stock': 25}
+    assert serie[-1] == {'day': hoy.isoformat(), 'price': '20.00', 'stock': 6}
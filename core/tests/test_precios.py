@@ -0,0 +1,54 @@
+import random
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.precios import _precio_escalar, filtrar_por_precio, precios_mxn_lote
+from products.models import ExchangeRate, Price, Product
+
+
+def _producto(syscom_id, discount):
+    producto = Product.objects.create(syscom_id=syscom_id, model=f'M-{syscom_id}', title=f'P {syscom_id}')
+    Price.objects.create(product=producto, normal=discount, list_price=discount, discount=discount,
+                         margen_prod=0.0, descuento_prod=0.0)
+    return producto
+
+
+@pytest.mark.django_db
+def test_price_mxn_follows_price_and_exchange_rate(settings, django_capture_on_commit_callbacks, eager_celery):
+    settings.IVA = 0.0
+    ExchangeRate.objects.create(rate=10.0)
+    caro, barato = _producto('1', Decimal('30.00')), _producto('2', Decimal('20.00'))
+    assert Product.objects.get(pk=caro.pk).price_mxn == Decimal('300.00')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ExchangeRate.objects.create(rate=20.0)
+    assert dict(Product.objects.values_list('syscom_id', 'price_mxn')) == {
+        '1': Decimal('600.00'), '2': Decimal('400.00'),
+    }
+
+    qs, filtros = filtrar_por_precio(Product.objects.all(), {'orden': 'precio', 'precio_max': '500'})
+    assert [p.pk for p in qs] == [barato.pk]
+    assert filtros['orden'] == 'precio'
+
+
+def test_vectorized_repricing_matches_scalar_exactly(settings):
+    settings.IVA = 0.16
+    rnd = random.Random(21)
+    tipo = Decimal(18.7345)
+    descuentos = [Decimal(rnd.randint(0, 5_000_000)).scaleb(-2) for _ in range(20_000)]
+    margenes = [rnd.choice((0.0, 0.2, 0.25, 0.5, rnd.random())) for _ in descuentos]
+    descuentos_prod = [rnd.choice((0.0, 0.1, rnd.random() / 2)) for _ in descuentos]
+    # Casos en medio centavo exacto (1.5 y 2.5 centavos con tipo 1, sin IVA ni descuento)
+    casos = [(Decimal('0.01'), 0.5), (Decimal('0.05'), -0.5)]
+
+    with patch('core.utils.tipo_cambio_actual', return_value=tipo):
+        esperados = [_precio_escalar(*fila) for fila in zip(descuentos, margenes, descuentos_prod)]
+        assert precios_mxn_lote(descuentos, margenes, descuentos_prod, tipo) == esperados
+
+    settings.IVA = 0.0
+    with patch('core.utils.tipo_cambio_actual', return_value=Decimal(1)):
+        d, m = zip(*casos)
+        esperados = [_precio_escalar(x, y, 0.0) for x, y in casos]
+        assert esperados == [Decimal('0.02'), Decimal('0.02')]
+        assert precios_mxn_lote(list(d), m, (0.0, 0.0), Decimal(1)) == esperados
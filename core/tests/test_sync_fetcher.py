@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from dashboard.syscom_client import SyscomSaturado
+from dashboard.sync_fetcher import (
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    CircuitoAbierto,
+    fetch_concurrente,
+)
+
+
+def test_saturated_products_are_retried_and_rate_backs_off():
+    limiter = AdaptiveRateLimiter(rate=100, capacity=100, min_rate=1)
+    vistos = set()
+
+    def fetch(pid):
+        # Cada producto recibe un 429 la primera vez
+        if pid not in vistos:
+            vistos.add(pid)
+            raise SyscomSaturado("HTTP 429", retry_after=0)
+        return {"producto_id": pid}
+
+    resultados = dict(fetch_concurrente(["1", "2", "3"], fetch, workers=1, limiter=limiter,
+                                        breaker=CircuitBreaker(umbral=10)))
+
+    assert resultados == {pid: {"producto_id": pid} for pid in ("1", "2", "3")}
+    assert limiter.rate < 100
+
+
+def test_breaker_gives_up_when_syscom_stays_down():
+    def fetch(pid):
+        raise SyscomSaturado("HTTP 503")
+
+    breaker = CircuitBreaker(umbral=2, enfriamiento=0.01, max_aperturas=2)
+    with pytest.raises(CircuitoAbierto):
+        list(fetch_concurrente(["1", "2", "3"], fetch, workers=2,
+                               limiter=AdaptiveRateLimiter(rate=100, capacity=100), breaker=breaker))
+    assert breaker.aperturas == 3
+
+
+def _abierto(breaker):
+    # Abre el circuito con un enfriamiento corto: la siguiente petición es la prueba
+    breaker.fallo(retry_after=0)
+    assert breaker.estado == CircuitBreaker.ABIERTO
+
+
+def test_breaker_reopens_when_probe_raises_unexpected_error():
+    breaker = CircuitBreaker(umbral=1, enfriamiento=0.01, max_aperturas=5)
+    _abierto(breaker)
+
+    def fetch(pid):
+        if pid == "1":
+            raise ValueError("JSON inválido")
+        return {"producto_id": pid}
+
+    limiter = AdaptiveRateLimiter(rate=100, capacity=100)
+    resultados = dict(fetch_concurrente(["1", "2"], fetch, workers=1, limiter=limiter, breaker=breaker))
+
+    # La prueba fallida reabrió el circuito (no quedó semiabierto) y la siguiente lo cerró
+    assert resultados == {"1": None, "2": {"producto_id": "2"}}
+    assert breaker.estado == CircuitBreaker.CERRADO
+
+
+def test_breaker_probe_without_data_does_not_close_circuit():
+    breaker = CircuitBreaker(umbral=1, enfriamiento=0.01, max_aperturas=5)
+    _abierto(breaker)
+    limiter = AdaptiveRateLimiter(rate=100, capacity=100)
+
+    assert dict(fetch_concurrente(["1"], lambda pid: None, workers=1, limiter=limiter, breaker=breaker)) == {"1": None}
+    assert breaker.estado == CircuitBreaker.ABIERTO
+    assert breaker.aperturas == 1   # sin veredicto: no cuenta como otra apertura
+
+    list(fetch_concurrente(["2"], lambda pid: {"producto_id": pid}, workers=1, limiter=limiter, breaker=breaker))
+    assert breaker.estado == CircuitBreaker.CERRADO
+
+
+def test_closing_the_generator_releases_workers_waiting_on_open_circuit():
+    def fetch(pid):
+        if pid == "2":
+            raise SyscomSaturado("HTTP 429", retry_after=60)
+        return {"producto_id": pid}
+
+    breaker = CircuitBreaker(umbral=1, enfriamiento=60)
+    descargas = fetch_concurrente(["1", "2"], fetch, workers=2,
+                                  limiter=AdaptiveRateLimiter(rate=100, capacity=100), breaker=breaker)
+    assert next(descargas) == ("1", {"producto_id": "1"})
+    while breaker.estado != CircuitBreaker.ABIERTO:
+        time.sleep(0.01)
+
+    # Cancelar no espera los 60 s de pausa del circuito ni del Retry-After
+    inicio = time.monotonic()
+    descargas.close()
+    assert time.monotonic() - inicio < 5
@@ -0,0 +1,405 @@
+import os
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from unittest.mock import PropertyMock, patch
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from dashboard.buscar_sincronizar import sincronizar_inventario_sucursal, sincronizar_productos_background
+from dashboard.models import SyncJob
+from dashboard.sync_archivo import purgar_segmentos
+from dashboard.sync_progress import SyncProgress
+from dashboard.sync_writer import ProductBatchWriter, _slugs_unicos
+from dashboard.tasks import (
+    encolar_sync_job, limpieza_programada, programar_refresco_existencias, reanudar_sync_job,
+)
+from products.models import BranchStock, Brand, Price, Product
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_sync_job_runs_eagerly_and_records_counts(mock_fetch, eager_celery,
+                                                  django_capture_on_commit_callbacks, payload):
+    # El producto '3' falla en Syscom
+    mock_fetch.side_effect = lambda pid: None if pid == '3' else payload(pid)
+
+    job = SyncJob.objects.create(
+        kind=SyncJob.Kind.PRODUCTOS,
+        total=3,
+        params={'product_ids': ['1', '2', '3']},
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        encolar_sync_job(job)
+
+    job.refresh_from_db()
+    assert job.status == SyncJob.Status.COMPLETED
+    assert (job.processed, job.success_count, job.error_count) == (3, 2, 1)
+    assert job.started_at and job.finished_at
+    assert set(job.stats['stages']) == {'fetch', 'parse', 'write'}
+    assert job.stats['errors'][0]['pid'] == '3'
+    assert Product.objects.count() == 2
+    assert BranchStock.objects.filter(quantity=3).count() == 2
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_resumed_job_only_fetches_pending_ids(mock_fetch, eager_celery,
+                                              django_capture_on_commit_callbacks, payload):
+    mock_fetch.side_effect = payload
+
+    # Falló tras escribir el primer lote ('1' y '2'); '3' quedó pendiente
+    job = SyncJob.objects.create(
+        kind=SyncJob.Kind.PRODUCTOS,
+        status=SyncJob.Status.FAILED,
+        total=3,
+        success_count=2,
+        params={'product_ids': ['1', '2', '3']},
+        checkpoint=['1', '2'],
+    )
+    assert job.can_resume
+    with django_capture_on_commit_callbacks(execute=True):
+        assert reanudar_sync_job(job)
+
+    job.refresh_from_db()
+    assert [c.args[0] for c in mock_fetch.call_args_list] == ['3']
+    assert job.status == SyncJob.Status.COMPLETED
+    assert (job.processed, job.success_count, job.error_count) == (3, 3, 0)
+    assert sorted(job.checkpoint) == ['1', '2', '3']
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_cancel_stops_between_batches(mock_fetch, eager_celery, django_capture_on_commit_callbacks, payload):
+    mock_fetch.side_effect = payload
+    revisar = SyncProgress.cancelacion_solicitada
+
+    def cancelar_tras_primer_lote(progress):
+        SyncJob.objects.filter(pk=progress.job.pk).update(cancel_requested=True)
+        return revisar(progress)
+
+    job = SyncJob.objects.create(
+        kind=SyncJob.Kind.PRODUCTOS,
+        total=3,
+        params={'product_ids': ['1', '2', '3']},
+    )
+    # Lotes de un producto: la cancelación se revisa tras escribir el primero
+    with patch.object(ProductBatchWriter, 'lleno', new_callable=PropertyMock, return_value=True), \
+         patch.object(SyncProgress, 'cancelacion_solicitada', cancelar_tras_primer_lote), \
+         django_capture_on_commit_callbacks(execute=True):
+        encolar_sync_job(job)
+
+    job.refresh_from_db()
+    assert job.status == SyncJob.Status.CANCELLED
+    assert len(job.checkpoint) == 1
+    assert job.can_resume
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_cancel_stops_inventory_sync_between_batches(mock_fetch, eager_celery,
+                                                     django_capture_on_commit_callbacks, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1', '2', '3'])
+    revisar = SyncProgress.cancelacion_solicitada
+
+    def cancelar_tras_primer_lote(progress):
+        SyncJob.objects.filter(pk=progress.job.pk).update(cancel_requested=True)
+        return revisar(progress)
+
+    job = SyncJob.objects.create(
+        kind=SyncJob.Kind.INVENTARIO,
+        total=3,
+        params={'product_ids': ['1', '2', '3'], 'branch_slug': 'san_luis_potosi'},
+    )
+    with patch.object(ProductBatchWriter, 'lleno', new_callable=PropertyMock, return_value=True), \
+         patch.object(SyncProgress, 'cancelacion_solicitada', cancelar_tras_primer_lote), \
+         django_capture_on_commit_callbacks(execute=True):
+        encolar_sync_job(job)
+
+    job.refresh_from_db()
+    assert job.status == SyncJob.Status.CANCELLED
+    assert len(job.checkpoint) == 1
+    assert job.can_resume
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_replay_rewrites_from_archive_without_network(mock_fetch, archivo_tmp, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1', '2'])
+    segmento, = archivo_tmp.iterdir()
+    assert segmento.name.endswith('-manual.jsonl.gz')
+
+    mock_fetch.reset_mock()
+    Product.objects.update(title='editado')
+    exitosos, errores = sincronizar_productos_background(None, SyncProgress(total=2), replay=segmento.name, forzar=True)
+
+    mock_fetch.assert_not_called()
+    assert (exitosos, errores) == (2, 0)
+    assert set(Product.objects.values_list('title', flat=True)) == {'Producto 1', 'Producto 2'}
+
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom', return_value=None)
+def test_sync_without_payloads_leaves_no_empty_segment(mock_fetch, archivo_tmp):
+    sincronizar_productos_background(['1'])
+    sincronizar_productos_background([])
+    assert list(archivo_tmp.iterdir()) == []
+
+def test_archive_retention_purges_old_segments(archivo_tmp):
+    viejo, reciente = archivo_tmp / '20250101-000000-manual.jsonl.gz', archivo_tmp / 'reciente-manual.jsonl.gz'
+    for ruta in (viejo, reciente):
+        ruta.write_bytes(b'')
+    hace_un_mes = time.time() - 30 * 86400
+    os.utime(viejo, (hace_un_mes, hace_un_mes))
+
+    assert purgar_segmentos(0) == 0
+    assert purgar_segmentos(14) == 1
+    assert [r.name for r in archivo_tmp.iterdir()] == [reciente.name]
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_inventory_all_branches_zeroes_missing_branch(mock_fetch, payload):
+    con_dos = payload('1')
+    con_dos['existencia']['detalle']['nuevo'] = {'san_luis_potosi': 3, 'monterrey': 5}
+    mock_fetch.return_value = con_dos
+    sincronizar_productos_background(['1'])
+    assert BranchStock.objects.filter(quantity__gt=0).count() == 2
+
+    # Monterrey ya no aparece en el payload: queda sin existencia
+    mock_fetch.return_value = payload('1')
+    assert sincronizar_inventario_sucursal(['1']) == 1
+    assert dict(BranchStock.objects.values_list('branch__slug', 'quantity')) == {
+        'san_luis_potosi': 3, 'monterrey': 0,
+    }
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_inventory_sync_counts_errors(mock_fetch, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1'])
+
+    mock_fetch.side_effect = lambda pid: None if pid == '2' else payload(pid)
+    progress = SyncProgress(total=2)
+    assert sincronizar_inventario_sucursal(['1', '2'], progress=progress) == 1
+    assert (progress.processed, progress.error_count) == (2, 1)
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_full_sync_rewrites_stock_after_single_branch_sync(mock_fetch, payload):
+    def _con_slp(cantidad):
+        data = payload('1')
+        data['existencia']['detalle']['nuevo'] = {'san_luis_potosi': cantidad}
+        return data
+
+    mock_fetch.return_value = _con_slp(5)
+    sincronizar_productos_background(['1'])
+    mock_fetch.return_value = _con_slp(3)
+    sincronizar_inventario_sucursal(['1'], 'san_luis_potosi')
+    assert BranchStock.objects.get().quantity == 3
+
+    # El hash "stock" se descartó: la sync completa no lo da por igual
+    mock_fetch.return_value = _con_slp(5)
+    sincronizar_productos_background(['1'])
+    assert BranchStock.objects.get().quantity == 5
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_scheduled_stock_refresh_prioritizes_low_stock(mock_fetch, eager_celery,
+                                                       django_capture_on_commit_callbacks, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1', '2'])
+    BranchStock.objects.filter(product__syscom_id='2').update(quantity=50)
+
+    def _agotado(pid):
+        data = payload(pid)
+        data['existencia']['detalle']['nuevo'] = {'san_luis_potosi': 0}
+        return data
+
+    mock_fetch.reset_mock()
+    mock_fetch.side_effect = _agotado
+    with django_capture_on_commit_callbacks(execute=True):
+        job_id = programar_refresco_existencias()
+
+    job = SyncJob.objects.get(pk=job_id)
+    assert job.kind == SyncJob.Kind.EXISTENCIAS
+    assert job.status == SyncJob.Status.COMPLETED
+    # '1' (3 unidades) va antes que '2' (50 unidades)
+    assert job.params['product_ids'] == ['1', '2']
+    assert set(BranchStock.objects.values_list('quantity', flat=True)) == {0}
+
+    # La sync completa no omite la existencia: el hash "stock" quedó al día
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1'])
+    assert BranchStock.objects.get(product__syscom_id='1').quantity == 3
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_stock_refresh_leaves_no_archive_and_old_jobs_are_purged(mock_fetch, archivo_tmp, eager_celery,
+                                                                django_capture_on_commit_callbacks, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1'])
+
+    # Misma existencia: no se reescribe la fila, así que no parece "cambio reciente"
+    hace_dias = timezone.now() - timedelta(days=5)
+    BranchStock.objects.update(updated_at=hace_dias)
+    sincronizar_inventario_sucursal(['1'], 'san_luis_potosi')
+    assert BranchStock.objects.get().updated_at == hace_dias
+
+    segmentos = set(archivo_tmp.iterdir())
+    with django_capture_on_commit_callbacks(execute=True):
+        job_id = programar_refresco_existencias()
+    assert set(archivo_tmp.iterdir()) == segmentos
+
+    SyncJob.objects.filter(pk=job_id).update(finished_at=hace_dias)
+    limpieza_programada()
+    assert not SyncJob.objects.filter(pk=job_id).exists()
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_stale_stock_refresh_does_not_block_the_schedule(mock_fetch, eager_celery,
+                                                         django_capture_on_commit_callbacks, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1'])
+    # Worker muerto a mitad del refresco: quedó RUNNING sin avanzar
+    atascado = SyncJob.objects.create(kind=SyncJob.Kind.EXISTENCIAS, status=SyncJob.Status.RUNNING,
+                                      total=1, params={'product_ids': ['1']})
+
+    assert programar_refresco_existencias() is None   # reciente: se respeta
+    SyncJob.objects.filter(pk=atascado.pk).update(updated_at=timezone.now() - timedelta(hours=2))
+    with django_capture_on_commit_callbacks(execute=True):
+        job_id = programar_refresco_existencias()
+
+    atascado.refresh_from_db()
+    assert atascado.status == SyncJob.Status.FAILED
+    assert atascado.can_resume
+    assert SyncJob.objects.get(pk=job_id).status == SyncJob.Status.COMPLETED
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_dry_run_reports_changes_without_writing(mock_fetch, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1'])
+
+    def _cambiado(pid):
+        data = payload(pid)
+        data['precios']['precio_1'] = '11.00'
+        data['existencia']['detalle']['nuevo'] = {'san_luis_potosi': 7}
+        return data
+
+    mock_fetch.side_effect = _cambiado
+    progress = SyncProgress(total=2)
+    assert sincronizar_productos_background(['1', '2'], progress, dry_run=True) == (2, 0)
+
+    diff = progress.extra['diff']
+    assert diff['Product'] == {'nuevos': 1}
+    assert diff['Price'] == {'normal': 1, 'nuevos': 1}
+    assert diff['BranchStock'] == {'nuevos': 1, 'quantity': 1}
+    assert Product.objects.count() == 1
+    assert BranchStock.objects.get().quantity == 3
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_manual_sync_keeps_margins_set_by_admin(mock_fetch, payload):
+    mock_fetch.side_effect = payload
+    sincronizar_productos_background(['1'])
+    assert Price.objects.get().margen_prod == 0.20
+    Price.objects.update(margen_prod=0.35, descuento_prod=0.05)
+
+    def _nuevo_precio(pid):
+        data = payload(pid)
+        data['precios']['precio_1'] = '11.00'
+        return data
+
+    mock_fetch.side_effect = _nuevo_precio
+    sincronizar_productos_background(['1'])
+    precio = Price.objects.get()
+    assert str(precio.normal) == '11.00'
+    assert (precio.margen_prod, precio.descuento_prod) == (0.35, 0.05)
+
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_command_replay_keeps_margins_when_price_section_changes(mock_fetch, archivo_tmp, payload):
+    mock_fetch.side_effect = lambda pid: payload(pid, precio='8.00')
+    sincronizar_productos_background(['1'])
+    segmento, = archivo_tmp.iterdir()
+
+    # Precio distinto al del segmento: la sección "precio" sí se reescribe
+    Price.objects.update(discount=Decimal('9.00'), margen_prod=0.35, descuento_prod=0.05)
+    Product.objects.update(sync_hashes={})
+    call_command('sincronizar_syscom', replay=segmento.name, stdout=StringIO())
+
+    precio = Price.objects.get()
+    assert precio.discount == Decimal('8.00')
+    assert (precio.margen_prod, precio.descuento_prod) == (0.35, 0.05)
+
+@pytest.mark.django_db
+@patch('dashboard.buscar_sincronizar.obtener_producto_syscom')
+def test_search_screen_post_enqueues_a_sync_job(mock_fetch, client, django_user_model, eager_celery,
+                                                django_capture_on_commit_callbacks, payload):
+    mock_fetch.side_effect = payload
+    admin = django_user_model.objects.create_user(email='admin@example.com', password='x', is_staff=True)
+    client.force_login(admin)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post('/dashboard/sincronizar/', {'productos': ['1', '2']})
+
+    assert response.status_code == 302
+    job = SyncJob.objects.get()
+    assert (job.kind, job.user, job.params['product_ids']) == (SyncJob.Kind.PRODUCTOS, admin, ['1', '2'])
+    assert job.status == SyncJob.Status.COMPLETED
+    assert Product.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_progress_stream_sends_events_and_closes(client, django_user_model):
+    admin = django_user_model.objects.create_user(email='admin@example.com', password='x', is_staff=True)
+    client.force_login(admin)
+    job = SyncJob.objects.create(kind=SyncJob.Kind.PRODUCTOS, user=admin, status=SyncJob.Status.RUNNING,
+                                 total=3, processed=1)
+
+    def eventos():
+        response = client.get(f'/dashboard/sincronizar/progress/stream/?job={job.pk}')
+        assert response['Content-Type'] == 'text/event-stream'
+        return [bloque for bloque in b''.join(response.streaming_content).decode().split('\n\n') if bloque]
+
+    # Trabajo en curso: un evento de progreso y el stream se corta al tope
+    with patch('dashboard.sync_stream.DURACION_MAXIMA', 0.05), \
+         patch('dashboard.sync_stream.INTERVALO_CONSULTA', 0.01):
+        inicio = time.monotonic()
+        recibidos = eventos()
+    assert time.monotonic() - inicio < 5
+    assert recibidos[0] == 'retry: 3000'
+    assert recibidos[1].startswith('event: progress\n')
+    assert '"processed": 1' in recibidos[1]
+    assert not any(e.startswith('event: end') for e in recibidos)
+
+    # Trabajo terminado: estado final y cierre
+    SyncJob.objects.filter(pk=job.pk).update(status=SyncJob.Status.COMPLETED, processed=3)
+    recibidos = eventos()
+    assert recibidos[-1].startswith('event: end\n')
+    assert '"processed": 3' in recibidos[-1]
+
+
+@pytest.mark.django_db
+def test_unique_slugs_for_new_brands_take_one_query(django_assert_num_queries):
+    Brand.objects.create(name='Hikvision', slug='hikvision')
+    Brand.objects.create(name='Hikvision Pro', slug='hikvision-1')
+    with django_assert_num_queries(1):
+        slugs = _slugs_unicos(Brand, ['HIKVISION', 'Hik Vision', 'Epcom', 'epcom'])
+    assert slugs == {'HIKVISION': 'hikvision-2', 'Hik Vision': 'hik-vision', 'Epcom': 'epcom', 'epcom': 'epcom-1'}
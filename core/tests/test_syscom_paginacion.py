@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock, patch
+
+from dashboard.sync_fetcher import AdaptiveRateLimiter
+from dashboard.syscom_paginacion import ids_de_paginas, paginas_syscom
+
+
+def _respuesta(pagina, paginas=3):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        'cantidad': paginas * 2,
+        'pagina': pagina,
+        'paginas': paginas,
+        'productos': [{'producto_id': pagina * 10 + i} for i in range(2)],
+    }
+    return response
+
+
+@patch('dashboard.syscom_paginacion.get_autenticado')
+def test_pages_are_fetched_lazily_with_one_page_prefetch(mock_get):
+    mock_get.side_effect = lambda url, params: _respuesta(params['pagina'])
+
+    ids = ids_de_paginas(paginas_syscom({'marca': 'hikvision'}, prefetch=True))
+    assert next(ids) == '10'
+    # Página actual + una adelantada, nunca el listado completo
+    assert mock_get.call_count <= 2
+
+    assert list(ids) == ['11', '20', '21', '30', '31']
+    assert [c.kwargs['params']['pagina'] for c in mock_get.call_args_list] == [1, 2, 3]
+    assert all(c.kwargs['params']['marca'] == 'hikvision' for c in mock_get.call_args_list)
+
+
+@patch('dashboard.syscom_paginacion.get_rate_limiter', return_value=AdaptiveRateLimiter(rate=100, capacity=100))
+@patch('dashboard.syscom_paginacion.get_autenticado')
+def test_rate_limited_page_is_retried_instead_of_aborting_the_walk(mock_get, mock_limiter):
+    saturadas = {2}
+
+    def responder(url, params):
+        if params['pagina'] in saturadas:
+            saturadas.discard(params['pagina'])
+            return MagicMock(status_code=429, headers={'Retry-After': '0'})
+        return _respuesta(params['pagina'])
+
+    mock_get.side_effect = responder
+    assert list(ids_de_paginas(paginas_syscom({'marca': 'hikvision'}))) == ['10', '11', '20', '21', '30', '31']
+    assert [c.kwargs['params']['pagina'] for c in mock_get.call_args_list] == [1, 2, 2, 3]
+    assert mock_limiter.return_value.rate < 100
@@ -0,0 +1,42 @@
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+
+from dashboard.syscom_token import SyscomTokenManager
+from products.models import SyscomCredential
+
+
+@pytest.mark.django_db(transaction=True)
+@patch('dashboard.syscom_token.get_syscom_client')
+def test_token_is_cached_and_refreshed_once_per_expiry(mock_client):
+    solicitar = mock_client.return_value.solicitar_token
+    solicitar.return_value = {'access_token': 'nuevo', 'expires_in': 3600}
+    SyscomCredential.objects.create(
+        client_id='id', client_secret='secret',
+        token='viejo', expires_at=timezone.now() + timedelta(seconds=60),
+    )
+    manager = SyscomTokenManager(margen=300)
+
+    # Vence dentro del margen: 10 hilos lo piden a la vez y sólo uno renueva
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(manager.token())) for _ in range(10)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert resultados == ['nuevo'] * 10
+    assert solicitar.call_count == 1
+    assert SyscomCredential.objects.get().token == 'nuevo'
+
+    # Ya en memoria: no vuelve a tocar BD
+    with patch.object(SyscomCredential.objects, 'select_for_update') as consulta:
+        assert manager.headers() == {'Authorization': 'Bearer nuevo'}
+    consulta.assert_not_called()
+
+    # Un 401 con un token ya reemplazado no provoca otra renovación
+    assert manager.invalidar('viejo') == 'nuevo'
+    assert solicitar.call_count == 1
@@ -0,0 +1,40 @@
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from core.tipo_cambio import tipo_cambio_cambiado
+from core.utils import calculate_mxn_price
+from dashboard.tasks import actualizar_tipo_cambio_programado
+from products.models import ExchangeRate
+
+
+@pytest.mark.django_db
+def test_pricing_reads_rate_once_and_new_rate_invalidates(django_assert_num_queries, settings):
+    ExchangeRate.objects.create(rate=18.0)
+    price = SimpleNamespace(discount=Decimal('10.00'), margen_prod=0.0, descuento_prod=0.0)
+    settings.IVA = 0.0
+
+    with django_assert_num_queries(1):
+        for _ in range(25):
+            assert calculate_mxn_price(price) == Decimal('180.00')
+
+    ExchangeRate.objects.create(rate=20.0)
+    assert calculate_mxn_price(price) == Decimal('200.00')
+
+
+@pytest.mark.django_db
+def test_scheduled_update_only_inserts_changed_rate(django_capture_on_commit_callbacks, eager_celery):
+    avisos = []
+    receptor = lambda sender, rate, **kw: avisos.append(rate)  # noqa: E731
+    tipo_cambio_cambiado.connect(receptor)
+    try:
+        with patch('dashboard.tipo_cambio.obtener_tipo_cambio', side_effect=[18.25, 18.25, 18.5]):
+            for _ in range(3):
+                with django_capture_on_commit_callbacks(execute=True):
+                    actualizar_tipo_cambio_programado()
+    finally:
+        tipo_cambio_cambiado.disconnect(receptor)
+
+    assert list(ExchangeRate.objects.order_by('created_at').values_list('rate', flat=True)) == [18.25, 18.5]
+    assert avisos == [Decimal(18.25), Decimal(18.5)]
@@ -0,0 +1,71 @@
+# file: core/tipo_cambio.py
+# -----------------------------------------------------------------------------
+# Tipo de cambio vigente (último `ExchangeRate`) con caché en dos niveles:
+#
+#   1) memoria del proceso: se revalida contra la caché compartida cada
+#      `TIPO_CAMBIO_REVALIDAR` segundos;
+#   2) caché compartida (CACHES['default']): una sola lectura de BD para
+#      todos los workers hasta que cambia el tipo de cambio.
+#
+# Al guardar o borrar un `ExchangeRate` (ver `products/signals.py`) se limpian
+# ambos niveles; el proceso que guardó ve el valor nuevo de inmediato y los
+# demás a más tardar tras `TIPO_CAMBIO_REVALIDAR` segundos.
+#
+# `tipo_cambio_cambiado` avisa a quien tenga datos calculados con el tipo de
+# cambio (ver `dashboard.tipo_cambio.actualizar_tipo_cambio`).
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+
+from products.models import ExchangeRate
+
+CACHE_KEY = "tipo_cambio:actual"
+TIPO_CAMBIO_REVALIDAR = getattr(settings, "TIPO_CAMBIO_REVALIDAR", 30)
+
+# Se envía (con `rate=Decimal`) cuando un tipo de cambio nuevo quedó
+# confirmado en BD; los datos derivados del precio en MXN lo escuchan.
+tipo_cambio_cambiado = Signal()
+
+_local = {"valor": None, "leido": 0.0}
+_lock = threading.Lock()
+
+
+# --- BLOQUE CONSULTA ---------------------------------------------------------
+
+
+def tipo_cambio_actual() -> Decimal:
+    """
+    Tipo de cambio vigente como `Decimal`.
+
+    Lanza `ExchangeRate.DoesNotExist` si no hay ninguno registrado (igual que
+    `ExchangeRate.objects.latest`).
+    """
+    valor, leido = _local["valor"], _local["leido"]
+    if valor is not None and time.monotonic() - leido < TIPO_CAMBIO_REVALIDAR:
+        return valor
+
+    with _lock:
+        valor = cache.get(CACHE_KEY)
+        if valor is None:
+            # Decimal(float) como siempre se calculó, para no mover centavos
+            valor = Decimal(ExchangeRate.objects.latest("created_at").rate)
+            cache.set(CACHE_KEY, valor, timeout=None)
+        _local.update(valor=valor, leido=time.monotonic())
+    return valor
+
+
+# --- BLOQUE INVALIDACIÓN -----------------------------------------------------
+
+
+def invalidar_tipo_cambio() -> None:
+    """Descarta el valor en memoria y en la caché compartida."""
+    with _lock:
+        cache.delete(CACHE_KEY)
+        _local.update(valor=None, leido=0.0)
@@ -1,14 +1,13 @@
 from decimal import Decimal
 from django.conf import settings
-from products.models import ExchangeRate
+from core.tipo_cambio import tipo_cambio_actual
 from django.utils.http import url_has_allowed_host_and_scheme
 
 def calculate_mxn_price(price_obj, user=None):
     if not price_obj or not price_obj.discount:
         return Decimal('0.00')
     usd_price = price_obj.discount
-    latest_rate = ExchangeRate.objects.latest('created_at').rate
-    base = usd_price * Decimal(latest_rate)
+    base = usd_price * tipo_cambio_actual()
     base *= Decimal(1 + price_obj.margen_prod)
     base *= Decimal(1 - price_obj.descuento_prod)
     if user and user.is_authenticated:
@@ -20,8 +19,7 @@ def calculate_mxn_subtotal(price_obj, user=None):
     if not price_obj or not price_obj.discount:
         return Decimal('0.00')
     usd_price = price_obj.discount
-    latest_rate = ExchangeRate.objects.latest('created_at').rate
-    base = usd_price * Decimal(latest_rate)
+    base = usd_price * tipo_cambio_actual()
     base *= Decimal(1 + price_obj.margen_prod)
     base *= Decimal(1 - price_obj.descuento_prod)
     if user and user.is_authenticated:
@@ -1,3 +1,22 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import SyncJob
+from .tasks import cancelar_sync_job, reanudar_sync_job
+
+
+@admin.register(SyncJob)
+class SyncJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'user', 'total', 'processed', 'success_count', 'error_count', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('task_id', 'started_at', 'finished_at', 'checkpoint', 'cancel_requested')
+    actions = ('cancelar', 'reanudar')
+
+    @admin.action(description="Cancelar trabajos en curso")
+    def cancelar(self, request, queryset):
+        n = sum(cancelar_sync_job(job) for job in queryset)
+        self.message_user(request, f"{n} trabajo(s) marcados para cancelar")
+
+    @admin.action(description="Reanudar desde el último checkpoint")
+    def reanudar(self, request, queryset):
+        n = sum(reanudar_sync_job(job) for job in queryset)
+        self.message_user(request, f"{n} trabajo(s) reanudados")
@@ -7,13 +7,13 @@ from django.core.paginator import Paginator
 from django.db.models import Q
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
-import threading
-from django.core.cache import cache
 
 from products.models import Brand, Category, Product, BranchStock, Price, Branch
 from django.db.models import Q, Sum, OuterRef, Subquery, DecimalField
-from dashboard.buscar_sincronizar import sincronizar_inventario_sucursal
+from dashboard.models import SyncJob
+from dashboard.tasks import encolar_sync_job
 from core.utils import calculate_mxn_price
+from core.precios import filtrar_por_precio
 
 @login_required
 @staff_member_required
@@ -72,6 +72,8 @@ def gestion_productos(request):
             Q(brand__name__icontains=busqueda)
         )
 
+    productos_qs, filtros_precio = filtrar_por_precio(productos_qs, request.GET)
+
     # ─── BLOQUE 4: paginación ───
     paginator = Paginator(productos_qs, 25)        # 25 ítems por página
     page_obj  = paginator.get_page(request.GET.get("page"))
@@ -84,6 +86,7 @@ def gestion_productos(request):
         "current_categoria": int(categoria_id) if categoria_id else "",
         "current_marca"    : int(marca_id)     if marca_id else "",
         "busqueda"         : busqueda or "",
+        **filtros_precio,
     }
     for p in page_obj:
         if hasattr(p, 'prices') and p.prices.special:
@@ -120,18 +123,19 @@ def sincronizar_inventarios(request):
             return redirect(request.path)
 
         product_ids = list(productos_qs.values_list('syscom_id', flat=True))
-        branch_slug = Branch.objects.get(id=branch_id).slug
-
-        cache_key = f'sync_progress_{request.user.id}'  # User-specific key
-        cache.set(cache_key, {'total': len(product_ids), 'processed': 0, 'status': 'running'}, timeout=3600)
-
-        def run_sync():
-            sincronizar_inventario_sucursal(product_ids, branch_slug, cache_key=cache_key)
-
-        threading.Thread(target=run_sync).start()
+        # "todas": una sola descarga por producto actualiza cada sucursal
+        branch_slug = None if branch_id == "todas" else Branch.objects.get(id=branch_id).slug
+
+        job = SyncJob.objects.create(
+            kind=SyncJob.Kind.INVENTARIO,
+            user=request.user,
+            total=len(product_ids),
+            params={'product_ids': product_ids, 'branch_slug': branch_slug},
+        )
+        encolar_sync_job(job)
 
         # Return immediately to allow polling
-        return JsonResponse({'status': 'started'})
+        return JsonResponse({'status': 'started', 'job_id': job.pk})
 
     context = {
         'total_productos': total_productos,
@@ -140,6 +144,6 @@ def sincronizar_inventarios(request):
     return render(request, 'dashboard/admin_sinc_inventarios.html', context)
 
 def get_sync_progress(request):
-    cache_key = f'sync_progress_{request.user.id}'
-    progress = cache.get(cache_key, {'processed': 0, 'total': 0, 'status': 'idle'})
+    job = SyncJob.latest_for(request.user, SyncJob.Kind.INVENTARIO)
+    progress = job.as_progress() if job else {'processed': 0, 'total': 0, 'status': 'idle'}
     return JsonResponse(progress)
\ No newline at end of file
@@ -4,7 +4,7 @@
 #   1) Renovar el token OAuth de Syscom
 #   2) Consultar productos (por búsqueda o por ID) normalizando respuestas
 #   3) Mostrar resultados en plantillas de administración
-#   4) Sincronizar información detallada en la base interna (transacción atómica)
+#   4) Sincronizar información detallada en la base interna (por lotes, ver sync_writer)
 #   5) Funciones de prueba / debug para inspeccionar la respuesta bruta de Syscom
 #
 # Cada gran sección está marcada con comentarios --------------- BLOQUE --------
@@ -17,40 +17,43 @@ import logging
 from datetime import timedelta
 
 import requests
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 from django.http import JsonResponse
+from django.db.models import Case, F, Max, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.utils.text import slugify
-from django.core.cache import cache
-from django.db import IntegrityError
-import threading
-
-from products.models import (
-    Branch,
-    BranchStock,
-    Brand,
-    Category,
-    Feature,
-    Price,
-    Product,
-    ProductImage,
-    SyscomCredential,
-)
+
+from catalogo.facetas import invalidar_catalogo
+from dashboard.models import SyncJob
+from dashboard.tasks import encolar_sync_job
+from dashboard.syscom_token import get_autenticado, get_token_manager
+from dashboard.syscom_paginacion import filtros_syscom, obtener_pagina_syscom
+from dashboard.syscom_client import SyscomSaturado, revisar_saturacion
+from dashboard.sync_fetcher import CircuitBreaker, fetch_concurrente, get_rate_limiter
+from dashboard.sync_writer import ProductBatchWriter, StockBatchWriter, SyncDiff
+from dashboard.sync_archivo import ARCHIVO_ACTIVO, ArchivoPayloads, archivar, leer_segmento, resolver_segmento
+from dashboard.sync_progress import SyncProgress
+from products.models import Product
 
 logger = logging.getLogger(__name__)
 
-API_PRODUCTOS_URL = "https://developers.syscom.mx/api/v1/productos"
+API_PRODUCTOS_URL = "/api/v1/productos"
+
+# Prioridades del refresco de existencias (ver `productos_para_refresco`)
+STOCK_LOW_THRESHOLD = getattr(settings, "SYSCOM_STOCK_LOW_THRESHOLD", 5)
+STOCK_RECENT_HOURS = getattr(settings, "SYSCOM_STOCK_RECENT_HOURS", 24)
 
 # --- BLOQUE TOKEN OAUTH ------------------------------------------------------
 
 
 def renovar_token_syscom() -> bool:
     """
-    Renueva el token de acceso a la API de Syscom y lo guarda en BD.
+    Renueva el token de acceso a la API de Syscom (ver `syscom_token`).
 
     Returns
     -------
@@ -59,25 +62,7 @@ def renovar_token_syscom() -> bool:
         False → ocurrió un error
     """
     try:
-        cred = SyscomCredential.objects.latest("id")
-
-        url = "https://developers.syscom.mx/oauth/token"
-        data = {
-            "client_id": cred.client_id,
-            "client_secret": cred.client_secret,
-            "grant_type": "client_credentials",
-        }
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-
-        response = requests.post(url, data=data, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        token_data = response.json()
-        cred.token = token_data["access_token"]
-        cred.expires_at = timezone.now() + timedelta(seconds=token_data["expires_in"])
-        cred.save()
-
-        logger.info("✅  Token de Syscom renovado exitosamente")
+        get_token_manager().renovar()
         return True
 
     except Exception as e:
@@ -175,30 +160,26 @@ def procesar_producto(item: dict) -> dict | None:
 # --- BLOQUE CONSULTA A SYSCOM ------------------------------------------------
 
 
-def _get_auth_headers() -> dict:
-    """Devuelve headers con el token más reciente."""
-    cred = SyscomCredential.objects.latest("id")
-    return {"Authorization": f"Bearer {cred.token}"}
-
-
-def obtener_productos_syscom(query: str = "", ids: str = "", intento: int = 1) -> list:
+def obtener_productos_syscom(query: str = "", ids: str = "") -> list:
     """
     Consulta la API de Syscom y normaliza la respuesta.
 
     • Si se pasa `ids`, se hacen peticiones individuales a /productos/<id>.
-    • Si se pasa `query`, se usa el parámetro de búsqueda `busqueda=<query>`.
+    • Si se pasa `query`, se devuelve la primera página de la búsqueda
+      (las siguientes con `buscar_productos_syscom`).
 
-    Maneja la renovación automática del token (intenta 1 vez).
+    La renovación del token ante un 401 la hace `get_autenticado`.
     """
     try:
-        headers = _get_auth_headers()
         productos: list[dict] = []
 
         # --- Búsqueda por IDs -------------------------------------------------
         if ids:
             for pid in [i.strip() for i in ids.split(",") if i.strip()]:
                 url = f"{API_PRODUCTOS_URL}/{pid}?inventarios=1"
-                data = requests.get(url, headers=headers, timeout=15).json()
+                response = get_autenticado(url)
+                response.raise_for_status()
+                data = response.json()
 
                 iterable = data if isinstance(data, list) else [data]
                 for item in iterable:
@@ -208,26 +189,11 @@ def obtener_productos_syscom(query: str = "", ids: str = "", intento: int = 1) -
             return productos
 
         # --- Búsqueda por texto ----------------------------------------------
-        params = {"busqueda": query, "inventarios": 1} if query else {}
-        data = requests.get(API_PRODUCTOS_URL, headers=headers, params=params, timeout=15).json()
-
-        productos_data = (
-            data.get("productos", data) if isinstance(data, dict) else data
-        )
-
-        for item in productos_data:
-            p = procesar_producto(item)
-            if p:
-                productos.append(p)
-
+        productos, _ = buscar_productos_syscom(query)
         return productos
 
     # --- Manejo de errores ---------------------------------------------------
     except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 401 and intento < 2:
-            logger.warning("Token expirado. Intentando renovar…")
-            if renovar_token_syscom():
-                return obtener_productos_syscom(query, ids, intento + 1)
         logger.error(f"HTTPError: {e}")
         return []
 
@@ -236,72 +202,59 @@ def obtener_productos_syscom(query: str = "", ids: str = "", intento: int = 1) -
         return []
 
 
-# --- BLOQUE FUNCIONES AUXILIARES PARA SYNC ----------------------------------
+def buscar_productos_syscom(query: str, pagina: int = 1) -> tuple[list, int | None]:
+    """
+    Una página de la búsqueda por texto, ya normalizada.
 
-# --- BLOQUE PRECIOS (CORREGIDO) --------------------------------------------
+    Returns
+    -------
+    tuple[list[dict], int | None]
+        (productos, número de la página siguiente o None si es la última)
+    """
+    params = filtros_syscom(busqueda=query)
+    params["inventarios"] = 1
+    data = obtener_pagina_syscom(params, pagina)
 
+    productos = [p for p in map(procesar_producto, data["productos"]) if p]
+    siguiente = pagina + 1 if data["productos"] and pagina < data["paginas"] else None
+    return productos, siguiente
 
-def sync_product_price(producto, price_data):
-    """
-    Sincroniza (crea o actualiza) el precio principal del producto
-    sin romper la clave primaria.
+
+def obtener_producto_syscom(identificador: str, inventarios: bool = True) -> dict | None:
     """
-    try:
-        # 1️⃣  Un solo statement atómico
-        Price.objects.update_or_create(
-            product=producto,        # clave única / One-To-One
-            defaults=price_data,     # campos a actualizar
-        )
-        return True
+    Obtiene un solo producto de Syscom con una única petición.
 
-    except IntegrityError as e:
-        logger.warning("IntegrityError en precios: %s", e)
-        # 2️⃣  Segundo intento por si existe una carrera de escritura
-        updated, _ = Price.objects.update_or_create(
-            product=producto,
-            defaults=price_data,
-        )
-        return updated is not None
+    Es la función de producción para las sincronizaciones: pide sólo la
+    variante necesaria (`?inventarios=1` por defecto) en lugar de las dos que
+    descarga `buscar_test`.
 
+    Returns
+    -------
+    dict | None
+        JSON del producto o None si la petición falló.
 
-def sync_product_stock(producto, sucursales_data):
-    """Maneja la sincronización de inventarios por sucursal."""
-    success_count = 0
-    
-    for name, qty in sucursales_data.items():
-        try:
-            slug = slugify(name)[:50]
+    Raises
+    ------
+    SyscomSaturado
+        Ante 429 / 5xx / sin conexión, para que el limitador y el circuit
+        breaker de `sync_fetcher` reaccionen en lugar de perder el producto.
+    """
+    try:
+        params = {"inventarios": 1} if inventarios else None
+        response = get_autenticado(f"{API_PRODUCTOS_URL}/{identificador}", params=params)
+        revisar_saturacion(response)
+        response.raise_for_status()
+        return response.json()
 
-            # Obtener o crear sucursal
-            try:
-                branch, _ = Branch.objects.get_or_create(
-                    slug=slug,
-                    defaults={"name": name}
-                )
-            except IntegrityError:
-                branch = Branch.objects.get(slug=slug)
+    except SyscomSaturado:
+        raise
 
-            # Sincronizar inventario
-            try:
-                BranchStock.objects.update_or_create(
-                    product=producto,
-                    branch=branch,
-                    defaults={"quantity": int(qty or 0)},
-                )
-                success_count += 1
-                
-            except IntegrityError:
-                # Si hay conflicto, hacer update directo
-                BranchStock.objects.filter(
-                    product=producto, 
-                    branch=branch
-                ).update(quantity=int(qty or 0))
-                success_count += 1
-                
-        except Exception as e:
-            logger.error(f"❌ Error sincronizando inventario {name} para producto {producto.syscom_id}: {e}")
-    
-    return success_count
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        raise SyscomSaturado(str(e)) from e
+
+    except Exception as e:
+        logger.error(f"Error obteniendo producto {identificador} de Syscom: {e}")
+        return None
 
 
 # --- BLOQUE VISTAS DJANGO ----------------------------------------------------
@@ -313,9 +266,10 @@ def sincronizar_productos(request):
     """
     Vista principal:
       • GET  → muestra resultados de búsqueda/ID
-      • POST → sincroniza productos seleccionados a la BD interna
+      • POST → encola la sincronización de los productos seleccionados (SyncJob)
     """
     productos: list[dict] = []
+    siguiente = None
 
     # --- GET: mostrar resultados --------------------------------------------
     if request.method == "GET" and ("q" in request.GET or "ids" in request.GET):
@@ -324,325 +278,286 @@ def sincronizar_productos(request):
         # Sanitize `ids` string: convert "+" (URL-encoded spaces) & commas to spaces, split, then rejoin with commas
         ids_list = [i.strip() for i in ids_raw.replace("+", " ").replace(",", " ").split() if i.strip()]
         ids_cleaned = ",".join(ids_list)
-        productos = obtener_productos_syscom(query=query, ids=ids_cleaned)
+        if ids_cleaned or not query:
+            productos = obtener_productos_syscom(query=query, ids=ids_cleaned)
+        else:
+            # Sólo la primera página; el resto se pide con "Cargar más"
+            try:
+                productos, siguiente = buscar_productos_syscom(query)
+            except Exception as e:
+                logger.error(f"Error general al obtener productos: {e}")
         productos = [p for p in productos if p is not None]  # Filtrar productos inválidos
 
     # --- POST: sincronizar seleccionados ------------------------------------
     if request.method == "POST":
         selected_ids = request.POST.getlist("productos")
-        success_count = 0
-        error_count = 0
+        if not selected_ids:
+            messages.warning(request, "⚠️ No se seleccionó ningún producto")
+            return redirect("dashboard:sincronizar")
+
+        # Igual que `start_product_sync`: la sincronización corre en el worker
+        job = SyncJob.objects.create(
+            kind=SyncJob.Kind.PRODUCTOS,
+            user=request.user,
+            total=len(selected_ids),
+            params={"product_ids": selected_ids},
+        )
+        encolar_sync_job(job)
+        messages.success(request, f"🚀 Sincronización de {len(selected_ids)} productos iniciada")
+        return redirect("dashboard:sincronizar")
 
-        for pid in selected_ids:
-            try:
-                logger.info(f"⏳ Iniciando sincronización para producto ID: {pid}")
-                datos = buscar_test(pid)  # Incluye inventarios=1
-                if not datos:
-                    logger.warning(f"⚠️ No se obtuvieron datos para ID: {pid}")
-                    error_count += 1
-                    continue
-
-                pdata = datos["inventarios"]
-                # Validar que pdata sea un producto válido y no un error de la API
-                if not isinstance(pdata, dict) or not pdata.get("modelo") or not pdata.get("titulo"):
-                    logger.warning(f"Producto inválido o error de API al sincronizar {pid}: {pdata}")
-                    error_count += 1
-                    continue
-
-                logger.debug(f"📦 Datos obtenidos para ID {pid}")
-
-                with transaction.atomic():
-                    # 1. Marca
-                    marca_nombre = pdata.get("marca", "Genérico")
-                    logger.debug(f"🔖 Procesando marca: {marca_nombre}")
-                    try:
-                        marca, created = Brand.objects.get_or_create(name=marca_nombre)
-                        if created:
-                            logger.info(f"✅ Nueva marca creada: {marca_nombre}")
-                    except Exception as e:
-                        logger.error(f"❌ Error en Brand: {e} | Datos: {marca_nombre}")
-                        raise
-
-                    # 2. Producto principal
-                    logger.debug(f"📦 Creando/actualizando producto ID: {pid}")
-                    try:
-                        producto, created = Product.objects.update_or_create(
-                            syscom_id=pid,
-                            defaults={
-                                "model": pdata.get("modelo", ""),
-                                "title": pdata.get("titulo", ""),
-                                "description": pdata.get("descripcion", ""),
-                                "warranty": pdata.get("garantia", ""),
-                                "brand": marca,
-                                "main_image": pdata.get("img_portada", ""),
-                            },
-                        )
-                        logger.info(f"{'🆕 Creado' if created else '🔄 Actualizado'} producto: {producto.title}")
-                    except Exception as e:
-                        logger.error(f"❌ Error en Product: {e} | Datos: {pid}, {pdata}")
-                        raise
-
-                    # 3. Precios
-                    pr = pdata.get("precios") or {}
-                    if isinstance(pr, list):
-                        pr = pr[0] if pr else {}
-
-                    price_data = {
-                        "normal": float(pr.get("precio_1") or 0),
-                        "special": float(pr.get("precio_especial") or 0),
-                        "discount": float(pr.get("precio_descuento") or 0),
-                        "list_price": float(pr.get("precio_lista") or 0),
-                    }
-                    try:
-                        if not sync_product_price(producto, price_data):
-                            logger.warning(f"⚠️ No se pudieron sincronizar los precios para {pid}")
-                    except Exception as e:
-                        logger.error(f"❌ Error en Price: {e} | Datos: {price_data}")
-                        raise
-
-                    # 4. Existencia por sucursal
-                    sucursales = (
-                        pdata.get("existencia", {})
-                            .get("detalle", {})
-                            .get("nuevo", {})
-                    )
-                    if sucursales:
-                        try:
-                            stock_success = sync_product_stock(producto, sucursales)
-                            logger.debug(f"📦 {stock_success} inventarios sincronizados para {pid}")
-                        except Exception as e:
-                            logger.error(f"❌ Error en BranchStock: {e} | Datos: {sucursales}")
-                            raise
-
-                    # 5. Categorías
-                    for cat in pdata.get("categorias", []):
-                        if isinstance(cat, dict) and cat.get("nombre"):
-                            try:
-                                categoria, _ = Category.objects.get_or_create(
-                                    name=cat["nombre"], 
-                                    defaults={"level": cat.get("nivel", 1)}
-                                )
-                                producto.categories.add(categoria)
-                            except Exception as e:
-                                logger.error(f"❌ Error en Category/ProductCategory: {e} | Datos: {cat}")
-                                raise
-
-                    # 6. Imágenes
-                    for idx, img in enumerate(pdata.get("imagenes", [])):
-                        if "imagen" in img:
-                            try:
-                                ProductImage.objects.get_or_create(
-                                    product=producto,
-                                    url=img["imagen"],
-                                    defaults={"order": idx, "type": "galeria"},
-                                )
-                            except Exception as e:
-                                logger.error(f"❌ Error en ProductImage: {e} | Datos: {img}")
-                                raise
-
-                    # 7. Características
-                    for feat in pdata.get("caracteristicas", []):
-                        try:
-                            Feature.objects.get_or_create(product=producto, text=feat)
-                        except Exception as e:
-                            logger.error(f"❌ Error en Feature: {e} | Datos: {feat}")
-                            raise
-
-                    success_count += 1
-                    logger.info(f"✅ Producto {pid} sincronizado exitosamente")
+    return render(request, "dashboard/admin_sinc.html", {"productos": productos, "siguiente_pagina": siguiente})
 
-            except Exception as e:
-                # Log full traceback to identificar modelo que causa la excepción
-                logger.error(f"❌ Error crítico sincronizando {pid}: {str(e)}", exc_info=True)
-                error_count += 1
-
-        # Mensaje final
-        if success_count > 0:
-            messages.success(request, f"✅ {success_count} productos sincronizados exitosamente")
-        if error_count > 0:
-            messages.warning(request, f"⚠️ {error_count} productos tuvieron errores")
-            
-        return redirect("dashboard:sincronizar")
 
-    return render(request, "dashboard/admin_sinc.html", {"productos": productos})
+@login_required
+@staff_member_required
+def sincronizar_mas_resultados(request):
+    """
+    Devuelve (JSON) las filas HTML de la página `pagina` de la búsqueda `q`
+    para el botón "Cargar más" de `admin_sinc.html`.
+    """
+    query = request.GET.get("q", "").strip()
+    try:
+        pagina = max(1, int(request.GET.get("pagina", 2)))
+        productos, siguiente = buscar_productos_syscom(query, pagina)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Página inválida'}, status=400)
+    except Exception as e:
+        logger.error(f"Error obteniendo página de Syscom: {e}")
+        return JsonResponse({'status': 'error', 'message': 'Error consultando Syscom'}, status=502)
+
+    html = render_to_string("dashboard/admin_sinc_filas.html", {"productos": productos}, request=request)
+    return JsonResponse({'status': 'ok', 'html': html, 'count': len(productos), 'siguiente': siguiente})
+
+
+def _descargas(product_ids, progress: SyncProgress, con_archivo: bool = True, **kwargs):
+    """
+    `fetch_concurrente` de `obtener_producto_syscom` que publica en el
+    progreso el ritmo actual y el estado del circuit breaker, y guarda las
+    respuestas crudas en un segmento de `sync_archivo` (si está activo y
+    `con_archivo`).
+    """
+    limiter = get_rate_limiter()
+    breaker = CircuitBreaker()
+
+    def latido():
+        progress.extra.update(
+            limiter.estado(),
+            breaker=breaker.estado,
+            breaker_resume_in=round(breaker.segundos_restantes()),
+        )
+        progress.guardar()
 
+    descargas = fetch_concurrente(
+        product_ids, obtener_producto_syscom, limiter=limiter, breaker=breaker, latido=latido, **kwargs
+    )
+    if not (ARCHIVO_ACTIVO and con_archivo):
+        return descargas
 
-def sincronizar_inventario_sucursal(product_ids, branch_slug, cache_key=None):
-    """Sincroniza inventario para una sucursal específica."""
-    total = len(product_ids)
-    processed = 0
-    success_count = 0
+    archivo = ArchivoPayloads.nuevo(f"job{progress.job.pk}" if progress.job else "manual")
+    progress.extra["archive"] = archivo.ruta.name
+    return archivar(descargas, archivo)
 
-    for pid in product_ids:
+
+def sincronizar_inventario_sucursal(product_ids, branch_slug=None, progress=None, writer=None, con_archivo=True):
+    """
+    Sincroniza inventario de una sucursal o, con `branch_slug=None`, de todas
+    las que trae `existencia.detalle.nuevo` (una sola petición por producto).
+
+    Sólo escribe `BranchStock` de productos que ya existen, con un upsert por
+    lote. Tras cada lote guarda checkpoint y revisa si se pidió cancelar.
+    `writer` permite otro escritor con el mismo contrato (ver
+    `refrescar_existencias`); `con_archivo=False` no guarda las respuestas
+    crudas.
+    """
+    progress = progress or SyncProgress(total=len(product_ids))
+    writer = writer or ProductBatchWriter(secciones={"stock"}, sucursales={branch_slug} if branch_slug else None)
+    descargas = _descargas(product_ids, progress, con_archivo=con_archivo)
+    lote = []
+
+    for pid, pdata in progress.medir(descargas):
+        error = 0
         try:
-            datos = buscar_test(pid)
-            if not datos:
+            if not isinstance(pdata, dict):
+                progress.registrar_error(pid, "Sin datos de Syscom")
+                error = 1
                 continue
 
-            pdata = datos["inventarios"]
             sucursales = pdata.get("existencia", {}).get("detalle", {}).get("nuevo", {})
-
-            if branch_slug in sucursales:
-                qty = int(sucursales[branch_slug])
-                producto = Product.objects.get(syscom_id=pid)
-                branch = Branch.objects.get(slug=branch_slug)
-                BranchStock.objects.update_or_create(
-                    product=producto,
-                    branch=branch,
-                    defaults={"quantity": qty}
-                )
-                success_count += 1
+            if branch_slug is None or branch_slug in sucursales:
+                with progress.etapa("parse"):
+                    writer.add(pid, pdata)
+            lote.append(pid)
 
         except Exception as e:
             logger.error(f"Error sincronizando inventario de {pid} para {branch_slug}: {e}")
+            progress.registrar_error(pid, e)
+            error = 1
+
+        finally:
+            progress.avance(processed=1, error=error)
+
+        if writer.lleno:
+            _volcar_lote(writer, progress, lote)
+            if progress.cancelacion_solicitada():
+                descargas.close()
+                logger.info(f"🛑 Sincronización de inventario {branch_slug or 'todas'} cancelada")
+                return progress.success_count
+
+    _volcar_lote(writer, progress, lote)
+    progress.guardar(forzar=True)
+    return progress.success_count
+
+
+def refrescar_existencias(product_ids, progress=None):
+    """
+    Refresco rápido de inventario de todas las sucursales: sólo actualiza
+    `BranchStock.quantity` y `Product.last_sync` (ver `StockBatchWriter`).
+
+    No se archiva: corre cada pocos minutos sobre todo el catálogo y sus
+    respuestas no sirven para replay de productos.
+    """
+    return sincronizar_inventario_sucursal(
+        product_ids, None, progress, writer=StockBatchWriter(), con_archivo=False,
+    )
+
+
+def productos_para_refresco(limite: int | None = None) -> list[str]:
+    """
+    IDs de Syscom del catálogo visible en orden de prioridad para el refresco
+    de existencias:
+
+      1) existencia total baja (≤ `SYSCOM_STOCK_LOW_THRESHOLD`), incluidos
+         los agotados;
+      2) existencia que cambió en las últimas `SYSCOM_STOCK_RECENT_HOURS`;
+      3) el resto, empezando por el de `last_sync` más antiguo.
+    """
+    recientes = timezone.now() - timedelta(hours=STOCK_RECENT_HOURS)
+    qs = (
+        Product.objects.filter(visible=True)
+        .annotate(
+            existencia=Coalesce(Sum("branch_stocks__quantity"), 0),
+            ultimo_cambio=Max("branch_stocks__updated_at"),
+        )
+        .annotate(prioridad=Case(
+            When(existencia__lte=STOCK_LOW_THRESHOLD, then=Value(0)),
+            When(ultimo_cambio__gte=recientes, then=Value(1)),
+            default=Value(2),
+        ))
+        .order_by("prioridad", F("last_sync").asc(nulls_first=True), "pk")
+        .values_list("syscom_id", flat=True)
+    )
+    return list(qs[:limite] if limite else qs)
+
+
+def _volcar_lote(writer: ProductBatchWriter, progress: SyncProgress, lote: list) -> None:
+    """
+    Escribe el lote pendiente, suma el resultado al progreso y guarda
+    checkpoint de `lote` (IDs procesados desde el último volcado) salvo los
+    que fallaron al escribir, que se reintentan si el trabajo se reanuda.
+    """
+    with progress.etapa("write"):
+        resultado = writer.flush()
+    if getattr(writer, "simulacion", False):
+        logger.info(f"🔍 {len(resultado['exitosos'])} productos comparados (dry-run)")
+    else:
+        for pid in resultado["exitosos"]:
+            logger.info(f"✅ Producto {pid} sincronizado exitosamente")
+    for pid, error in resultado["errores"].items():
+        logger.error(f"❌ Error crítico sincronizando {pid}: {error}")
+        progress.registrar_error(pid, error)
+    if resultado["sin_cambios"]:
+        logger.info(f"⏭️ {len(resultado['sin_cambios'])} productos sin cambios desde la última sync")
+    progress.avance(ok=len(resultado["exitosos"]), error=len(resultado["errores"]))
+
+    errores = {str(pid) for pid in resultado["errores"]}
+    progress.checkpoint([pid for pid in lote if str(pid) not in errores])
+    lote.clear()
+
+
+def sincronizar_productos_background(selected_ids, progress=None, workers=None, replay=None, forzar=False,
+                                     dry_run=False, precio_extra=None):
+    """
+    Sincroniza productos en background, publicando el avance en `progress`.
+
+    La descarga corre en un pool de `workers` hilos (ver `sync_fetcher`) y la
+    escritura en BD se hace aquí por lotes (ver `sync_writer`), en el orden en
+    que llegan los productos. Tras cada lote se guarda checkpoint y se revisa
+    si se pidió cancelar; los IDs con error no entran al checkpoint.
+
+    `selected_ids` se consume de forma perezosa, así que puede ser un
+    generador (p. ej. `syscom_paginacion.ids_de_paginas`); en ese caso pase
+    `progress` con el total esperado.
 
-        processed += 1
-        if cache_key:
-            cache.set(cache_key, {
-                'total': total, 
-                'processed': processed, 
-                'success_count': success_count,
-                'status': 'running'
-            }, timeout=3600)
-
-    if cache_key:
-        progress = cache.get(cache_key, {})
-        progress.update({
-            'status': 'completed',
-            'success_count': success_count
-        })
-        cache.set(cache_key, progress, timeout=3600)
-
-    return success_count
-
-
-def sincronizar_productos_background(selected_ids, cache_key=None):
-    """Sincroniza productos en background, actualizando progreso en cache."""
-    total = len(selected_ids)
-    processed = 0
-    success_count = 0
-    error_count = 0
+    Con `replay` (segmento de `sync_archivo`) los productos se leen del
+    archivo en lugar de Syscom; `selected_ids=None` toma todos los del
+    segmento. `forzar=True` reescribe todas las secciones aunque sus hashes
+    no hayan cambiado (útil tras cambiar la normalización).
+
+    `precio_extra` son campos que se fijan en `Price` en cada escritura; por
+    defecto no se tocan el margen ni el descuento que el admin haya ajustado
+    a mano (los precios nuevos toman los valores por defecto del modelo).
+
+    Con `dry_run=True` no se escribe nada: cada lote se compara contra la BD
+    (ver `SyncDiff`) y el conteo por modelo y campo queda en
+    `progress.extra["diff"]`.
+
+    Returns
+    -------
+    tuple[int, int]
+        (exitosos, con error)
+    """
+    progress = progress or SyncProgress(total=len(selected_ids))
+    fetch_kwargs = {"workers": workers} if workers else {}
+    if dry_run:
+        writer = SyncDiff(forzar=forzar)
+    else:
+        writer = ProductBatchWriter(precio_extra=precio_extra, forzar=forzar)
+    if replay:
+        descargas = leer_segmento(resolver_segmento(replay), solo=selected_ids)
+    else:
+        descargas = _descargas(selected_ids, progress, **fetch_kwargs)
+    lote = []
  
-    for pid in selected_ids:
+    for pid, pdata in progress.medir(descargas):
+        error = 0
         try:
             logger.info(f"⏳ Iniciando sincronización para producto ID: {pid}")
-            datos = buscar_test(pid)
-            if not datos:
+            if not pdata:
                 logger.warning(f"⚠️ No se obtuvieron datos para ID: {pid}")
-                error_count += 1
+                progress.registrar_error(pid, "Sin datos de Syscom")
+                error = 1
                 continue
-            pdata = datos["inventarios"]
-            if not isinstance(pdata, dict) or not pdata.get("modelo") or not pdata.get("titulo"):
+            with progress.etapa("parse"):
+                agregado = writer.add(pid, pdata)
+            if not agregado:
                 logger.warning(f"Producto inválido o error de API al sincronizar {pid}: {pdata}")
-                error_count += 1
-                continue
-            logger.debug(f"📦 Datos obtenidos para ID {pid}")
-            with transaction.atomic():
-                marca_nombre = pdata.get("marca", "Genérico")
-                logger.debug(f"🔖 Procesando marca: {marca_nombre}")
-                try:
-                    marca, created = Brand.objects.get_or_create(name=marca_nombre)
-                    if created:
-                        logger.info(f"✅ Nueva marca creada: {marca_nombre}")
-                except Exception as e:
-                    logger.error(f"❌ Error en Brand: {e} | Datos: {marca_nombre}")
-                    raise
-                logger.debug(f"📦 Creando/actualizando producto ID: {pid}")
-                try:
-                    producto, created = Product.objects.update_or_create(
-                        syscom_id=pid,
-                        defaults={
-                            "model": pdata.get("modelo", ""),
-                            "title": pdata.get("titulo", ""),
-                            "description": pdata.get("descripcion", ""),
-                            "warranty": pdata.get("garantia", ""),
-                            "brand": marca,
-                            "main_image": pdata.get("img_portada", ""),
-                        },
-                    )
-                    logger.info(f"{'🆕 Creado' if created else '🔄 Actualizado'} producto: {producto.title}")
-                except Exception as e:
-                    logger.error(f"❌ Error en Product: {e} | Datos: {pid}, {pdata}")
-                    raise
-                pr = pdata.get("precios") or {}
-                if isinstance(pr, list):
-                    pr = pr[0] if pr else {}
-                price_data = {
-                    "normal": float(pr.get("precio_1") or 0),
-                    "special": float(pr.get("precio_especial") or 0),
-                    "discount": float(pr.get("precio_descuento") or 0),
-                    "list_price": float(pr.get("precio_lista") or 0),
-                    'margen_prod': 0.20,
-                    'descuento_prod': 0.0
-                }
-                try:
-                    if not sync_product_price(producto, price_data):
-                        logger.warning(f"⚠️ No se pudieron sincronizar los precios para {pid}")
-                except Exception as e:
-                    logger.error(f"❌ Error en Price: {e} | Datos: {price_data}")
-                    raise
-                sucursales = pdata.get("existencia", {}).get("detalle", {}).get("nuevo", {})
-                if sucursales:
-                    try:
-                        stock_success = sync_product_stock(producto, sucursales)
-                        logger.debug(f"📦 {stock_success} inventarios sincronizados para {pid}")
-                    except Exception as e:
-                        logger.error(f"❌ Error en BranchStock: {e} | Datos: {sucursales}")
-                        raise
-                for cat in pdata.get("categorias", []):
-                    if isinstance(cat, dict) and cat.get("nombre"):
-                        try:
-                            categoria, _ = Category.objects.get_or_create(
-                                name=cat["nombre"],
-                                defaults={"level": cat.get("nivel", 1)}
-                            )
-                            producto.categories.add(categoria)
-                        except Exception as e:
-                            logger.error(f"❌ Error en Category/ProductCategory: {e} | Datos: {cat}")
-                            raise
-                for idx, img in enumerate(pdata.get("imagenes", [])):
-                    if "imagen" in img:
-                        try:
-                            ProductImage.objects.get_or_create(
-                                product=producto,
-                                url=img["imagen"],
-                                defaults={"order": idx, "type": "galeria"},
-                            )
-                        except Exception as e:
-                            logger.error(f"❌ Error en ProductImage: {e} | Datos: {img}")
-                            raise
-                for feat in pdata.get("caracteristicas", []):
-                    try:
-                        Feature.objects.get_or_create(product=producto, text=feat)
-                    except Exception as e:
-                        logger.error(f"❌ Error en Feature: {e} | Datos: {feat}")
-                        raise
-                success_count += 1
-                logger.info(f"✅ Producto {pid} sincronizado exitosamente")
+                progress.registrar_error(pid, "Producto inválido o error de API")
+                error = 1
+            else:
+                lote.append(pid)
         except Exception as e:
             logger.error(f"❌ Error crítico sincronizando {pid}: {str(e)}", exc_info=True)
-            error_count += 1
- 
-        processed += 1
-        if cache_key:
-            cache.set(cache_key, {
-                'total': total,
-                'processed': processed,
-                'success_count': success_count,
-                'error_count': error_count,
-                'status': 'running'
-            }, timeout=3600)
- 
-    if cache_key:
-        progress = cache.get(cache_key, {})
-        progress.update({
-            'status': 'completed',
-            'success_count': success_count,
-            'error_count': error_count
-        })
-        cache.set(cache_key, progress, timeout=3600)
- 
-    return success_count, error_count
+            progress.registrar_error(pid, e)
+            error = 1
+        finally:
+            progress.avance(processed=1, error=error)
+
+        if writer.lleno:
+            _volcar_lote(writer, progress, lote)
+            if progress.cancelacion_solicitada():
+                descargas.close()
+                logger.info("🛑 Sincronización de productos cancelada")
+                break
+    else:
+        _volcar_lote(writer, progress, lote)
+
+    if dry_run:
+        progress.extra["diff"] = writer.resumen()
+    elif progress.success_count:
+        invalidar_catalogo()   # facetas y totales del catálogo público
+    progress.guardar(forzar=True)
+    return progress.success_count, progress.error_count
 
 
 # --- BLOQUE FUNCIONES DE PRUEBA / DEBUG --------------------------------------
@@ -652,15 +567,16 @@ def buscar_test(identificador: str) -> dict | None:
     """
     Devuelve la respuesta cruda de Syscom para inspección.
     Incluye la variante con `inventarios=1`.
+
+    Sólo para depuración (`sincronizar_test`): hace dos peticiones por
+    producto. Las sincronizaciones usan `obtener_producto_syscom`.
     """
     try:
-        headers = _get_auth_headers()
-
         url_base = f"{API_PRODUCTOS_URL}/{identificador}"
-        data_basica = requests.get(url_base, headers=headers, timeout=15).json()
+        data_basica = get_autenticado(url_base).json()
 
         url_inv = f"{url_base}?inventarios=1"
-        data_inv = requests.get(url_inv, headers=headers, timeout=15).json()
+        data_inv = get_autenticado(url_inv).json()
 
         return {"basico": data_basica, "inventarios": data_inv}
 
@@ -716,21 +632,22 @@ def start_product_sync(request):
         if not selected_ids:
             return JsonResponse({'status': 'error', 'message': 'No products selected'}, status=400)
  
-        cache_key = f'product_sync_progress_{request.user.id}'
-        cache.set(cache_key, {'total': len(selected_ids), 'processed': 0, 'success_count': 0, 'error_count': 0, 'status': 'running'}, timeout=3600)
- 
-        def run_sync():
-            sincronizar_productos_background(selected_ids, cache_key)
- 
-        threading.Thread(target=run_sync).start()
+        job = SyncJob.objects.create(
+            kind=SyncJob.Kind.PRODUCTOS,
+            user=request.user,
+            total=len(selected_ids),
+            params={'product_ids': selected_ids},
+        )
+        encolar_sync_job(job)
  
-        return JsonResponse({'status': 'started'})
+        return JsonResponse({'status': 'started', 'job_id': job.pk})
  
     return JsonResponse({'status': 'error', 'message': 'Invalid method'}, status=405)
  
 @login_required
 @staff_member_required
 def get_product_sync_progress(request):
-    cache_key = f'product_sync_progress_{request.user.id}'
-    progress = cache.get(cache_key, {'total': 0, 'processed': 0, 'success_count': 0, 'error_count': 0, 'status': 'idle'})
+    # El progreso vive en el SyncJob (BD): visible desde cualquier proceso
+    job = SyncJob.latest_for(request.user, SyncJob.Kind.PRODUCTOS)
+    progress = job.as_progress() if job else {'total': 0, 'processed': 0, 'success_count': 0, 'error_count': 0, 'status': 'idle'}
     return JsonResponse(progress)
\ No newline at end of file
@@ -0,0 +1,244 @@
+# file: dashboard/historial.py
+# -----------------------------------------------------------------------------
+# Historial de precios y existencias.
+#
+#   • `PriceHistory` / `StockHistory`: sólo se agrega una fila cuando el valor
+#     cambia; las escribe `sync_writer` por lote con `bulk_create`.
+#   • `PriceDaily` / `StockDaily`: resumen por día (mín / máx / cierre /
+#     número de cambios) que calcula `consolidar_historial`. Las gráficas y la
+#     consulta de "bajó de precio" leen estos resúmenes, no las filas crudas.
+#
+# Los resúmenes sólo tienen días con cambios: el valor de un día sin fila es
+# el cierre del último día anterior que sí tiene.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import logging
+from datetime import datetime, time, timedelta
+from itertools import groupby
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connection
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+
+from products.models import PriceDaily, PriceHistory, Product, StockDaily, StockHistory
+
+logger = logging.getLogger(__name__)
+
+
+# --- BLOQUE REGISTRO ---------------------------------------------------------
+
+
+def registrar_precios(previos: dict, precios, ahora=None) -> int:
+    """
+    Agrega a `PriceHistory` los `precios` (objetos `Price`) cuyo descuento o
+    precio de lista difiere de `previos` ({product_id: (discount, list_price)}).
+    """
+    ahora = ahora or timezone.now()
+    filas = [
+        PriceHistory(product_id=p.product_id, recorded_at=ahora, discount=p.discount, list_price=p.list_price)
+        for p in precios
+        if previos.get(p.product_id) != (p.discount, p.list_price)
+    ]
+    PriceHistory.objects.bulk_create(filas, batch_size=500)
+    return len(filas)
+
+
+def registrar_existencias(cambios, ahora=None) -> int:
+    """Agrega a `StockHistory` las tuplas `(product_id, branch_id, quantity)`."""
+    ahora = ahora or timezone.now()
+    filas = [
+        StockHistory(product_id=product_id, branch_id=branch_id, quantity=qty, recorded_at=ahora)
+        for product_id, branch_id, qty in cambios
+    ]
+    StockHistory.objects.bulk_create(filas, batch_size=500)
+    return len(filas)
+
+
+# --- BLOQUE RESÚMENES DIARIOS ------------------------------------------------
+
+
+def _rango_dia(dia):
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    return inicio, inicio + timedelta(days=1)
+
+
+def _guardar(model, objs, unique_fields, update_fields):
+    # Mismo upsert portable que sync_writer (MySQL no admite unique_fields)
+    if not objs:
+        return
+    kwargs = {"update_conflicts": True, "update_fields": update_fields}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = unique_fields
+    model.objects.bulk_create(objs, batch_size=500, **kwargs)
+
+
+def consolidar_historial(dia=None) -> tuple[int, int]:
+    """
+    Recalcula `PriceDaily` y `StockDaily` de `dia` (hoy por defecto) a partir
+    de las filas crudas de ese día. Es idempotente.
+
+    Returns
+    -------
+    tuple[int, int]
+        (productos con precio resumido, pares producto/sucursal resumidos)
+    """
+    dia = dia or timezone.localdate()
+    inicio, fin = _rango_dia(dia)
+
+    precios = (
+        PriceHistory.objects.filter(recorded_at__gte=inicio, recorded_at__lt=fin)
+        .order_by("product_id", "recorded_at", "pk")
+        .values_list("product_id", "discount", "list_price")
+        .iterator(chunk_size=2000)
+    )
+    diarios = []
+    for product_id, filas in groupby(precios, key=lambda fila: fila[0]):
+        filas = list(filas)
+        descuentos = [f[1] for f in filas if f[1] is not None]
+        diarios.append(PriceDaily(
+            product_id=product_id,
+            day=dia,
+            discount_min=min(descuentos, default=None),
+            discount_max=max(descuentos, default=None),
+            discount_close=filas[-1][1],
+            list_price_close=filas[-1][2],
+            changes=len(filas),
+        ))
+    _guardar(
+        PriceDaily, diarios, ["product", "day"],
+        ["discount_min", "discount_max", "discount_close", "list_price_close", "changes"],
+    )
+
+    existencias = (
+        StockHistory.objects.filter(recorded_at__gte=inicio, recorded_at__lt=fin)
+        .order_by("product_id", "branch_id", "recorded_at", "pk")
+        .values_list("product_id", "branch_id", "quantity")
+        .iterator(chunk_size=2000)
+    )
+    diarias = []
+    for (product_id, branch_id), filas in groupby(existencias, key=lambda fila: fila[:2]):
+        cantidades = [f[2] for f in filas]
+        diarias.append(StockDaily(
+            product_id=product_id,
+            branch_id=branch_id,
+            day=dia,
+            quantity_min=min(cantidades),
+            quantity_max=max(cantidades),
+            quantity_close=cantidades[-1],
+            changes=len(cantidades),
+        ))
+    _guardar(
+        StockDaily, diarias, ["product", "branch", "day"],
+        ["quantity_min", "quantity_max", "quantity_close", "changes"],
+    )
+
+    logger.info(f"📈 Historial {dia}: {len(diarios)} precios y {len(diarias)} existencias resumidos")
+    return len(diarios), len(diarias)
+
+
+# --- BLOQUE CONSULTAS --------------------------------------------------------
+
+
+def bajadas_de_precio(dias: int = 7):
+    """
+    Productos cuyo último cierre de precio (con descuento) en los últimos
+    `dias` es menor al último cierre anterior a ese periodo. Sólo lee
+    `PriceDaily`; ordenados por mayor baja porcentual.
+    """
+    desde = timezone.localdate() - timedelta(days=dias)
+    cierres = PriceDaily.objects.filter(product=OuterRef("pk")).order_by("-day").values("discount_close")
+    decimal = DecimalField(max_digits=12, decimal_places=2)
+
+    return (
+        Product.objects
+        .filter(pk__in=PriceDaily.objects.filter(day__gte=desde).values("product_id"))
+        .annotate(
+            precio_actual=Subquery(cierres.filter(day__gte=desde)[:1], output_field=decimal),
+            precio_anterior=Subquery(cierres.filter(day__lt=desde)[:1], output_field=decimal),
+        )
+        .filter(precio_actual__lt=F("precio_anterior"))
+        .annotate(baja=ExpressionWrapper(
+            (F("precio_anterior") - F("precio_actual")) * 100 / F("precio_anterior"),
+            output_field=DecimalField(max_digits=7, decimal_places=2),
+        ))
+        .select_related("brand")
+        .order_by("-baja", "pk")
+    )
+
+
+def serie_producto(product_id: int, dias: int = 90) -> dict:
+    """
+    Serie diaria de precio y existencia total de un producto para gráficas,
+    desde los resúmenes. Los días sin cambios repiten el cierre anterior.
+
+    Sólo lee los resúmenes de la ventana más el último cierre previo de cada
+    serie (precio y cada sucursal), así que el costo no crece con el historial.
+    """
+    hoy = timezone.localdate()
+    desde = hoy - timedelta(days=dias)
+
+    precios = dict(
+        PriceDaily.objects.filter(product_id=product_id, day__gte=desde, day__lte=hoy)
+        .order_by("day").values_list("day", "discount_close")
+    )
+    existencias = {}
+    for dia, branch_id, qty in (
+        StockDaily.objects.filter(product_id=product_id, day__gte=desde, day__lte=hoy)
+        .order_by("day").values_list("day", "branch_id", "quantity_close")
+    ):
+        existencias.setdefault(dia, {})[branch_id] = qty
+
+    # Cierres anteriores a la ventana: el punto de partida del arrastre
+    precio = (
+        PriceDaily.objects.filter(product_id=product_id, day__lt=desde)
+        .order_by("-day").values_list("discount_close", flat=True).first()
+    )
+    ultimo_dia = (
+        StockDaily.objects.filter(product_id=product_id, branch_id=OuterRef("branch_id"), day__lt=desde)
+        .order_by("-day").values("day")[:1]
+    )
+    por_sucursal = dict(
+        StockDaily.objects.filter(product_id=product_id, day=Subquery(ultimo_dia))
+        .values_list("branch_id", "quantity_close")
+    )
+
+    serie = []
+    for n in range(dias + 1):
+        dia = desde + timedelta(days=n)
+        precio = precios.get(dia, precio)
+        por_sucursal.update(existencias.get(dia, {}))
+        serie.append({
+            "day": dia.isoformat(),
+            "price": str(precio) if precio is not None else None,
+            "stock": sum(por_sucursal.values()),
+        })
+    return {"product_id": product_id, "series": serie}
+
+
+# --- BLOQUE VISTAS -----------------------------------------------------------
+
+
+@staff_member_required
+def historial_bajadas_precio(request):
+    try:
+        dias = max(1, min(int(request.GET.get("dias", 7)), 365))
+    except ValueError:
+        dias = 7
+    return render(request, "dashboard/historial_precios.html", {
+        "productos": bajadas_de_precio(dias)[:100],
+        "dias": dias,
+    })
+
+
+@staff_member_required
+def historial_producto(request, product_id):
+    producto = get_object_or_404(Product, pk=product_id)
+    try:
+        dias = max(1, min(int(request.GET.get("dias", 90)), 730))
+    except ValueError:
+        dias = 90
+    return JsonResponse(serie_producto(producto.pk, dias))
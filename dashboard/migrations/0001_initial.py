@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('productos', 'Productos'), ('inventario', 'Inventario por sucursal')], max_length=20, verbose_name='Tipo')),
+                ('status', models.CharField(choices=[('pending', 'En cola'), ('running', 'En ejecución'), ('completed', 'Completado'), ('failed', 'Fallido')], db_index=True, default='pending', max_length=20, verbose_name='Estado')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('task_id', models.CharField(blank=True, max_length=255, verbose_name='ID de tarea')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Procesados')),
+                ('success_count', models.PositiveIntegerField(default=0, verbose_name='Exitosos')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Con error')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Creado')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Inicio')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sync_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de sincronización',
+                'verbose_name_plural': 'Trabajos de sincronización',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'kind', '-created_at'], name='dashboard_s_user_id_697f7c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncjob',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Estadísticas'),
+        ),
+        migrations.AddField(
+            model_name='syncjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Actualizado'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_syncjob_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncjob',
+            name='cancel_requested',
+            field=models.BooleanField(default=False, verbose_name='Cancelación solicitada'),
+        ),
+        migrations.AddField(
+            model_name='syncjob',
+            name='checkpoint',
+            field=models.JSONField(blank=True, default=list, verbose_name='IDs procesados'),
+        ),
+        migrations.AlterField(
+            model_name='syncjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'En cola'), ('running', 'En ejecución'), ('completed', 'Completado'), ('failed', 'Fallido'), ('cancelled', 'Cancelado')], db_index=True, default='pending', max_length=20, verbose_name='Estado'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_syncjob_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='syncjob',
+            name='kind',
+            field=models.CharField(choices=[('productos', 'Productos'), ('inventario', 'Inventario por sucursal'), ('existencias', 'Refresco de existencias')], max_length=20, verbose_name='Tipo'),
+        ),
+    ]
@@ -1,3 +1,108 @@
+# file: dashboard/models.py
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+# ------------------------------------------------------------------
+# Trabajos de sincronización con Syscom (cola de tareas)
+# ------------------------------------------------------------------
+class SyncJob(models.Model):
+    class Kind(models.TextChoices):
+        PRODUCTOS = 'productos', _('Productos')
+        INVENTARIO = 'inventario', _('Inventario por sucursal')
+        EXISTENCIAS = 'existencias', _('Refresco de existencias')
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('En cola')
+        RUNNING = 'running', _('En ejecución')
+        COMPLETED = 'completed', _('Completado')
+        FAILED = 'failed', _('Fallido')
+        CANCELLED = 'cancelled', _('Cancelado')
+
+    kind = models.CharField(max_length=20, choices=Kind.choices, verbose_name=_("Tipo"))
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True,
+        verbose_name=_("Estado")
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="sync_jobs",
+        verbose_name=_("Usuario")
+    )
+    # Parámetros del trabajo: IDs de Syscom, sucursal, etc.
+    params = models.JSONField(default=dict, blank=True, verbose_name=_("Parámetros"))
+    task_id = models.CharField(max_length=255, blank=True, verbose_name=_("ID de tarea"))
+
+    # Contadores
+    total = models.PositiveIntegerField(default=0, verbose_name=_("Total"))
+    processed = models.PositiveIntegerField(default=0, verbose_name=_("Procesados"))
+    success_count = models.PositiveIntegerField(default=0, verbose_name=_("Exitosos"))
+    error_count = models.PositiveIntegerField(default=0, verbose_name=_("Con error"))
+    error = models.TextField(blank=True, verbose_name=_("Error"))
+    # Reanudación: IDs ya escritos en BD (se guardan al confirmar cada lote)
+    checkpoint = models.JSONField(default=list, blank=True, verbose_name=_("IDs procesados"))
+    # Cancelación: el worker lo revisa entre lotes
+    cancel_requested = models.BooleanField(default=False, verbose_name=_("Cancelación solicitada"))
+    # Métricas en vivo: productos/seg, ETA, tiempo por etapa, errores recientes
+    stats = models.JSONField(default=dict, blank=True, verbose_name=_("Estadísticas"))
+
+    # Tiempos
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_("Creado"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Inicio"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Fin"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Actualizado"))
+
+    class Meta:
+        verbose_name = _("Trabajo de sincronización")
+        verbose_name_plural = _("Trabajos de sincronización")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['user', 'kind', '-created_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def duration(self):
+        if not self.started_at:
+            return None
+        return (self.finished_at or timezone.now()) - self.started_at
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (self.Status.PENDING, self.Status.RUNNING)
+
+    @property
+    def can_resume(self) -> bool:
+        return self.status in (self.Status.FAILED, self.Status.CANCELLED) and bool(self.pending_ids())
+
+    def pending_ids(self) -> list:
+        """IDs del trabajo que aún no llegan a un checkpoint, en su orden original."""
+        hechos = set(self.checkpoint)
+        return [pid for pid in (self.params or {}).get('product_ids', []) if pid not in hechos]
+
+    def as_progress(self) -> dict:
+        """Mismo formato que consumen las plantillas de progreso."""
+        return {
+            **self.stats,
+            'job_id': self.pk,
+            'total': self.total,
+            'processed': self.processed,
+            'success_count': self.success_count,
+            'error_count': self.error_count,
+            'status': 'running' if self.is_active else self.status,
+            'can_resume': self.can_resume,
+        }
+
+    @classmethod
+    def latest_for(cls, user, kind):
+        return cls.objects.filter(user=user, kind=kind).order_by('-created_at').first()
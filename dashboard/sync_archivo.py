@@ -0,0 +1,169 @@
+# file: dashboard/sync_archivo.py
+# -----------------------------------------------------------------------------
+# Archivo local de respuestas crudas de Syscom.
+#
+# Cada sincronización escribe un segmento JSONL comprimido (gzip, o zstd si
+# está instalado `zstandard` y se configura) con una línea por producto:
+#
+#     {"producto_id": "12345", "fetched_at": "...", "payload": {...}}
+#
+# El modo "replay" lee un segmento en lugar de la red y entrega los mismos
+# `(pid, pdata)` que `fetch_concurrente`, de modo que se puede volver a
+# normalizar y escribir en BD (p. ej. tras un cambio de esquema) o medir la
+# etapa de escritura sin gastar cuota de la API ni depender de la latencia.
+#
+# Los segmentos con más de `SYSCOM_ARCHIVE_RETENTION_DAYS` días se borran con
+# `purgar_segmentos` (tarea diaria `limpieza_programada`).
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import gzip
+import io
+import json
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    import zstandard
+except ImportError:
+    # zstd es opcional; sin él se usa gzip
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVO_DIR = Path(getattr(settings, "SYSCOM_ARCHIVE_DIR", Path(settings.BASE_DIR) / "var" / "syscom_archive"))
+ARCHIVO_ACTIVO = getattr(settings, "SYSCOM_ARCHIVE_PAYLOADS", True)
+ARCHIVO_FORMATO = getattr(settings, "SYSCOM_ARCHIVE_FORMAT", "gz")   # "gz" | "zst"
+ARCHIVO_RETENCION_DIAS = getattr(settings, "SYSCOM_ARCHIVE_RETENTION_DAYS", 14)   # 0 = no borrar
+
+
+# --- BLOQUE APERTURA ---------------------------------------------------------
+
+
+def _abrir(ruta: Path, modo: str):
+    """Abre un segmento en texto ("r" / "w") según su extensión."""
+    if ruta.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("Instale `zstandard` para leer/escribir segmentos .zst")
+        if modo == "w":
+            crudo = zstandard.ZstdCompressor(level=3).stream_writer(open(ruta, "wb"))
+        else:
+            crudo = zstandard.ZstdDecompressor().stream_reader(open(ruta, "rb"))
+        return io.TextIOWrapper(crudo, encoding="utf-8")
+    return gzip.open(ruta, f"{modo}t", encoding="utf-8", compresslevel=6)
+
+
+# --- BLOQUE ESCRITURA --------------------------------------------------------
+
+
+class ArchivoPayloads:
+    """
+    Segmento de una corrida; se escribe línea por línea y se cierra al final.
+
+    El archivo se abre con la primera respuesta: una corrida que no llega a
+    descargar nada (o cuyo generador nunca se recorre) no deja un segmento
+    vacío ni un descriptor abierto.
+    """
+
+    def __init__(self, ruta: Path):
+        self.ruta = ruta
+        self.registros = 0
+        self._fh = None
+
+    @classmethod
+    def nuevo(cls, etiqueta: str = "manual", formato: str = ARCHIVO_FORMATO) -> "ArchivoPayloads":
+        if formato == "zst" and zstandard is None:
+            logger.warning("⚠️ zstandard no está instalado; el archivo se guarda en gzip")
+            formato = "gz"
+        nombre = f"{timezone.now():%Y%m%d-%H%M%S}-{etiqueta}.jsonl.{formato}"
+        return cls(ARCHIVO_DIR / nombre)
+
+    def escribir(self, pid, payload: dict) -> None:
+        if self._fh is None:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = _abrir(self.ruta, "w")
+        linea = {"producto_id": str(pid), "fetched_at": timezone.now().isoformat(), "payload": payload}
+        self._fh.write(json.dumps(linea, ensure_ascii=False, separators=(",", ":")))
+        self._fh.write("\n")
+        self.registros += 1
+
+    def cerrar(self) -> None:
+        if self._fh is not None and not self._fh.closed:
+            self._fh.close()
+            logger.info(f"🗄️ {self.registros} respuestas archivadas en {self.ruta}")
+
+
+def archivar(descargas: Iterator, archivo: ArchivoPayloads) -> Iterator:
+    """Pasa `(pid, pdata)` sin cambios guardando cada respuesta en `archivo`."""
+    try:
+        for pid, pdata in descargas:
+            if pdata:
+                archivo.escribir(pid, pdata)
+            yield pid, pdata
+    finally:
+        archivo.cerrar()
+        if hasattr(descargas, "close"):
+            descargas.close()
+
+
+# --- BLOQUE REPLAY -----------------------------------------------------------
+
+
+def resolver_segmento(nombre: str) -> Path:
+    """Acepta una ruta o el nombre de un segmento dentro de `ARCHIVO_DIR`."""
+    ruta = Path(nombre)
+    if not ruta.exists():
+        ruta = ARCHIVO_DIR / nombre
+    if not ruta.exists():
+        raise FileNotFoundError(f"No existe el segmento {nombre}")
+    return ruta
+
+
+def leer_segmento(ruta: Path, solo: Iterable | None = None) -> Iterator[tuple[str, dict]]:
+    """
+    Entrega `(pid, pdata)` del segmento, como lo haría `fetch_concurrente`.
+
+    Con `solo` se filtran los IDs indicados.
+    """
+    filtro = {str(pid) for pid in solo} if solo is not None else None
+    with _abrir(ruta, "r") as fh:
+        for linea in fh:
+            if not linea.strip():
+                continue
+            registro = json.loads(linea)
+            pid = registro["producto_id"]
+            if filtro is None or pid in filtro:
+                yield pid, registro["payload"]
+
+
+def contar_registros(ruta: Path) -> int:
+    with _abrir(ruta, "r") as fh:
+        return sum(1 for linea in fh if linea.strip())
+
+
+# --- BLOQUE RETENCIÓN --------------------------------------------------------
+
+
+def purgar_segmentos(dias: int | None = None) -> int:
+    """
+    Borra los segmentos de `ARCHIVO_DIR` modificados hace más de `dias`
+    (por defecto `ARCHIVO_RETENCION_DIAS`; 0 = no borra nada). Devuelve
+    cuántos se borraron.
+    """
+    dias = ARCHIVO_RETENCION_DIAS if dias is None else dias
+    if not dias or not ARCHIVO_DIR.is_dir():
+        return 0
+    limite = time.time() - dias * 86400
+    borrados = 0
+    for ruta in ARCHIVO_DIR.glob("*.jsonl.*"):
+        if ruta.is_file() and ruta.stat().st_mtime < limite:
+            ruta.unlink(missing_ok=True)
+            borrados += 1
+    if borrados:
+        logger.info(f"🧹 {borrados} segmentos de archivo con más de {dias} días borrados")
+    return borrados
@@ -0,0 +1,398 @@
+# file: dashboard/sync_fetcher.py
+# -----------------------------------------------------------------------------
+# Etapa de descarga concurrente para la sincronización de productos.
+#
+#   • Un pool de hilos con número de workers configurable descarga productos
+#     de Syscom en paralelo (las peticiones HTTP liberan el GIL).
+#   • Un token-bucket compartido limita las peticiones por segundo para
+#     respetar la cuota de la API sin importar cuántos workers haya. El ritmo
+#     se adapta (AIMD): sube poco a poco mientras Syscom responde rápido y se
+#     reduce a la mitad ante 429 / 5xx / latencia alta; `Retry-After` pausa
+#     todas las descargas el tiempo indicado.
+#   • Un circuit breaker pausa el trabajo completo cuando Syscom falla varias
+#     veces seguidas, en lugar de marcar cientos de productos como error. Si
+#     no se recupera tras varios intentos lanza `CircuitoAbierto` (el trabajo
+#     queda fallido y se puede reanudar desde su checkpoint).
+#   • Los resultados se entregan en orden de llegada a la etapa de escritura
+#     en BD, que sigue corriendo en el hilo que llama.
+#   • Las esperas de los workers (circuito abierto, `Retry-After`, ritmo) se
+#     hacen sobre un `threading.Event` que se activa al cerrar el generador:
+#     cancelar un trabajo no tiene que esperar a que termine una pausa.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from dashboard.syscom_client import SyscomSaturado
+
+logger = logging.getLogger(__name__)
+
+# Valores por defecto (se pueden sobreescribir en settings / .env)
+SYNC_WORKERS = getattr(settings, "SYSCOM_SYNC_WORKERS", 4)
+SYNC_RATE_LIMIT = getattr(settings, "SYSCOM_RATE_LIMIT", 5.0)     # peticiones / segundo
+SYNC_RATE_BURST = getattr(settings, "SYSCOM_RATE_BURST", 5)       # ráfaga máxima
+SYNC_RATE_MIN = getattr(settings, "SYSCOM_RATE_MIN", 0.5)         # piso al reducir el ritmo
+LATENCIA_OBJETIVO = getattr(settings, "SYSCOM_LATENCIA_OBJETIVO", 2.0)  # segundos
+INCREMENTO_RATE = 0.05      # peticiones/seg que se suman por respuesta exitosa
+# Reintentos de un producto ante 429 / 5xx. Alcanza para esperar todas las
+# aperturas del breaker: durante una caída el que abandona es el trabajo, no
+# cada producto por separado.
+REINTENTOS_SATURACION = 8
+
+BREAKER_UMBRAL = 5          # fallos seguidos para abrir el circuito
+BREAKER_ENFRIAMIENTO = 30.0  # segundos de pausa (se duplica en cada apertura)
+BREAKER_ENFRIAMIENTO_MAX = 300.0
+BREAKER_MAX_APERTURAS = 5   # aperturas seguidas antes de abandonar el trabajo
+
+
+class DescargaInterrumpida(Exception):
+    """El generador de descargas se cerró mientras un worker esperaba."""
+
+
+def _dormir(segundos: float, detener: threading.Event | None) -> None:
+    """`time.sleep` que se interrumpe al activarse `detener`."""
+    if detener is None:
+        time.sleep(segundos)
+    elif detener.wait(segundos):
+        raise DescargaInterrumpida()
+
+
+# --- BLOQUE TOKEN BUCKET -----------------------------------------------------
+
+
+class TokenBucket:
+    """
+    Limitador token-bucket seguro entre hilos.
+
+    Se recargan `rate` fichas por segundo hasta `capacity`; cada petición
+    consume una y `acquire()` bloquea hasta que haya ficha disponible.
+    """
+
+    def __init__(self, rate: float = SYNC_RATE_LIMIT, capacity: int = SYNC_RATE_BURST):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, detener: threading.Event | None = None) -> None:
+        """Bloquea hasta obtener una ficha (o hasta que se active `detener`)."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.rate
+            _dormir(espera, detener)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Token-bucket cuyo ritmo se ajusta con AIMD.
+
+    • Respuesta exitosa y latencia promedio bajo el objetivo → `rate` sube
+      `INCREMENTO_RATE` hasta el máximo configurado.
+    • 429 / 5xx o latencia alta → `rate` se divide entre 2 (como mucho una
+      vez por segundo, para que una ráfaga de errores no lo hunda al mínimo).
+    • `Retry-After` → nadie obtiene ficha hasta que pase ese tiempo.
+    """
+
+    def __init__(self, rate: float = SYNC_RATE_LIMIT, capacity: int = SYNC_RATE_BURST,
+                 min_rate: float = SYNC_RATE_MIN, latencia_objetivo: float = LATENCIA_OBJETIVO):
+        super().__init__(rate, capacity)
+        self.max_rate = self.rate
+        self.min_rate = min(float(min_rate), self.rate)
+        self.latencia_objetivo = latencia_objetivo
+        self.latencia = None          # promedio móvil exponencial
+        self._pausa_hasta = 0.0
+        self._ultimo_recorte = 0.0
+
+    def acquire(self, detener: threading.Event | None = None) -> None:
+        while (espera := self._pausa_hasta - time.monotonic()) > 0:
+            _dormir(espera, detener)
+        super().acquire(detener)
+
+    def registrar_exito(self, latencia: float) -> None:
+        with self._lock:
+            self._refill()
+            self.latencia = latencia if self.latencia is None else 0.8 * self.latencia + 0.2 * latencia
+            if self.latencia > self.latencia_objetivo:
+                self._recortar()
+            else:
+                self.rate = min(self.max_rate, self.rate + INCREMENTO_RATE)
+
+    def registrar_saturacion(self, retry_after: float | None = None) -> None:
+        with self._lock:
+            self._refill()
+            self._recortar()
+            if retry_after:
+                self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + retry_after)
+
+    def _recortar(self) -> None:
+        ahora = time.monotonic()
+        if ahora - self._ultimo_recorte < 1.0:
+            return
+        self._ultimo_recorte = ahora
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def estado(self) -> dict:
+        return {
+            "rate_limit": round(self.rate, 2),
+            "latency_avg": round(self.latencia, 3) if self.latencia is not None else None,
+        }
+
+
+# Un único limitador por proceso: varias sincronizaciones simultáneas
+# comparten la misma cuota de Syscom.
+_bucket = AdaptiveRateLimiter()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    return _bucket
+
+
+# --- BLOQUE CIRCUIT BREAKER --------------------------------------------------
+
+
+class CircuitoAbierto(Exception):
+    """Syscom no se recuperó tras `BREAKER_MAX_APERTURAS` pausas."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para las descargas de un trabajo.
+
+    • closed    → las peticiones pasan; `umbral` fallos seguidos lo abren.
+    • open      → `esperar()` bloquea a todos los workers durante el
+                  enfriamiento (mínimo `Retry-After`), duplicándolo en cada
+                  apertura seguida.
+    • half_open → pasa una sola petición de prueba: si funciona se cierra,
+                  si falla (cualquier excepción) se vuelve a abrir y si no
+                  trae datos pasa otra prueba.
+    """
+
+    CERRADO, ABIERTO, SEMIABIERTO = "closed", "open", "half_open"
+
+    def __init__(self, umbral: int = BREAKER_UMBRAL, enfriamiento: float = BREAKER_ENFRIAMIENTO,
+                 max_aperturas: int = BREAKER_MAX_APERTURAS):
+        self.umbral = umbral
+        self.enfriamiento = enfriamiento
+        self.max_aperturas = max_aperturas
+        self.estado = self.CERRADO
+        self.aperturas = 0
+        self._fallos = 0
+        self._abierto_hasta = 0.0
+        self._agotado = False
+        self._cond = threading.Condition()
+
+    def esperar(self, detener: threading.Event | None = None) -> bool:
+        """
+        Bloquea mientras el circuito esté abierto; True si toca hacer la
+        prueba. Lanza `DescargaInterrumpida` si se activa `detener` (ver
+        `despertar`).
+        """
+        with self._cond:
+            while True:
+                if detener is not None and detener.is_set():
+                    raise DescargaInterrumpida()
+                if self._agotado:
+                    raise CircuitoAbierto("Syscom no responde; sincronización detenida")
+                if self.estado == self.CERRADO:
+                    return False
+                ahora = time.monotonic()
+                if self.estado == self.ABIERTO and ahora >= self._abierto_hasta:
+                    self.estado = self.SEMIABIERTO
+                    logger.info("🔌 Circuito semiabierto: probando Syscom")
+                    return True
+                espera = self._abierto_hasta - ahora if self.estado == self.ABIERTO else 1.0
+                self._cond.wait(espera)
+
+    def exito(self) -> None:
+        with self._cond:
+            self._fallos = 0
+            if self.estado != self.CERRADO:
+                logger.info("✅ Circuito cerrado: Syscom respondió")
+                self.estado = self.CERRADO
+                self.aperturas = 0
+                self._cond.notify_all()
+
+    def despertar(self) -> None:
+        """Despierta a los workers en espera para que revisen su `detener`."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def sin_veredicto(self) -> None:
+        """La prueba no trajo datos (p. ej. producto inexistente): pasa otra."""
+        with self._cond:
+            if self.estado == self.SEMIABIERTO:
+                self.estado = self.ABIERTO
+                self._abierto_hasta = time.monotonic()
+                self._cond.notify_all()
+
+    def fallo(self, retry_after: float | None = None) -> None:
+        with self._cond:
+            self._fallos += 1
+            if self.estado == self.ABIERTO:
+                return  # peticiones que ya estaban en vuelo
+            if self.estado == self.SEMIABIERTO or self._fallos >= self.umbral:
+                self._abrir(retry_after)
+
+    def _abrir(self, retry_after: float | None) -> None:
+        self.aperturas += 1
+        if self.aperturas > self.max_aperturas:
+            self._agotado = True
+            self._cond.notify_all()
+            raise CircuitoAbierto("Syscom no responde; sincronización detenida")
+        pausa = min(self.enfriamiento * 2 ** (self.aperturas - 1), BREAKER_ENFRIAMIENTO_MAX)
+        pausa = max(pausa, retry_after or 0)
+        logger.warning(f"⏸️ Circuito abierto: pausa de {pausa:.0f}s (apertura {self.aperturas})")
+        self.estado = self.ABIERTO
+        self._abierto_hasta = time.monotonic() + pausa
+        self._cond.notify_all()
+
+    def segundos_restantes(self) -> float:
+        return max(0.0, self._abierto_hasta - time.monotonic()) if self.estado == self.ABIERTO else 0.0
+
+
+# --- BLOQUE DESCARGA CONCURRENTE ---------------------------------------------
+
+
+def llamar_con_reintentos(fetch: Callable, arg, limiter: AdaptiveRateLimiter, breaker: CircuitBreaker,
+                          detener: threading.Event | None = None):
+    """
+    Ejecuta `fetch(arg)` respetando límite de tasa, `Retry-After` y circuit
+    breaker. Ante `SyscomSaturado` reintenta hasta `REINTENTOS_SATURACION`
+    veces y después la propaga; otra excepción cuenta como fallo del
+    circuito y se propaga.
+    """
+    for intento in range(1, REINTENTOS_SATURACION + 2):
+        prueba = breaker.esperar(detener)
+        limiter.acquire(detener)
+        inicio = time.perf_counter()
+        try:
+            resultado = fetch(arg)
+        except SyscomSaturado as e:
+            logger.warning(f"⚠️ Syscom saturado pidiendo {arg} (intento {intento}): {e}")
+            limiter.registrar_saturacion(e.retry_after)
+            breaker.fallo(e.retry_after)
+            if intento > REINTENTOS_SATURACION:
+                raise
+            continue
+        except Exception:
+            # Si era la prueba, el circuito no debe quedar semiabierto
+            breaker.fallo()
+            raise
+        limiter.registrar_exito(time.perf_counter() - inicio)
+        if resultado is None and prueba:
+            breaker.sin_veredicto()   # sin datos no prueba que Syscom se recuperó
+        else:
+            breaker.exito()
+        return resultado
+
+
+def _descargar(fetch: Callable[[str], dict | None], pid: str,
+               limiter: AdaptiveRateLimiter, breaker: CircuitBreaker,
+               detener: threading.Event | None = None):
+    """
+    Descarga un producto dentro de un worker (ver `llamar_con_reintentos`);
+    None si Syscom siguió saturado tras los reintentos.
+    """
+    try:
+        return llamar_con_reintentos(fetch, pid, limiter, breaker, detener)
+    except SyscomSaturado:
+        return None
+    finally:
+        # Los workers no deben dejar conexiones de BD abiertas
+        close_old_connections()
+
+
+def fetch_concurrente(
+    product_ids: Iterable[str],
+    fetch: Callable[[str], dict | None],
+    workers: int = SYNC_WORKERS,
+    limiter: AdaptiveRateLimiter | None = None,
+    breaker: CircuitBreaker | None = None,
+    latido: Callable[[], None] | None = None,
+) -> Iterator[tuple[str, dict | None]]:
+    """
+    Descarga productos en paralelo y los entrega en orden de llegada.
+
+    Parameters
+    ----------
+    product_ids : Iterable[str]
+        IDs de Syscom a descargar (se consumen de forma perezosa).
+    fetch : Callable
+        Función que descarga un producto; devuelve el JSON o None y lanza
+        `SyscomSaturado` cuando Syscom pide bajar el ritmo.
+    workers : int
+        Número de hilos de descarga.
+    limiter : AdaptiveRateLimiter | None
+        Limitador compartido; por defecto el del proceso.
+    breaker : CircuitBreaker | None
+        Circuit breaker del trabajo; por defecto uno nuevo.
+    latido : Callable | None
+        Se llama al menos una vez por segundo mientras se espera (p. ej. para
+        publicar el progreso aunque el circuito esté abierto).
+
+    Yields
+    ------
+    tuple[str, dict | None]
+        `(pid, pdata)`; `pdata` es None si la descarga falló.
+
+    Raises
+    ------
+    CircuitoAbierto
+        Si Syscom no se recupera; las descargas pendientes se cancelan.
+    """
+    limiter = limiter or get_rate_limiter()
+    breaker = breaker or CircuitBreaker()
+    workers = max(1, int(workers))
+    pendientes_max = workers * 2  # no encolar toda la lista de IDs a la vez
+    ids = iter(product_ids)
+
+    detener = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="syscom-fetch")
+    try:
+        en_vuelo = {}
+
+        def _llenar():
+            for pid in ids:
+                en_vuelo[pool.submit(_descargar, fetch, pid, limiter, breaker, detener)] = pid
+                if len(en_vuelo) >= pendientes_max:
+                    break
+
+        _llenar()
+        while en_vuelo:
+            terminados, _ = wait(en_vuelo, timeout=1.0, return_when=FIRST_COMPLETED)
+            if latido:
+                latido()
+            for futuro in terminados:
+                pid = en_vuelo.pop(futuro)
+                try:
+                    pdata = futuro.result()
+                except CircuitoAbierto:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Error descargando producto {pid}: {e}")
+                    pdata = None
+                yield pid, pdata
+            _llenar()
+    finally:
+        # Al cancelar o fallar no se inician las descargas que faltan, y las
+        # que esperan (circuito abierto, Retry-After) se sueltan de inmediato
+        detener.set()
+        breaker.despertar()
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,149 @@
+# file: dashboard/sync_progress.py
+# -----------------------------------------------------------------------------
+# Progreso de sincronización compartido entre procesos.
+#
+# El estado vive en el registro `SyncJob` (BD), así que cualquier worker web
+# lo ve sin importar qué proceso ejecuta la tarea. Además de contadores se
+# guardan: productos por segundo, ETA, reparto de tiempo por etapa
+# (fetch / parse / write) y una lista acotada de errores recientes.
+#
+# Las escrituras a BD se limitan a una cada `intervalo` segundos, salvo los
+# checkpoints: al confirmar cada lote se guardan los IDs ya escritos para que
+# un trabajo fallido o cancelado se reanude desde ahí.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+from dashboard.models import SyncJob
+
+ETAPAS = ("fetch", "parse", "write")
+MAX_ERRORES = 20          # errores recientes que se conservan
+INTERVALO_GUARDADO = 1.0  # segundos entre escrituras a BD
+
+
+# --- BLOQUE TRACKER ----------------------------------------------------------
+
+
+class SyncProgress:
+    """
+    Acumula el progreso de una sincronización y lo publica en su `SyncJob`.
+
+    Con `job=None` funciona igual pero sólo en memoria (sync síncrona desde
+    una vista, pruebas). Si el trabajo ya tiene checkpoint (reanudación), los
+    contadores parten de ahí; los errores previos se reintentan.
+    """
+
+    def __init__(self, job: SyncJob | None = None, total: int = 0, intervalo: float = INTERVALO_GUARDADO,
+                 muestras: bool = False):
+        self.job = job
+        self.total = total or (job.total if job else 0)
+        self.processed = len(job.checkpoint) if job else 0
+        self.success_count = job.success_count if job and job.checkpoint else 0
+        self.error_count = 0
+        self.cancelado = False
+        self._procesados_previos = self.processed
+        self.etapas = dict.fromkeys(ETAPAS, 0.0)
+        # Duración de cada bloque por etapa (para percentiles en benchmarks)
+        self.muestras = {etapa: [] for etapa in ETAPAS} if muestras else None
+        self.errores = deque(maxlen=MAX_ERRORES)
+        self.extra: dict = {}
+        self.intervalo = intervalo
+        self._inicio = time.monotonic()
+        self._ultimo_guardado = 0.0
+
+    # --- Registro ------------------------------------------------------------
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        """Suma el tiempo del bloque a la etapa indicada."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.etapas[nombre] = self.etapas.get(nombre, 0.0) + duracion
+            if self.muestras is not None:
+                self.muestras.setdefault(nombre, []).append(duracion)
+
+    def medir(self, iterable, nombre: str = "fetch"):
+        """Itera `iterable` sumando a `nombre` el tiempo de espera de cada elemento."""
+        iterador = iter(iterable)
+        while True:
+            with self.etapa(nombre):
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    return
+            yield item
+
+    def avance(self, processed: int = 0, ok: int = 0, error: int = 0) -> None:
+        self.processed += processed
+        self.success_count += ok
+        self.error_count += error
+        self.guardar()
+
+    def registrar_error(self, pid, mensaje) -> None:
+        self.errores.append({"pid": str(pid), "error": str(mensaje)[:300]})
+
+    # --- Checkpoint / cancelación --------------------------------------------
+
+    def checkpoint(self, ids) -> None:
+        """Marca `ids` como escritos en BD y lo publica de inmediato."""
+        if self.job is None:
+            return
+        self.job.checkpoint.extend(ids)
+        self.guardar(forzar=True, campos=("checkpoint",))
+
+    def cancelacion_solicitada(self) -> bool:
+        """Consulta en BD si se pidió cancelar el trabajo (una consulta por llamada)."""
+        if self.job is not None and not self.cancelado:
+            self.cancelado = SyncJob.objects.filter(pk=self.job.pk, cancel_requested=True).exists()
+        return self.cancelado
+
+    # --- Métricas ------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        transcurrido = max(time.monotonic() - self._inicio, 1e-6)
+        por_segundo = (self.processed - self._procesados_previos) / transcurrido
+        restantes = max(self.total - self.processed, 0)
+        return {
+            "items_per_sec": round(por_segundo, 2),
+            "eta_seconds": round(restantes / por_segundo) if por_segundo else None,
+            "elapsed_seconds": round(transcurrido, 1),
+            "stages": {k: round(v, 3) for k, v in self.etapas.items()},
+            "errors": list(self.errores),
+            **self.extra,
+        }
+
+    # --- Persistencia --------------------------------------------------------
+
+    def guardar(self, forzar: bool = False, campos: tuple = ()) -> None:
+        """Publica el estado en el `SyncJob` (como máximo una vez por intervalo)."""
+        if self.job is None:
+            return
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo_guardado < self.intervalo:
+            return
+        self._ultimo_guardado = ahora
+
+        self.job.total = self.total
+        self.job.processed = self.processed
+        self.job.success_count = self.success_count
+        self.job.error_count = self.error_count
+        self.job.stats = self.snapshot()
+        self.job.save(update_fields=[
+            "total", "processed", "success_count", "error_count", "stats", "updated_at", *campos,
+        ])
+
+    def terminar(self, status=SyncJob.Status.COMPLETED, error: str = "") -> None:
+        if self.job is None:
+            return
+        self.job.status = status
+        self.job.error = error
+        self.job.finished_at = timezone.now()
+        self.guardar(forzar=True, campos=("status", "error", "finished_at"))
@@ -0,0 +1,91 @@
+# file: dashboard/sync_stream.py
+# -----------------------------------------------------------------------------
+# Progreso de sincronización por Server-Sent Events (SSE).
+#
+# En lugar de que el navegador haga polling cada segundo (una petición completa
+# por middleware, sesión, auth…), se abre un solo stream por pestaña. El
+# servidor consulta únicamente `SyncJob.updated_at` y envía un evento cuando el
+# trabajo cambió; al terminar el trabajo se envía el estado final y se cierra.
+#
+# Costo: con WSGI (gunicorn sync/gthread) cada stream abierto ocupa un hilo
+# del worker y hace una consulta pequeña por segundo mientras dura. Por eso
+# cada conexión se corta a los `SYNC_STREAM_MAX_SECONDS` (60 s por defecto);
+# EventSource se reconecta solo a los 3 s (`retry:`), así que una pestaña
+# abierta en el admin no retiene un hilo indefinidamente.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import json
+import time
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
+
+from dashboard.models import SyncJob
+
+INTERVALO_CONSULTA = 1.0   # segundos entre consultas a BD
+KEEPALIVE = 15.0           # comentario SSE para que proxies no corten la conexión
+DURACION_MAXIMA = float(getattr(settings, "SYNC_STREAM_MAX_SECONDS", 60))  # luego EventSource se reconecta
+
+
+# --- BLOQUE GENERADOR DE EVENTOS ---------------------------------------------
+
+
+def _evento(datos: dict, nombre: str = "progress") -> str:
+    return f"event: {nombre}\ndata: {json.dumps(datos, default=str)}\n\n"
+
+
+def eventos_progreso(job_id: int | None, intervalo: float = INTERVALO_CONSULTA,
+                     duracion_maxima: float = DURACION_MAXIMA):
+    """Genera eventos SSE sólo cuando el `SyncJob` cambia."""
+    if job_id is None:
+        yield _evento({'processed': 0, 'total': 0, 'status': 'idle'}, "end")
+        return
+
+    ultima_version = None
+    inicio = ultimo_envio = time.monotonic()
+    yield "retry: 3000\n\n"
+
+    while time.monotonic() - inicio < duracion_maxima:
+        version = SyncJob.objects.filter(pk=job_id).values_list("updated_at", "status").first()
+        if version is None:
+            yield _evento({'status': 'idle'}, "end")
+            return
+
+        if version != ultima_version:
+            ultima_version = version
+            job = SyncJob.objects.get(pk=job_id)
+            ultimo_envio = time.monotonic()
+            if not job.is_active:
+                yield _evento(job.as_progress(), "end")
+                return
+            yield _evento(job.as_progress())
+        elif time.monotonic() - ultimo_envio >= KEEPALIVE:
+            ultimo_envio = time.monotonic()
+            yield ": keepalive\n\n"
+
+        time.sleep(intervalo)
+
+
+# --- BLOQUE VISTA ------------------------------------------------------------
+
+
+@login_required
+@staff_member_required
+def sync_progress_stream(request, kind):
+    """
+    Stream SSE del progreso del último trabajo `kind` del usuario
+    (o del indicado con `?job=<id>`).
+    """
+    jobs = SyncJob.objects.filter(user=request.user, kind=kind)
+    if request.GET.get("job", "").isdigit():
+        jobs = jobs.filter(pk=int(request.GET["job"]))
+    job_id = jobs.order_by("-created_at").values_list("pk", flat=True).first()
+
+    eventos = eventos_progreso(job_id, INTERVALO_CONSULTA, DURACION_MAXIMA)
+    response = StreamingHttpResponse(eventos, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: no acumular el stream
+    return response
@@ -0,0 +1,891 @@
+# file: dashboard/sync_writer.py
+# -----------------------------------------------------------------------------
+# Escritura por lotes de productos sincronizados desde Syscom.
+#
+# En lugar de varios get_or_create / update_or_create por producto, se juntan
+# N productos normalizados y se guardan con un upsert (`bulk_create` con
+# `update_conflicts=True`) por modelo dentro de una sola transacción:
+#
+#   Brand → Product → Price → Branch/BranchStock → Category/ProductCategory
+#   → ProductImage → Feature
+#
+# Si un lote falla se reintenta producto por producto para aislar al culpable.
+#
+# Cada producto guarda un hash por sección del payload normalizado
+# (`Product.sync_hashes`); en la siguiente sync sólo se reescriben las
+# secciones cuyo hash cambió.
+#
+# Los cambios de precio y existencia se agregan al historial
+# (`dashboard.historial`) en la misma transacción del lote.
+#
+# `SyncDiff` tiene el mismo contrato pero no escribe: compara contra la BD y
+# cuenta lo que cambiaría (modo simulación / dry-run).
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import hashlib
+import json
+import logging
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core.precios import recalcular_precios_mxn
+from dashboard.historial import registrar_existencias, registrar_precios
+from products.models import (
+    Branch,
+    BranchStock,
+    Brand,
+    Category,
+    Feature,
+    Price,
+    Product,
+    ProductCategory,
+    ProductImage,
+)
+
+logger = logging.getLogger(__name__)
+
+SYNC_BATCH_SIZE = getattr(settings, "SYSCOM_SYNC_BATCH_SIZE", 50)
+
+# Campos de Product que vienen de Syscom (se actualizan en cada sync)
+CAMPOS_PRODUCTO = ("model", "title", "description", "warranty", "brand", "main_image")
+CAMPOS_PRECIO = ("normal", "special", "discount", "list_price")
+
+# Prefijo temporal del slug de productos nuevos (el definitivo necesita el PK)
+SLUG_TEMPORAL = "sync-tmp-"
+
+
+# --- BLOQUE NORMALIZACIÓN ----------------------------------------------------
+
+
+def _decimal(valor) -> Decimal:
+    try:
+        return Decimal(str(valor or 0)).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return Decimal("0.00")
+
+
+def _entero(valor) -> int:
+    try:
+        return max(0, int(valor or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def normalizar_producto(pid: str, pdata: dict) -> dict | None:
+    """
+    Convierte el JSON de `/productos/<id>?inventarios=1` en un dict plano
+    con una sección por modelo. Devuelve None si no es un producto válido.
+    """
+    if not isinstance(pdata, dict) or not pdata.get("modelo") or not pdata.get("titulo"):
+        return None
+
+    pr = pdata.get("precios") or {}
+    if isinstance(pr, list):
+        pr = pr[0] if pr else {}
+
+    existencia = pdata.get("existencia") or {}
+    sucursales = (existencia.get("detalle") or {}).get("nuevo") or {} if isinstance(existencia, dict) else {}
+
+    categorias = [
+        (cat["nombre"], cat.get("nivel", 1))
+        for cat in pdata.get("categorias") or []
+        if isinstance(cat, dict) and cat.get("nombre")
+    ]
+    imagenes = [
+        (idx, img["imagen"])
+        for idx, img in enumerate(pdata.get("imagenes") or [])
+        if isinstance(img, dict) and img.get("imagen")
+    ]
+    caracteristicas = list(dict.fromkeys(
+        str(feat) for feat in pdata.get("caracteristicas") or [] if feat
+    ))
+
+    return {
+        "syscom_id": str(pid),
+        "marca": pdata.get("marca") or "Genérico",
+        "producto": {
+            "model": pdata.get("modelo", ""),
+            "title": pdata.get("titulo", ""),
+            "description": pdata.get("descripcion") or "",
+            "warranty": pdata.get("garantia") or "",
+            "main_image": pdata.get("img_portada") or "",
+        },
+        "precio": {
+            "normal": _decimal(pr.get("precio_1")),
+            "special": _decimal(pr.get("precio_especial")),
+            "discount": _decimal(pr.get("precio_descuento")),
+            "list_price": _decimal(pr.get("precio_lista")),
+        },
+        "existencias": {nombre: _entero(qty) for nombre, qty in sucursales.items()},
+        "categorias": categorias,
+        "imagenes": imagenes,
+        "caracteristicas": caracteristicas,
+    }
+
+
+def _digest(valor) -> str:
+    crudo = json.dumps(valor, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(crudo.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def calcular_hashes(item: dict) -> dict:
+    """Hash por sección de un producto normalizado (claves = secciones del writer)."""
+    return {
+        "producto": _digest([item["marca"], item["producto"]]),
+        "precio": _digest(item["precio"]),
+        "stock": _digest(item["existencias"]),
+        "categorias": _digest(item["categorias"]),
+        "imagenes": _digest(item["imagenes"]),
+        "caracteristicas": _digest(item["caracteristicas"]),
+    }
+
+
+def hash_global(hashes: dict) -> str:
+    """Digest único del producto a partir de sus hashes por sección."""
+    return _digest(hashes)
+
+
+# --- BLOQUE HELPERS DE BD ----------------------------------------------------
+
+
+def _upsert(model, objs, unique_fields, update_fields, batch_size=500):
+    """
+    `bulk_create(update_conflicts=True)` portable: MySQL no admite
+    `unique_fields` (usa ON DUPLICATE KEY UPDATE), SQLite/PostgreSQL sí lo piden.
+    """
+    if not objs:
+        return
+    kwargs = {"update_conflicts": True, "update_fields": list(update_fields)}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = list(unique_fields)
+    model.objects.bulk_create(objs, batch_size=batch_size, **kwargs)
+
+
+def _ids_sucursales(cache: dict, nombres: dict) -> dict:
+    """
+    slug → id de Branch para `nombres` ({slug: nombre}), creando las que
+    falten. `cache` se completa en sitio y se conserva entre lotes.
+    """
+    pendientes = [s for s in nombres if s not in cache]
+    if pendientes:
+        cache.update(Branch.objects.filter(slug__in=pendientes).values_list("slug", "id"))
+        faltantes = [s for s in pendientes if s not in cache]
+        if faltantes:
+            Branch.objects.bulk_create(
+                [Branch(slug=s, name=nombres[s]) for s in faltantes], ignore_conflicts=True
+            )
+            cache.update(Branch.objects.filter(slug__in=faltantes).values_list("slug", "id"))
+    return cache
+
+
+def _slugs_unicos(model, nombres) -> dict:
+    """
+    Calcula un slug único por nombre (mismo criterio que `save()`) con una
+    sola consulta: los slugs base y sus variantes `-N` ya ocupados.
+    """
+    base = {nombre: slugify(nombre) or "item" for nombre in nombres}
+    filtro = Q(slug__in=set(base.values()))
+    for slug in set(base.values()):
+        filtro |= Q(slug__startswith=f"{slug}-")
+    ocupados = set(model.objects.filter(filtro).values_list("slug", flat=True))
+    resultado = {}
+    for nombre, slug in base.items():
+        candidato, i = slug, 1
+        while candidato in ocupados:
+            candidato = f"{slug}-{i}"
+            i += 1
+        ocupados.add(candidato)
+        resultado[nombre] = candidato
+    return resultado
+
+
+def _asegurar_por_nombre(model, nombres: dict) -> dict:
+    """
+    Garantiza que existan las filas `model(name=...)` y devuelve {name: id}.
+
+    `nombres` es {name: defaults}; las faltantes se insertan en bloque con
+    slug precalculado (bulk_create no llama a `save()`).
+    """
+    if not nombres:
+        return {}
+    existentes = dict(model.objects.filter(name__in=nombres).values_list("name", "id"))
+    faltantes = [n for n in nombres if n not in existentes]
+    if faltantes:
+        slugs = _slugs_unicos(model, faltantes)
+        model.objects.bulk_create(
+            [model(name=n, slug=slugs[n], **nombres[n]) for n in faltantes],
+            ignore_conflicts=True,
+        )
+        existentes.update(model.objects.filter(name__in=faltantes).values_list("name", "id"))
+    return existentes
+
+
+# --- BLOQUE ESCRITOR POR LOTES -----------------------------------------------
+
+
+class ProductBatchWriter:
+    """
+    Acumula productos normalizados y los persiste en lotes.
+
+    Parameters
+    ----------
+    batch_size : int
+        Productos por lote / transacción.
+    secciones : set[str] | None
+        Qué partes escribir: "producto", "precio", "stock", "categorias",
+        "imagenes", "caracteristicas". Por defecto todas. Sin "producto" sólo
+        se actualizan productos que ya existen en BD.
+    sucursales : set[str] | None
+        Limita el inventario a esos slugs de sucursal. Sin filtro se escriben
+        todas las sucursales del payload y las que ya no aparecen quedan en 0.
+    precio_extra : dict | None
+        Campos adicionales que se fijan en `Price` en cada sync (p. ej.
+        `{"margen_prod": 0.20}` para restablecer márgenes). Sin él no se tocan
+        el margen ni el descuento que el admin haya ajustado.
+    forzar : bool
+        Ignora los hashes guardados y reescribe todas las secciones.
+
+    Uso::
+
+        writer = ProductBatchWriter()
+        for pid, pdata in ...:
+            writer.add(pid, pdata)
+            if writer.lleno:
+                resultado = writer.flush()
+        resultado = writer.flush()
+    """
+
+    SECCIONES = frozenset({"producto", "precio", "stock", "categorias", "imagenes", "caracteristicas"})
+
+    def __init__(self, batch_size=SYNC_BATCH_SIZE, secciones=None, sucursales=None,
+                 precio_extra=None, forzar=False):
+        self.batch_size = max(1, int(batch_size))
+        self.secciones = frozenset(secciones) if secciones else self.SECCIONES
+        self.sucursales = set(sucursales) if sucursales else None
+        self.precio_extra = dict(precio_extra or {})
+        self.forzar = forzar
+        self._pendientes: list[dict] = []
+        # slug → id de Branch; se conserva entre lotes
+        self._sucursales_ids: dict[str, int] = {}
+
+    # --- Acumulación ---------------------------------------------------------
+
+    def add(self, pid: str, pdata: dict) -> bool:
+        """Normaliza y encola un producto; False si el JSON no es válido."""
+        normalizado = normalizar_producto(pid, pdata)
+        if normalizado is None:
+            return False
+        normalizado["hashes"] = calcular_hashes(normalizado)
+        self._pendientes.append(normalizado)
+        return True
+
+    @property
+    def lleno(self) -> bool:
+        return len(self._pendientes) >= self.batch_size
+
+    def __len__(self) -> int:
+        return len(self._pendientes)
+
+    # --- Persistencia --------------------------------------------------------
+
+    def flush(self) -> dict:
+        """
+        Escribe los productos pendientes.
+
+        Returns
+        -------
+        dict
+            {"exitosos": [syscom_id, ...], "errores": {syscom_id: mensaje},
+             "sin_cambios": [syscom_id, ...]}
+        """
+        lote, self._pendientes = self._pendientes, []
+        resultado = {"exitosos": [], "errores": {}, "sin_cambios": []}
+        if not lote:
+            return resultado
+
+        try:
+            with transaction.atomic():
+                resultado["exitosos"], resultado["sin_cambios"] = self._escribir(lote)
+            resultado["errores"].update(self._omitidos(lote, resultado["exitosos"]))
+            return resultado
+        except Exception as e:
+            if len(lote) == 1:
+                logger.error(f"❌ Error escribiendo producto {lote[0]['syscom_id']}: {e}", exc_info=True)
+                resultado["errores"][lote[0]["syscom_id"]] = str(e)
+                return resultado
+            logger.warning(f"⚠️ Lote de {len(lote)} productos falló ({e}); reintentando uno por uno")
+
+        # Aislar al producto problemático: cada uno en su propia transacción
+        for item in lote:
+            self._pendientes = [item]
+            parcial = self.flush()
+            resultado["exitosos"].extend(parcial["exitosos"])
+            resultado["errores"].update(parcial["errores"])
+            resultado["sin_cambios"].extend(parcial["sin_cambios"])
+        return resultado
+
+    @staticmethod
+    def _omitidos(lote, exitosos) -> dict:
+        escritos = set(exitosos)
+        return {
+            item["syscom_id"]: "Producto no encontrado en BD"
+            for item in lote if item["syscom_id"] not in escritos
+        }
+
+    def _escribir(self, lote: list[dict]) -> tuple[list[str], list[str]]:
+        ahora = timezone.now()
+        previos = {
+            sid: (pk, hashes or {})
+            for sid, pk, hashes in Product.objects
+            .filter(syscom_id__in=[item["syscom_id"] for item in lote])
+            .values_list("syscom_id", "id", "sync_hashes")
+        }
+        cambios = {
+            item["syscom_id"]: self._secciones_cambiadas(item, previos.get(item["syscom_id"]))
+            for item in lote
+        }
+
+        productos = {sid: pk for sid, (pk, _) in previos.items()}
+        if "producto" in self.secciones:
+            productos.update(self._guardar_productos(
+                [item for item in lote if "producto" in cambios[item["syscom_id"]]], ahora,
+            ))
+        lote = [item for item in lote if item["syscom_id"] in productos]
+
+        def _con_cambios(seccion):
+            return [item for item in lote if seccion in cambios[item["syscom_id"]]]
+
+        if "precio" in self.secciones:
+            self._guardar_precios(_con_cambios("precio"), productos)
+        if "stock" in self.secciones:
+            self._guardar_existencias(_con_cambios("stock"), productos)
+        if "categorias" in self.secciones:
+            self._guardar_categorias(_con_cambios("categorias"), productos)
+        if "imagenes" in self.secciones:
+            self._guardar_imagenes(_con_cambios("imagenes"), productos)
+        if "caracteristicas" in self.secciones:
+            self._guardar_caracteristicas(_con_cambios("caracteristicas"), productos)
+
+        self._guardar_hashes(lote, productos, previos, cambios, ahora)
+
+        return (
+            [item["syscom_id"] for item in lote],
+            [item["syscom_id"] for item in lote if not cambios[item["syscom_id"]]],
+        )
+
+    # --- Detección de cambios ------------------------------------------------
+
+    def _hasheable(self, seccion: str) -> bool:
+        # Con filtro de sucursales el hash de stock no representa lo escrito
+        return not (seccion == "stock" and self.sucursales is not None)
+
+    def _secciones_cambiadas(self, item, previo) -> set:
+        if previo is None or self.forzar:
+            return set(self.secciones)
+        guardados = previo[1]
+        return {
+            seccion for seccion in self.secciones
+            if not self._hasheable(seccion) or guardados.get(seccion) != item["hashes"][seccion]
+        }
+
+    def _guardar_hashes(self, lote, productos, previos, cambios, ahora) -> None:
+        """Actualiza hashes (sólo si cambiaron) y `last_sync` sin tocar `updated_at`."""
+        con_hash = []
+        for item in lote:
+            sid = item["syscom_id"]
+            anteriores = previos[sid][1] if sid in previos else {}
+            nuevos = {
+                **anteriores,
+                **{s: item["hashes"][s] for s in cambios[sid] if self._hasheable(s)},
+            }
+            if "stock" in cambios[sid] and not self._hasheable("stock"):
+                # Stock escrito sólo para algunas sucursales: el hash guardado
+                # ya no describe la BD; sin él la próxima sync completa lo reescribe
+                nuevos.pop("stock", None)
+            if nuevos != anteriores:
+                con_hash.append(Product(
+                    pk=productos[sid], sync_hashes=nuevos, sync_hash=hash_global(nuevos), last_sync=ahora,
+                ))
+        if con_hash:
+            Product.objects.bulk_update(con_hash, ["sync_hashes", "sync_hash", "last_sync"])
+
+        resto = {productos[item["syscom_id"]] for item in lote} - {p.pk for p in con_hash}
+        if resto:
+            Product.objects.filter(pk__in=resto).update(last_sync=ahora)
+
+    # --- Secciones -----------------------------------------------------------
+
+    def _guardar_productos(self, lote, ahora) -> dict:
+        """Upsert de Brand + Product; devuelve {syscom_id: product_id}."""
+        if not lote:
+            return {}
+
+        marcas = _asegurar_por_nombre(Brand, {item["marca"]: {} for item in lote})
+        objs = [
+            Product(
+                syscom_id=item["syscom_id"],
+                brand_id=marcas[item["marca"]],
+                slug=f"{SLUG_TEMPORAL}{item['syscom_id']}",
+                last_sync=ahora,
+                **item["producto"],
+            )
+            for item in lote
+        ]
+        _upsert(
+            Product, objs,
+            unique_fields=["syscom_id"],
+            update_fields=[*CAMPOS_PRODUCTO, "updated_at", "last_sync"],
+        )
+        filas = list(Product.objects.filter(syscom_id__in=[item["syscom_id"] for item in lote])
+                     .select_related("brand").only("id", "syscom_id", "slug", "model", "brand__name"))
+        self._asignar_slugs([p for p in filas if p.slug.startswith(SLUG_TEMPORAL)])
+        return {p.syscom_id: p.id for p in filas}
+
+    @staticmethod
+    def _asignar_slugs(nuevos: list[Product]) -> None:
+        """Slug definitivo de productos recién insertados (mismo formato que `save()`)."""
+        if not nuevos:
+            return
+        for p in nuevos:
+            partes = [x for x in (p.brand.name if p.brand else "", p.model, str(p.pk)) if x]
+            p.slug = slugify("-".join(partes)) or slugify(f"producto-{p.pk}")
+        ocupados = set(
+            Product.objects.filter(slug__in=[p.slug for p in nuevos])
+            .exclude(pk__in=[p.pk for p in nuevos])
+            .values_list("slug", flat=True)
+        )
+        for p in nuevos:
+            base, i = p.slug, 1
+            while p.slug in ocupados:
+                p.slug = f"{base}-{i}"
+                i += 1
+            ocupados.add(p.slug)
+        Product.objects.bulk_update(nuevos, ["slug"])
+
+    def _guardar_precios(self, lote, productos) -> None:
+        if not lote:
+            return
+        objs = [
+            Price(product_id=productos[item["syscom_id"]], **item["precio"], **self.precio_extra)
+            for item in lote
+        ]
+        previos = {
+            product_id: (discount, list_price)
+            for product_id, discount, list_price in Price.objects
+            .filter(product_id__in=[obj.product_id for obj in objs])
+            .values_list("product_id", "discount", "list_price")
+        }
+        _upsert(
+            Price, objs,
+            unique_fields=["product"],
+            update_fields=[*CAMPOS_PRECIO, *self.precio_extra],
+        )
+        # bulk_create no dispara señales: el precio MXN materializado se
+        # recalcula aquí, dentro de la misma transacción
+        recalcular_precios_mxn([obj.product_id for obj in objs])
+        registrar_precios(previos, objs)
+
+    def _ids_sucursales(self, nombres: dict) -> dict:
+        return _ids_sucursales(self._sucursales_ids, nombres)
+
+    def _guardar_existencias(self, lote, productos) -> None:
+        if not lote:
+            return
+        nombres = {}
+        for item in lote:
+            for nombre in item["existencias"]:
+                slug = slugify(nombre)[:50]
+                if self.sucursales is None or slug in self.sucursales:
+                    nombres.setdefault(slug, nombre)
+
+        sucursales = self._ids_sucursales(nombres) if nombres else {}
+        previos = {
+            (product_id, branch_id): (pk, qty)
+            for pk, product_id, branch_id, qty in BranchStock.objects
+            .filter(product_id__in=[productos[item["syscom_id"]] for item in lote])
+            .values_list("pk", "product_id", "branch_id", "quantity")
+        }
+        objs = []
+        cambios = []
+        for item in lote:
+            for nombre, qty in item["existencias"].items():
+                slug = slugify(nombre)[:50]
+                branch_id = sucursales.get(slug) if slug in nombres else None
+                if branch_id:
+                    product_id = productos[item["syscom_id"]]
+                    previo = previos.pop((product_id, branch_id), None)
+                    # Sólo las filas que cambian: `updated_at` marca el último
+                    # cambio real (ver `productos_para_refresco`)
+                    if previo is None or previo[1] != qty:
+                        objs.append(BranchStock(product_id=product_id, branch_id=branch_id, quantity=qty))
+                        cambios.append((product_id, branch_id, qty))
+        if objs:
+            _upsert(
+                BranchStock, objs,
+                unique_fields=["product", "branch"],
+                update_fields=["quantity", "updated_at"],
+            )
+
+        if self.sucursales is None:
+            # Sucursales que ya no vienen en el payload: sin existencia
+            obsoletos = {clave: pk for clave, (pk, qty) in previos.items() if qty > 0}
+            if obsoletos:
+                BranchStock.objects.filter(pk__in=obsoletos.values()).update(quantity=0, updated_at=timezone.now())
+                cambios.extend((product_id, branch_id, 0) for product_id, branch_id in obsoletos)
+        registrar_existencias(cambios)
+
+    def _guardar_categorias(self, lote, productos) -> None:
+        if not lote:
+            return
+        definiciones = {}
+        for item in lote:
+            for nombre, nivel in item["categorias"]:
+                definiciones.setdefault(nombre, {"level": nivel})
+        categorias = _asegurar_por_nombre(Category, definiciones)
+        ProductCategory.objects.bulk_create(
+            [
+                ProductCategory(product_id=productos[item["syscom_id"]], category_id=categorias[nombre])
+                for item in lote
+                for nombre, _ in item["categorias"]
+                if nombre in categorias
+            ],
+            ignore_conflicts=True,
+        )
+
+    def _guardar_imagenes(self, lote, productos) -> None:
+        if not lote:
+            return
+        existentes = set(
+            ProductImage.objects.filter(product_id__in=[productos[item["syscom_id"]] for item in lote]).values_list("product_id", "url")
+        )
+        nuevas = []
+        for item in lote:
+            product_id = productos[item["syscom_id"]]
+            for idx, url in item["imagenes"]:
+                if (product_id, url) not in existentes:
+                    existentes.add((product_id, url))
+                    nuevas.append(ProductImage(
+                        product_id=product_id, url=url, order=idx, type=ProductImage.ImageType.GALLERY,
+                    ))
+        ProductImage.objects.bulk_create(nuevas)
+
+    def _guardar_caracteristicas(self, lote, productos) -> None:
+        if not lote:
+            return
+        existentes = set(
+            Feature.objects.filter(product_id__in=[productos[item["syscom_id"]] for item in lote]).values_list("product_id", "text")
+        )
+        nuevas = []
+        for item in lote:
+            product_id = productos[item["syscom_id"]]
+            for texto in item["caracteristicas"]:
+                if (product_id, texto) not in existentes:
+                    existentes.add((product_id, texto))
+                    nuevas.append(Feature(product_id=product_id, text=texto))
+        Feature.objects.bulk_create(nuevas)
+
+
+# --- BLOQUE REFRESCO DE EXISTENCIAS ------------------------------------------
+
+
+class StockBatchWriter:
+    """
+    Escritor mínimo para el refresco frecuente de inventario.
+
+    Mismo contrato que `ProductBatchWriter` (`add` / `lleno` / `flush`), pero
+    sólo toca `BranchStock.quantity` (con `bulk_update` de las filas cuyo
+    valor cambió) y `Product.last_sync`. También actualiza el hash "stock" de
+    `Product.sync_hashes`, para que la siguiente sync completa no descarte
+    como "sin cambios" una existencia que ya no coincide con la guardada.
+
+    Las sucursales que dejan de aparecer en el payload quedan en 0 y las
+    nuevas se crean. Productos que no existen en BD se reportan como error.
+    """
+
+    def __init__(self, batch_size=SYNC_BATCH_SIZE):
+        self.batch_size = max(1, int(batch_size))
+        self._pendientes: dict[str, dict] = {}
+        self._sucursales_ids: dict[str, int] = {}
+
+    def add(self, pid: str, pdata: dict) -> bool:
+        existencia = pdata.get("existencia") if isinstance(pdata, dict) else None
+        if not isinstance(existencia, dict):
+            return False
+        sucursales = (existencia.get("detalle") or {}).get("nuevo") or {}
+        self._pendientes[str(pid)] = {nombre: _entero(qty) for nombre, qty in sucursales.items()}
+        return True
+
+    @property
+    def lleno(self) -> bool:
+        return len(self._pendientes) >= self.batch_size
+
+    def __len__(self) -> int:
+        return len(self._pendientes)
+
+    def flush(self) -> dict:
+        """Escribe las existencias pendientes (ver `ProductBatchWriter.flush`)."""
+        lote, self._pendientes = self._pendientes, {}
+        resultado = {"exitosos": [], "errores": {}, "sin_cambios": []}
+        if not lote:
+            return resultado
+
+        try:
+            with transaction.atomic():
+                resultado["exitosos"], resultado["sin_cambios"] = self._escribir(lote)
+        except Exception as e:
+            logger.error(f"❌ Error escribiendo existencias de {len(lote)} productos: {e}", exc_info=True)
+            resultado["errores"] = {sid: str(e) for sid in lote}
+            return resultado
+
+        escritos = set(resultado["exitosos"])
+        resultado["errores"] = {sid: "Producto no encontrado en BD" for sid in lote if sid not in escritos}
+        return resultado
+
+    def _escribir(self, lote: dict) -> tuple[list[str], list[str]]:
+        ahora = timezone.now()
+        productos = {
+            sid: (pk, hashes or {})
+            for sid, pk, hashes in Product.objects
+            .filter(syscom_id__in=list(lote))
+            .values_list("syscom_id", "id", "sync_hashes")
+        }
+        nombres = {}
+        for existencias in lote.values():
+            for nombre in existencias:
+                nombres.setdefault(slugify(nombre)[:50], nombre)
+        sucursales = _ids_sucursales(self._sucursales_ids, nombres) if nombres else {}
+
+        # product_id → {branch_id: BranchStock}, para no recorrer todo el lote por producto
+        actuales = defaultdict(dict)
+        for stock in (BranchStock.objects
+                      .filter(product_id__in=[pk for pk, _ in productos.values()])
+                      .only("id", "product_id", "branch_id", "quantity")):
+            actuales[stock.product_id][stock.branch_id] = stock
+
+        cambiados, nuevos, hashes, sin_cambios = [], [], [], []
+        for sid, (product_id, anteriores) in productos.items():
+            antes = len(cambiados) + len(nuevos)
+            por_sucursal = actuales[product_id]
+            vistos = set()
+            for nombre, qty in lote[sid].items():
+                branch_id = sucursales[slugify(nombre)[:50]]
+                vistos.add(branch_id)
+                stock = por_sucursal.get(branch_id)
+                if stock is None:
+                    nuevos.append(BranchStock(product_id=product_id, branch_id=branch_id, quantity=qty))
+                elif stock.quantity != qty:
+                    stock.quantity, stock.updated_at = qty, ahora
+                    cambiados.append(stock)
+            for branch_id, stock in por_sucursal.items():
+                if branch_id not in vistos and stock.quantity:
+                    stock.quantity, stock.updated_at = 0, ahora
+                    cambiados.append(stock)
+
+            if len(cambiados) + len(nuevos) == antes:
+                sin_cambios.append(sid)
+            digest = _digest(lote[sid])
+            if anteriores.get("stock") != digest:
+                guardados = {**anteriores, "stock": digest}
+                hashes.append(Product(pk=product_id, sync_hashes=guardados, sync_hash=hash_global(guardados)))
+
+        if cambiados:
+            BranchStock.objects.bulk_update(cambiados, ["quantity", "updated_at"], batch_size=500)
+        if nuevos:
+            BranchStock.objects.bulk_create(nuevos, batch_size=500, ignore_conflicts=True)
+        registrar_existencias(
+            [(stock.product_id, stock.branch_id, stock.quantity) for stock in (*cambiados, *nuevos)], ahora
+        )
+        if hashes:
+            Product.objects.bulk_update(hashes, ["sync_hashes", "sync_hash"], batch_size=500)
+        Product.objects.filter(pk__in=[pk for pk, _ in productos.values()]).update(last_sync=ahora)
+
+        return list(productos), sin_cambios
+
+
+# --- BLOQUE SIMULACIÓN (DRY-RUN) ---------------------------------------------
+
+
+class SyncDiff:
+    """
+    Compara productos normalizados contra la BD sin escribir nada.
+
+    Mismo contrato que `ProductBatchWriter` (`add` / `lleno` / `flush`). Por
+    lote hace una consulta por modelo (nunca por fila) y sólo compara a
+    detalle los productos cuyo hash de alguna sección cambió. El resultado
+    acumulado está en `resumen()`::
+
+        {"Product": {"nuevos": 3, "title": 12}, "Price": {"normal": 40}, ...}
+    """
+
+    simulacion = True
+
+    def __init__(self, batch_size=SYNC_BATCH_SIZE, forzar=False):
+        self.batch_size = max(1, int(batch_size))
+        self.forzar = forzar
+        self._pendientes: list[dict] = []
+        self._conteos: dict[str, Counter] = {}
+        # Nombres nuevos ya contados (para no repetirlos entre lotes)
+        self._nuevos: dict[str, set] = {"Brand": set(), "Branch": set(), "Category": set()}
+
+    def add(self, pid: str, pdata: dict) -> bool:
+        normalizado = normalizar_producto(pid, pdata)
+        if normalizado is None:
+            return False
+        normalizado["hashes"] = calcular_hashes(normalizado)
+        self._pendientes.append(normalizado)
+        return True
+
+    @property
+    def lleno(self) -> bool:
+        return len(self._pendientes) >= self.batch_size
+
+    def __len__(self) -> int:
+        return len(self._pendientes)
+
+    def resumen(self) -> dict:
+        return {modelo: dict(sorted(c.items())) for modelo, c in sorted(self._conteos.items()) if c}
+
+    def _contar(self, modelo: str, campo: str, n: int = 1) -> None:
+        if n:
+            self._conteos.setdefault(modelo, Counter())[campo] += n
+
+    def flush(self) -> dict:
+        """Compara los pendientes (ver `ProductBatchWriter.flush`; nunca hay errores de escritura)."""
+        lote, self._pendientes = self._pendientes, []
+        resultado = {"exitosos": [item["syscom_id"] for item in lote], "errores": {}, "sin_cambios": []}
+        if not lote:
+            return resultado
+
+        previos = {
+            sid: (pk, hashes or {})
+            for sid, pk, hashes in Product.objects
+            .filter(syscom_id__in=[item["syscom_id"] for item in lote])
+            .values_list("syscom_id", "id", "sync_hashes")
+        }
+        nuevos, existentes = [], []
+        for item in lote:
+            sid = item["syscom_id"]
+            if sid not in previos:
+                nuevos.append(item)
+            elif self.forzar or previos[sid][1] != item["hashes"]:
+                existentes.append(item)
+            else:
+                resultado["sin_cambios"].append(sid)
+
+        self._contar("Product", "nuevos", len(nuevos))
+        self._contar("Product", "sin_cambios", len(resultado["sin_cambios"]))
+        self._comparar_nombres(lote=nuevos + existentes)
+        productos = {item["syscom_id"]: previos[item["syscom_id"]][0] for item in existentes}
+        if existentes:
+            self._comparar_productos(existentes, productos)
+            self._comparar_precios(existentes, productos)
+            self._comparar_existencias(existentes, productos)
+            self._comparar_relaciones(existentes, productos)
+
+        # Productos nuevos: todo lo suyo se crearía
+        for item in nuevos:
+            self._contar("Price", "nuevos")
+            self._contar("BranchStock", "nuevos", len(item["existencias"]))
+            self._contar("ProductCategory", "nuevos", len(item["categorias"]))
+            self._contar("ProductImage", "nuevos", len(item["imagenes"]))
+            self._contar("Feature", "nuevos", len(item["caracteristicas"]))
+        return resultado
+
+    # --- Comparaciones por modelo --------------------------------------------
+
+    def _comparar_nombres(self, lote) -> None:
+        """Marcas, sucursales y categorías que habría que crear."""
+        buscados = {
+            "Brand": (Brand, "name", {item["marca"] for item in lote}),
+            "Branch": (Branch, "slug", {slugify(n)[:50] for item in lote for n in item["existencias"]}),
+            "Category": (Category, "name", {nombre for item in lote for nombre, _ in item["categorias"]}),
+        }
+        for modelo, (model, campo, valores) in buscados.items():
+            valores -= self._nuevos[modelo]
+            if not valores:
+                continue
+            en_bd = set(model.objects.filter(**{f"{campo}__in": valores}).values_list(campo, flat=True))
+            faltantes = valores - en_bd
+            self._nuevos[modelo] |= faltantes
+            self._contar(modelo, "nuevos", len(faltantes))
+
+    def _comparar_productos(self, lote, productos) -> None:
+        actuales = {
+            fila["id"]: fila
+            for fila in Product.objects.filter(pk__in=productos.values())
+            .values("id", "brand__name", *(c for c in CAMPOS_PRODUCTO if c != "brand"))
+        }
+        for item in lote:
+            fila = actuales[productos[item["syscom_id"]]]
+            for campo, valor in item["producto"].items():
+                if fila[campo] != valor:
+                    self._contar("Product", campo)
+            if fila["brand__name"] != item["marca"]:
+                self._contar("Product", "brand")
+
+    def _comparar_precios(self, lote, productos) -> None:
+        actuales = {
+            fila["product_id"]: fila
+            for fila in Price.objects.filter(product_id__in=productos.values())
+            .values("product_id", *CAMPOS_PRECIO)
+        }
+        for item in lote:
+            fila = actuales.get(productos[item["syscom_id"]])
+            if fila is None:
+                self._contar("Price", "nuevos")
+                continue
+            for campo, valor in item["precio"].items():
+                if fila[campo] != valor:
+                    self._contar("Price", campo)
+
+    def _comparar_existencias(self, lote, productos) -> None:
+        actuales = {
+            (product_id, slug): qty
+            for product_id, slug, qty in BranchStock.objects
+            .filter(product_id__in=productos.values())
+            .values_list("product_id", "branch__slug", "quantity")
+        }
+        vistos = set()
+        for item in lote:
+            product_id = productos[item["syscom_id"]]
+            for nombre, qty in item["existencias"].items():
+                clave = (product_id, slugify(nombre)[:50])
+                vistos.add(clave)
+                if clave not in actuales:
+                    self._contar("BranchStock", "nuevos")
+                elif actuales[clave] != qty:
+                    self._contar("BranchStock", "quantity")
+        self._contar("BranchStock", "a_cero", sum(
+            1 for clave, qty in actuales.items() if qty and clave not in vistos
+        ))
+
+    def _comparar_relaciones(self, lote, productos) -> None:
+        """Categorías, imágenes y características que se agregarían."""
+        ids = list(productos.values())
+        relaciones = {
+            "ProductCategory": (
+                set(ProductCategory.objects.filter(product_id__in=ids).values_list("product_id", "category__name")),
+                lambda item: [nombre for nombre, _ in item["categorias"]],
+            ),
+            "ProductImage": (
+                set(ProductImage.objects.filter(product_id__in=ids).values_list("product_id", "url")),
+                lambda item: [url for _, url in item["imagenes"]],
+            ),
+            "Feature": (
+                set(Feature.objects.filter(product_id__in=ids).values_list("product_id", "text")),
+                lambda item: item["caracteristicas"],
+            ),
+        }
+        for modelo, (existentes, valores) in relaciones.items():
+            for item in lote:
+                product_id = productos[item["syscom_id"]]
+                self._contar(modelo, "nuevos", sum(
+                    1 for valor in set(valores(item)) if (product_id, valor) not in existentes
+                ))
@@ -0,0 +1,235 @@
+# file: dashboard/syscom_client.py
+# -----------------------------------------------------------------------------
+# Cliente HTTP compartido para la API de Syscom.
+#
+#   • Una sola `requests.Session` por proceso (keep-alive + pool de conexiones)
+#     para no pagar un handshake TCP+TLS por cada GET durante una sincronización.
+#   • Reintentos automáticos ante errores transitorios de red / 5xx.
+#   • Timeouts por defecto en todas las llamadas.
+#   • Contadores de latencia por endpoint (llamadas, errores, total, máximo y
+#     p95 sobre las últimas `MUESTRAS_LATENCIA` llamadas).
+#
+# Todas las llamadas a Syscom del proyecto deben pasar por `get_syscom_client()`.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import logging
+import math
+import re
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+SYSCOM_BASE_URL = getattr(settings, "SYSCOM_BASE_URL", "https://developers.syscom.mx")
+
+# Tamaño del pool: debe cubrir el número máximo de hilos que usan el cliente a la vez
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 20
+
+# Timeouts por defecto (conexión, lectura) en segundos
+DEFAULT_TIMEOUT = (5, 15)
+
+# Latencias recientes que se conservan por endpoint para calcular el p95
+MUESTRAS_LATENCIA = 2048
+
+# Segmentos numéricos de la ruta se agrupan en un solo endpoint (/productos/<id>)
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+# --- BLOQUE SATURACIÓN -------------------------------------------------------
+
+
+class SyscomSaturado(requests.exceptions.RequestException):
+    """
+    Syscom pide bajar el ritmo: HTTP 429, 5xx tras agotar reintentos o sin
+    conexión. `retry_after` trae los segundos indicados por la API, si los hay.
+    """
+
+    def __init__(self, *args, retry_after: float | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    """Interpreta `Retry-After` (segundos o fecha HTTP)."""
+    valor = response.headers.get("Retry-After")
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def revisar_saturacion(response: requests.Response) -> None:
+    """Lanza `SyscomSaturado` si la respuesta es 429 o 5xx."""
+    if response.status_code == 429 or response.status_code >= 500:
+        raise SyscomSaturado(
+            f"HTTP {response.status_code} de Syscom",
+            response=response,
+            retry_after=_retry_after(response),
+        )
+
+
+# --- BLOQUE CLIENTE ----------------------------------------------------------
+
+
+class SyscomClient:
+    """
+    Envoltorio sobre `requests.Session` con pool, reintentos y métricas.
+
+    Es seguro compartirlo entre hilos: `requests.Session` reutiliza conexiones
+    del pool de urllib3 y las métricas se protegen con un lock.
+    """
+
+    def __init__(self, base_url: str = SYSCOM_BASE_URL, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = self._build_session()
+        self._stats: dict[str, dict] = {}
+        self._stats_lock = threading.Lock()
+
+    # --- Construcción de la sesión ------------------------------------------
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=2,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+            # Un 429 con Retry-After lo maneja el limitador compartido
+            # (pausa a todos los workers), no cada conexión por su cuenta.
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=retry,
+            pool_block=True,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept": "application/json"})
+        return session
+
+    # --- Peticiones ----------------------------------------------------------
+
+    def url(self, path: str) -> str:
+        """Devuelve la URL absoluta para una ruta relativa (`/api/v1/...`)."""
+        if path.startswith("http"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Ejecuta la petición registrando latencia y errores del endpoint."""
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = self._endpoint_name(method, path)
+        inicio = time.perf_counter()
+        error = False
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+            error = response.status_code >= 400
+            return response
+        except requests.exceptions.RequestException:
+            error = True
+            raise
+        finally:
+            self._record(endpoint, time.perf_counter() - inicio, error)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def solicitar_token(self, client_id: str, client_secret: str) -> dict:
+        """POST /oauth/token con client_credentials; devuelve el JSON del token."""
+        response = self.post(
+            "/oauth/token",
+            data={
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "grant_type": "client_credentials",
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    # --- Métricas ------------------------------------------------------------
+
+    def _endpoint_name(self, method: str, path: str) -> str:
+        ruta = self.url(path)[len(self.base_url):] if not path.startswith("http") else path
+        ruta = ruta.split("?", 1)[0]
+        return f"{method} {_ID_SEGMENT.sub('/<id>', ruta)}"
+
+    def _record(self, endpoint: str, elapsed: float, error: bool) -> None:
+        with self._stats_lock:
+            st = self._stats.setdefault(
+                endpoint,
+                {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0,
+                 "samples": deque(maxlen=MUESTRAS_LATENCIA)},
+            )
+            st["calls"] += 1
+            st["errors"] += int(error)
+            st["total_s"] += elapsed
+            st["max_s"] = max(st["max_s"], elapsed)
+            st["samples"].append(elapsed)
+
+    def stats(self) -> dict:
+        """Copia de los contadores con la latencia promedio y p95 por endpoint."""
+        with self._stats_lock:
+            return {
+                endpoint: {
+                    **{k: v for k, v in st.items() if k != "samples"},
+                    "avg_s": st["total_s"] / st["calls"] if st["calls"] else 0.0,
+                    "p95_s": percentil(st["samples"], 95),
+                }
+                for endpoint, st in self._stats.items()
+            }
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+
+def percentil(valores, p: float) -> float:
+    """Percentil `p` (0-100) por rango más cercano; 0.0 si no hay valores."""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+# --- BLOQUE INSTANCIA COMPARTIDA ---------------------------------------------
+
+_client: SyscomClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_syscom_client() -> SyscomClient:
+    """Devuelve el cliente único del proceso (se crea en el primer uso)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SyscomClient()
+    return _client
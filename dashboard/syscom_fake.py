@@ -0,0 +1,214 @@
+# file: dashboard/syscom_fake.py
+# -----------------------------------------------------------------------------
+# Servidor local que imita la API de Syscom para pruebas de carga.
+#
+# Atiende las mismas rutas que usa el proyecto, con respuestas de la misma
+# forma que las reales y productos sintéticos deterministas por ID:
+#
+#   POST /oauth/token                       → access_token + expires_in
+#   GET  /api/v1/productos?busqueda=&pagina= → listado paginado
+#   GET  /api/v1/productos/<id>[?inventarios=1]
+#   GET  /api/v1/tipocambio
+#
+# Se puede configurar latencia (con variación), tasa de errores (503 / 429
+# con Retry-After) y vida del token (después responde 401) para ejercitar
+# limitador, circuit breaker y renovación de token.
+#
+#   python manage.py syscom_fake --port 8765 --latencia 0.05 --errores 0.02
+#   SYSCOM_BASE_URL=http://127.0.0.1:8765 python manage.py runserver
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+POR_PAGINA = 60
+MARCAS = ("Hikvision", "Epcom", "Ubiquiti", "Dahua", "TP-Link", "Syscom")
+CATEGORIAS = ("Videovigilancia", "Redes", "Control de acceso", "Energía", "Cableado")
+SUCURSALES = ("san_luis_potosi", "monterrey", "guadalajara", "chihuahua", "queretaro", "tijuana")
+
+_RUTA_PRODUCTO = re.compile(r"^/api/v1/productos/(\d+)/?$")
+
+
+@dataclass
+class ConfigFalsa:
+    latencia: float = 0.05      # segundos por respuesta
+    variacion: float = 0.5      # ± fracción aleatoria de la latencia
+    errores: float = 0.0        # fracción de respuestas 503 / 429
+    token_ttl: int = 3600       # segundos de vida de cada token
+    productos: int = 10_000     # tamaño del catálogo sintético
+    id_inicial: int = 100_000
+
+
+# --- BLOQUE PAYLOADS ---------------------------------------------------------
+
+
+def producto_falso(pid: int, inventarios: bool = True) -> dict:
+    """Producto sintético con la forma de `/productos/<id>` (determinista por ID)."""
+    rnd = random.Random(pid)
+    precio = round(rnd.uniform(5, 2500), 2)
+    marca = rnd.choice(MARCAS)
+    producto = {
+        "producto_id": str(pid),
+        "modelo": f"{marca[:3].upper()}-{pid}",
+        "total_existencia": 0,
+        "titulo": f"{rnd.choice(CATEGORIAS)} {marca} modelo {pid}",
+        "marca": marca,
+        "sat_key": "46171610",
+        "img_portada": f"https://ftp3.syscom.mx/usuarios/fotos/BancoFotografiasSyscom/{pid}.png",
+        "link_privado": f"https://www.syscom.mx/producto/{pid}.html",
+        "categorias": [
+            {"id": str(10 + nivel), "nombre": nombre, "nivel": nivel}
+            for nivel, nombre in enumerate(rnd.sample(CATEGORIAS, 2), start=1)
+        ],
+        "pvol": "0.5",
+        "marca_logo": f"https://ftp3.syscom.mx/usuarios/fotos/logotipos/{marca.lower()}.png",
+        "link": f"https://www.syscom.mx/producto/{pid}.html",
+        "iconos": {},
+        "peso": str(round(rnd.uniform(0.1, 12), 2)),
+        "existencia": {"nuevo": 0},
+        "unidad_de_medida": {"codigo_unidad": "H87", "nombre": "Pieza", "clave_unidad_sat": "H87"},
+        "precios": {
+            "precio_1": f"{precio * 1.25:.2f}",
+            "precio_especial": f"{precio * 1.05:.2f}",
+            "precio_descuento": f"{precio:.2f}",
+            "precio_lista": f"{precio * 1.4:.2f}",
+        },
+        "descripcion": f"<p>Descripción del producto sintético {pid}.</p>",
+        "garantia": rnd.choice(("1 año", "2 años", "3 años")),
+        "caracteristicas": [f"Característica {i} de {pid}" for i in range(rnd.randint(2, 6))],
+        "imagenes": [
+            {"orden": i, "imagen": f"https://ftp3.syscom.mx/usuarios/fotos/BancoFotografiasSyscom/{pid}-{i}.png"}
+            for i in range(rnd.randint(1, 4))
+        ],
+    }
+    if inventarios:
+        detalle = {suc: rnd.randint(0, 50) for suc in rnd.sample(SUCURSALES, 3)}
+        producto["existencia"] = {"nuevo": sum(detalle.values()), "detalle": {"nuevo": detalle}}
+        producto["total_existencia"] = sum(detalle.values())
+    return producto
+
+
+# --- BLOQUE SERVIDOR ---------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SyscomFake/1.0"
+
+    # Silenciar el log por petición de BaseHTTPRequestHandler
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self) -> ConfigFalsa:
+        return self.server.config
+
+    def _responder(self, status: int, cuerpo: dict, headers: dict | None = None) -> None:
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        for clave, valor in (headers or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _simular_red(self) -> bool:
+        """Aplica latencia y, según `errores`, responde 503/429. True si ya respondió."""
+        cfg = self.config
+        if cfg.latencia:
+            time.sleep(max(0.0, cfg.latencia * (1 + random.uniform(-cfg.variacion, cfg.variacion))))
+        if cfg.errores and random.random() < cfg.errores:
+            if random.random() < 0.5:
+                self._responder(429, {"message": "Too Many Requests"}, {"Retry-After": "1"})
+            else:
+                self._responder(503, {"message": "Service Unavailable"})
+            return True
+        return False
+
+    def _autorizado(self) -> bool:
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        with self.server.lock:
+            expira = self.server.tokens.get(token)
+        if expira is None or expira < time.monotonic():
+            self._responder(401, {"message": "Unauthenticated."})
+            return False
+        return True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlparse(self.path).path != "/oauth/token":
+            return self._responder(404, {"message": "Not Found"})
+        if self._simular_red():
+            return
+        token = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.tokens[token] = time.monotonic() + self.config.token_ttl
+            self.server.contadores["token"] += 1
+        self._responder(200, {
+            "token_type": "Bearer",
+            "expires_in": self.config.token_ttl,
+            "access_token": token,
+        })
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if self._simular_red() or not self._autorizado():
+            return
+
+        cfg = self.config
+        if url.path == "/api/v1/tipocambio":
+            return self._responder(200, {"normal": "18.4500", "preferencial": "18.2500",
+                                         "un_dia": "18.4000", "una_semana": "18.3000"})
+
+        if url.path.rstrip("/") == "/api/v1/productos":
+            pagina = max(1, int((query.get("pagina") or ["1"])[0]))
+            paginas = max(1, -(-cfg.productos // POR_PAGINA))
+            inicio = cfg.id_inicial + (pagina - 1) * POR_PAGINA
+            fin = min(cfg.id_inicial + cfg.productos, inicio + POR_PAGINA)
+            inventarios = "inventarios" in query
+            return self._responder(200, {
+                "cantidad": cfg.productos,
+                "pagina": pagina,
+                "paginas": paginas,
+                "productos": [producto_falso(pid, inventarios) for pid in range(inicio, fin)],
+            })
+
+        coincidencia = _RUTA_PRODUCTO.match(url.path)
+        if coincidencia:
+            with self.server.lock:
+                self.server.contadores["producto"] += 1
+            return self._responder(200, producto_falso(int(coincidencia.group(1)), "inventarios" in query))
+
+        self._responder(404, {"message": "Not Found"})
+
+
+class SyscomFakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion: tuple[str, int], config: ConfigFalsa | None = None):
+        super().__init__(direccion, _Handler)
+        self.config = config or ConfigFalsa()
+        self.tokens: dict[str, float] = {}
+        self.contadores = {"token": 0, "producto": 0}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def iniciar_servidor_falso(host: str = "127.0.0.1", port: int = 0, **config) -> SyscomFakeServer:
+    """Arranca el servidor en un hilo (port=0 → puerto libre). Detener con `.shutdown()`."""
+    server = SyscomFakeServer((host, port), ConfigFalsa(**config))
+    threading.Thread(target=server.serve_forever, name="syscom-fake", daemon=True).start()
+    return server
@@ -0,0 +1,131 @@
+# file: dashboard/syscom_paginacion.py
+# -----------------------------------------------------------------------------
+# Recorrido paginado del listado de productos de Syscom.
+#
+# `/api/v1/productos?busqueda=…&pagina=N` (también `marca=` y `categoria=`)
+# devuelve una página con `cantidad`, `pagina`, `paginas` y `productos`. Los
+# generadores de este módulo recorren todas las páginas de forma perezosa:
+# sólo hay en memoria la página actual y, con `prefetch=True`, la siguiente
+# (que se descarga en un hilo mientras se procesa la actual).
+#
+# Cada página pasa por el mismo limitador, `Retry-After` y circuit breaker
+# que las descargas de productos (`sync_fetcher.llamar_con_reintentos`): un
+# 429 a mitad del recorrido se reintenta en lugar de abortar la corrida.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.db import close_old_connections
+
+from dashboard.syscom_client import revisar_saturacion
+from dashboard.syscom_token import get_autenticado
+from dashboard.sync_fetcher import CircuitBreaker, get_rate_limiter, llamar_con_reintentos
+
+logger = logging.getLogger(__name__)
+
+API_PRODUCTOS_URL = "/api/v1/productos"
+
+
+# --- BLOQUE PÁGINAS ----------------------------------------------------------
+
+
+def obtener_pagina_syscom(params: dict, pagina: int = 1) -> dict:
+    """
+    Descarga una página del listado respetando el limitador compartido (un
+    solo intento; lo usa la búsqueda del admin).
+
+    Returns
+    -------
+    dict
+        `{"productos": [...], "pagina": n, "paginas": total, "cantidad": n}`
+    """
+    get_rate_limiter().acquire()
+    return _pedir_pagina(params, pagina)
+
+
+def _pedir_pagina(params: dict, pagina: int) -> dict:
+    response = get_autenticado(API_PRODUCTOS_URL, params={**params, "pagina": pagina})
+    revisar_saturacion(response)
+    response.raise_for_status()
+    data = response.json()
+
+    if not isinstance(data, dict):
+        # Algunas respuestas llegan como lista sin metadatos de paginación
+        data = {"productos": data or [], "paginas": pagina}
+    productos = data.get("productos") or []
+    return {
+        "productos": productos,
+        "pagina": int(data.get("pagina") or pagina),
+        "paginas": int(data.get("paginas") or pagina),
+        "cantidad": int(data.get("cantidad") or len(productos)),
+    }
+
+
+def _pagina_con_reintentos(params: dict, pagina: int, breaker: CircuitBreaker) -> dict:
+    return llamar_con_reintentos(partial(_pedir_pagina, params), pagina, get_rate_limiter(), breaker)
+
+
+def _pagina_en_hilo(params: dict, pagina: int, breaker: CircuitBreaker) -> dict:
+    try:
+        return _pagina_con_reintentos(params, pagina, breaker)
+    finally:
+        close_old_connections()
+
+
+def paginas_syscom(params: dict, desde: int = 1, prefetch: bool = False) -> Iterator[dict]:
+    """
+    Genera las páginas del listado a partir de `desde` hasta la última.
+
+    Con `prefetch=True` la página siguiente se pide mientras el consumidor
+    procesa la actual (como máximo una página adelantada). Un `SyscomSaturado`
+    sólo se propaga si persiste tras los reintentos y `CircuitoAbierto` si
+    Syscom no se recupera.
+    """
+    breaker = CircuitBreaker()
+    if not prefetch:
+        pagina = desde
+        while True:
+            actual = _pagina_con_reintentos(params, pagina, breaker)
+            yield actual
+            if not actual["productos"] or pagina >= actual["paginas"]:
+                return
+            pagina += 1
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="syscom-pagina") as pool:
+        siguiente = pool.submit(_pagina_en_hilo, params, desde, breaker)
+        try:
+            while siguiente is not None:
+                actual = siguiente.result()
+                pagina = actual["pagina"]
+                hay_mas = actual["productos"] and pagina < actual["paginas"]
+                siguiente = pool.submit(_pagina_en_hilo, params, pagina + 1, breaker) if hay_mas else None
+                yield actual
+        finally:
+            if siguiente is not None:
+                siguiente.cancel()
+
+
+def filtros_syscom(busqueda: str = "", marca: str = "", categoria: str = "") -> dict:
+    """Parámetros de consulta del listado (sólo los que traen valor)."""
+    params = {"busqueda": busqueda, "marca": marca, "categoria": categoria}
+    return {k: v for k, v in params.items() if v}
+
+
+# --- BLOQUE PRODUCTOS --------------------------------------------------------
+
+
+def productos_de_paginas(paginas) -> Iterator[dict]:
+    """Aplana un generador de páginas en productos crudos."""
+    for pagina in paginas:
+        yield from pagina["productos"]
+
+
+def ids_de_paginas(paginas) -> Iterator[str]:
+    """Aplana un generador de páginas en IDs de Syscom."""
+    for producto in productos_de_paginas(paginas):
+        if isinstance(producto, dict) and producto.get("producto_id"):
+            yield str(producto["producto_id"])
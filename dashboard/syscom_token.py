@@ -0,0 +1,152 @@
+# file: dashboard/syscom_token.py
+# -----------------------------------------------------------------------------
+# Token OAuth de Syscom compartido por todo el proceso.
+#
+#   • El token se guarda en memoria hasta poco antes de `expires_at`, así que
+#     las llamadas a la API no consultan `SyscomCredential` cada vez.
+#   • Se renueva por adelantado (margen configurable) y las renovaciones se
+#     serializan con un lock: aunque 20 hilos reciban un 401 a la vez, sólo
+#     uno pide token nuevo y el resto reutiliza el resultado.
+#   • Entre procesos (workers web / Celery) la fila de la credencial se
+#     bloquea con `select_for_update` y se relee antes de renovar, de modo que
+#     si otro proceso ya la renovó se usa ese token.
+#
+# Las llamadas a Syscom deben obtener headers con `get_token_manager()` o usar
+# `get_autenticado()`, que además reintenta una vez ante un 401.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import logging
+import threading
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from dashboard.syscom_client import get_syscom_client
+from products.models import SyscomCredential
+
+logger = logging.getLogger(__name__)
+
+# Segundos antes de `expires_at` en que el token se considera por vencer
+REFRESH_MARGIN = getattr(settings, "SYSCOM_TOKEN_REFRESH_MARGIN", 300)
+
+
+# --- BLOQUE GESTOR DE TOKEN --------------------------------------------------
+
+
+class SyscomTokenManager:
+    """
+    Caché en memoria del token de Syscom con renovación única ("single-flight").
+
+    El estado es la tupla `(token, renovar_en)`; se reemplaza completa para
+    que la lectura sin lock desde otros hilos siempre vea un par consistente.
+    `renovar_en` es `expires_at` menos el margen (a lo más la mitad de la vida
+    del token, para tokens cortos).
+    """
+
+    def __init__(self, margen: float = REFRESH_MARGIN):
+        self.margen = timedelta(seconds=margen)
+        self._actual: tuple[str, object] | None = None
+        self._lock = threading.Lock()
+
+    # --- Consulta ------------------------------------------------------------
+
+    def _vigente(self, actual) -> bool:
+        return bool(actual and actual[0] and actual[1] and timezone.now() < actual[1])
+
+    def _estado(self, token: str, expires_at, vida: timedelta | None = None):
+        if not expires_at:
+            return (token, None)
+        margen = min(self.margen, vida / 2) if vida else self.margen
+        return (token, expires_at - margen)
+
+    def token(self) -> str:
+        """Token válido; lo carga o renueva sólo si hace falta."""
+        actual = self._actual
+        if self._vigente(actual):
+            return actual[0]
+
+        with self._lock:
+            actual = self._actual
+            if self._vigente(actual):
+                return actual[0]   # otro hilo lo renovó mientras esperábamos
+            return self._renovar(rechazado=actual[0] if actual else None)
+
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token()}"}
+
+    # --- Renovación ----------------------------------------------------------
+
+    def invalidar(self, token_rechazado: str) -> str:
+        """
+        Se llama cuando la API respondió 401 con `token_rechazado`.
+
+        Si otro hilo ya lo reemplazó devuelve el token nuevo sin pedir otro.
+        """
+        with self._lock:
+            actual = self._actual
+            if actual and actual[0] != token_rechazado and self._vigente(actual):
+                return actual[0]
+            return self._renovar(rechazado=token_rechazado)
+
+    def renovar(self) -> str:
+        """Pide un token nuevo a Syscom aunque el actual siga vigente."""
+        with self._lock:
+            return self._renovar(nuevo=True)
+
+    def olvidar(self) -> None:
+        """Descarta la caché (p. ej. al cambiar las credenciales)."""
+        with self._lock:
+            self._actual = None
+
+    def _renovar(self, rechazado: str | None = None, nuevo: bool = False) -> str:
+        # Llamar con `self._lock` tomado
+        with transaction.atomic():
+            cred = SyscomCredential.objects.select_for_update().latest("id")
+
+            # Otro proceso pudo haberlo renovado: si el token en BD es distinto
+            # al rechazado y sigue vigente, basta con usarlo.
+            en_bd = self._estado(cred.token, cred.expires_at)
+            if not nuevo and cred.token != rechazado and self._vigente(en_bd):
+                self._actual = en_bd
+                return cred.token
+
+            token_data = get_syscom_client().solicitar_token(cred.client_id, cred.client_secret)
+            vida = timedelta(seconds=token_data["expires_in"])
+            cred.token = token_data["access_token"]
+            cred.expires_at = timezone.now() + vida
+            cred.save(update_fields=["token", "expires_at", "updated_at"])
+
+        self._actual = self._estado(cred.token, cred.expires_at, vida)
+        logger.info("✅  Token de Syscom renovado exitosamente")
+        return cred.token
+
+
+# --- BLOQUE INSTANCIA COMPARTIDA ---------------------------------------------
+
+_manager = SyscomTokenManager()
+
+
+def get_token_manager() -> SyscomTokenManager:
+    return _manager
+
+
+def get_autenticado(path: str, **kwargs) -> requests.Response:
+    """
+    GET a Syscom con el token en caché; ante un 401 renueva (una sola vez por
+    token rechazado) y repite la petición.
+    """
+    manager = get_token_manager()
+    client = get_syscom_client()
+    extra = kwargs.pop("headers", {})
+
+    token = manager.token()
+    response = client.get(path, headers={**extra, "Authorization": f"Bearer {token}"}, **kwargs)
+    if response.status_code == 401:
+        logger.warning("Token de Syscom rechazado (401). Renovando…")
+        token = manager.invalidar(token)
+        response = client.get(path, headers={**extra, "Authorization": f"Bearer {token}"}, **kwargs)
+    return response
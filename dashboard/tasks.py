@@ -0,0 +1,215 @@
+# file: dashboard/tasks.py
+# -----------------------------------------------------------------------------
+# Tareas Celery de sincronización con Syscom.
+#
+# Las vistas crean un `SyncJob` y lo encolan con `encolar_sync_job`; el worker
+# ejecuta la sincronización y deja estado, contadores y tiempos en el registro.
+#
+# Los trabajos guardan checkpoint por lote: si fallan, se cancelan o el worker
+# muere (la tarea se re-entrega por `acks_late`), al volver a ejecutarse sólo
+# procesan los IDs que faltan.
+#
+# `programar_refresco_existencias` corre con Celery beat y mantiene frescas
+# las existencias sin sincronizar el producto completo;
+# `actualizar_tipo_cambio_programado` trae el tipo de cambio cada mañana
+# (y `recalcular_precios_catalogo` reprecia el catálogo si cambió),
+# `consolidar_historial_programado` resume el historial de precios/existencias
+# y `limpieza_programada` borra los segmentos de archivo vencidos y los
+# trabajos de refresco de existencias terminados.
+# -----------------------------------------------------------------------------
+
+# --- BLOQUE IMPORTS Y CONFIGURACIÓN ------------------------------------------
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from dashboard.models import SyncJob
+from dashboard.sync_progress import SyncProgress
+
+logger = logging.getLogger(__name__)
+
+
+# --- BLOQUE ENCOLADO ---------------------------------------------------------
+
+
+def encolar_sync_job(job: SyncJob) -> None:
+    """Envía el trabajo a la cola cuando la transacción que lo creó se confirma."""
+    transaction.on_commit(lambda: ejecutar_sync_job.delay(job.pk))
+
+
+# --- BLOQUE TAREAS -----------------------------------------------------------
+
+
+@shared_task(bind=True)
+def ejecutar_sync_job(self, job_id: int) -> None:
+    """Ejecuta un `SyncJob` pendiente según su tipo."""
+    # Import diferido: buscar_sincronizar importa este módulo
+    from dashboard.buscar_sincronizar import (
+        refrescar_existencias,
+        sincronizar_inventario_sucursal,
+        sincronizar_productos_background,
+    )
+
+    job = SyncJob.objects.get(pk=job_id)
+    if job.status == SyncJob.Status.COMPLETED:
+        logger.info(f"⏭️ {job} ya estaba completado")
+        return
+
+    product_ids = job.pending_ids()
+    params = job.params or {}
+    progress = SyncProgress(job, total=len(params.get("product_ids", [])))
+
+    if job.cancel_requested:
+        # Se canceló antes de que un worker lo tomara
+        progress.terminar(SyncJob.Status.CANCELLED)
+        return
+
+    job.status = SyncJob.Status.RUNNING
+    job.task_id = self.request.id or ""
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=["status", "task_id", "started_at", "updated_at"])
+    if job.checkpoint:
+        logger.info(f"🔁 Reanudando {job}: faltan {len(product_ids)} productos")
+
+    try:
+        if job.kind == SyncJob.Kind.PRODUCTOS:
+            sincronizar_productos_background(product_ids, progress)
+        elif job.kind == SyncJob.Kind.EXISTENCIAS:
+            refrescar_existencias(product_ids, progress)
+        else:
+            sincronizar_inventario_sucursal(product_ids, params.get("branch_slug"), progress)
+        progress.terminar(SyncJob.Status.CANCELLED if progress.cancelado else SyncJob.Status.COMPLETED)
+
+    except Exception as e:
+        logger.error(f"❌ Error en SyncJob #{job_id}: {e}", exc_info=True)
+        progress.terminar(SyncJob.Status.FAILED, error=str(e))
+
+    logger.info(f"🏁 {job} terminado en {job.duration}")
+
+
+@shared_task
+def programar_refresco_existencias() -> int | None:
+    """
+    Tarea periódica (Celery beat, ver `CELERY_BEAT_SCHEDULE`): crea y encola
+    un `SyncJob` de existencias sobre el catálogo visible, en orden de
+    prioridad. No hace nada si todavía corre el refresco anterior.
+
+    Un refresco "activo" sin actividad en `SYSCOM_STOCK_REFRESH_STALE_MINUTES`
+    (worker muerto, mensaje perdido) se marca FAILED para que no bloquee los
+    siguientes; se puede reanudar desde su checkpoint.
+    """
+    from dashboard.buscar_sincronizar import productos_para_refresco
+
+    activos = SyncJob.objects.filter(
+        kind=SyncJob.Kind.EXISTENCIAS,
+        status__in=[SyncJob.Status.PENDING, SyncJob.Status.RUNNING],
+    )
+    ahora = timezone.now()
+    limite = ahora - timedelta(minutes=getattr(settings, "SYSCOM_STOCK_REFRESH_STALE_MINUTES", 30))
+    atascados = activos.filter(updated_at__lt=limite).update(
+        status=SyncJob.Status.FAILED,
+        error="Sin actividad: el worker no terminó el refresco",
+        finished_at=ahora,
+        updated_at=ahora,
+    )
+    if atascados:
+        logger.warning(f"⚠️ {atascados} refrescos de existencias sin actividad marcados como fallidos")
+    if activos.exists():
+        logger.info("⏭️ Refresco de existencias anterior aún en curso")
+        return None
+
+    product_ids = productos_para_refresco(getattr(settings, "SYSCOM_STOCK_REFRESH_LIMIT", 0) or None)
+    if not product_ids:
+        return None
+    with transaction.atomic():
+        job = SyncJob.objects.create(
+            kind=SyncJob.Kind.EXISTENCIAS,
+            total=len(product_ids),
+            params={"product_ids": product_ids},
+        )
+        encolar_sync_job(job)
+    logger.info(f"📦 {job} programado con {len(product_ids)} productos")
+    return job.pk
+
+
+@shared_task
+def actualizar_tipo_cambio_programado() -> None:
+    """Tarea diaria (Celery beat): trae el tipo de cambio de Syscom si cambió."""
+    from dashboard.tipo_cambio import actualizar_tipo_cambio
+
+    registro, creado = actualizar_tipo_cambio()
+    if registro is None:
+        logger.error("❌ No se pudo obtener el tipo de cambio de Syscom")
+
+
+@shared_task
+def recalcular_precios_catalogo() -> None:
+    """
+    Recalcula `Product.price_mxn` de todo el catálogo (al cambiar el tipo de
+    cambio, ver `products/signals.py`) e invalida facetas y totales en caché.
+    """
+    from catalogo.facetas import invalidar_catalogo
+    from core.precios import recalcular_precios_mxn
+
+    recalcular_precios_mxn()
+    # Los filtros por precio cambian: facetas y totales en caché ya no sirven
+    invalidar_catalogo()
+
+
+@shared_task
+def consolidar_historial_programado() -> None:
+    """Tarea horaria (Celery beat): resúmenes diarios de precio/existencia de ayer y hoy."""
+    from dashboard.historial import consolidar_historial
+
+    hoy = timezone.localdate()
+    for dia in (hoy - timedelta(days=1), hoy):
+        consolidar_historial(dia)
+
+
+@shared_task
+def limpieza_programada() -> None:
+    """
+    Tarea diaria (Celery beat): borra segmentos de archivo más viejos que la
+    retención y los `SyncJob` de refresco de existencias terminados hace más
+    de `SYSCOM_STOCK_REFRESH_KEEP_DAYS` días (cada uno guarda todos los IDs).
+    """
+    from dashboard.sync_archivo import purgar_segmentos
+
+    purgar_segmentos()
+
+    dias = getattr(settings, "SYSCOM_STOCK_REFRESH_KEEP_DAYS", 2)
+    if dias:
+        borrados, _ = SyncJob.objects.filter(
+            kind=SyncJob.Kind.EXISTENCIAS,
+            finished_at__lt=timezone.now() - timedelta(days=dias),
+        ).exclude(status__in=[SyncJob.Status.PENDING, SyncJob.Status.RUNNING]).delete()
+        if borrados:
+            logger.info(f"🧹 {borrados} trabajos de refresco de existencias borrados")
+
+
+# --- BLOQUE CANCELAR / REANUDAR ----------------------------------------------
+
+
+def cancelar_sync_job(job: SyncJob) -> bool:
+    """Pide al worker que se detenga en el siguiente lote."""
+    if not job.is_active:
+        return False
+    SyncJob.objects.filter(pk=job.pk).update(cancel_requested=True, updated_at=timezone.now())
+    return True
+
+
+def reanudar_sync_job(job: SyncJob) -> bool:
+    """Vuelve a encolar un trabajo fallido o cancelado desde su último checkpoint."""
+    if not job.can_resume:
+        return False
+    job.status = SyncJob.Status.PENDING
+    job.cancel_requested = False
+    job.error = ""
+    job.finished_at = None
+    job.save(update_fields=["status", "cancel_requested", "error", "finished_at", "updated_at"])
+    encolar_sync_job(job)
+    return True
@@ -3,8 +3,9 @@
 
 import requests
 import logging
-from django.utils import timezone
-from products.models import SyscomCredential
+from core.tipo_cambio import tipo_cambio_actual
+from products.models import ExchangeRate, SyscomCredential
+from dashboard.syscom_token import get_autenticado
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -14,27 +15,16 @@ def obtener_tipo_cambio():
     Obtiene el tipo de cambio actual desde la API de Syscom
     """
     try:
-        # URL de la API de Syscom para tipo de cambio
-        url = "https://developers.syscom.mx/api/v1/tipocambio"
+        # Ruta de la API de Syscom para tipo de cambio
+        url = "/api/v1/tipocambio"
         
-        # Obtener credenciales
+        # El token se renueva solo si está vencido (ver syscom_token)
         try:
-            cred = SyscomCredential.objects.latest('id')
+            response = get_autenticado(url, headers={"Accept": "application/json"}, timeout=10)
         except SyscomCredential.DoesNotExist:
             logger.error("No hay credenciales Syscom configuradas")
             return None
-        
-        # Verificar si el token es válido
-        if not cred.token or cred.is_expired():
-            logger.error("Token de Syscom inválido o expirado")
-            return None
-        
-        headers = {
-            "Authorization": f"Bearer {cred.token}",
-            "Accept": "application/json"
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
+
         response.raise_for_status()
         
         data = response.json()
@@ -58,3 +48,34 @@ def obtener_tipo_cambio():
     except Exception as e:
         logger.exception(f"Error inesperado al obtener tipo de cambio: {str(e)}")
         return None
+
+
+def actualizar_tipo_cambio(updated_by='sistema', update_type='auto'):
+    """
+    Consulta Syscom y registra un `ExchangeRate` sólo si el valor cambió.
+
+    Al confirmar, `products/signals.py` deja el valor en la caché
+    (`core.tipo_cambio`) y envía `tipo_cambio_cambiado` para recalcular
+    datos que dependen del precio en MXN. Si no cambió, sólo precalienta la
+    caché.
+
+    Returns
+    -------
+    tuple[ExchangeRate | None, bool]
+        (registro vigente, True si se creó uno nuevo). `(None, False)` si
+        Syscom no respondió.
+    """
+    nuevo = obtener_tipo_cambio()
+    if nuevo is None:
+        return None, False
+
+    anterior = ExchangeRate.objects.order_by('-created_at').first()
+    if anterior and round(anterior.rate, 4) == nuevo:
+        logger.info(f"Tipo de cambio sin cambios ({nuevo})")
+        tipo_cambio_actual()
+        return anterior, False
+
+    registro = ExchangeRate.objects.create(rate=nuevo, updated_by=updated_by, update_type=update_type)
+    logger.info(f"💱 Tipo de cambio actualizado: {anterior.rate if anterior else '—'} → {nuevo}")
+    return registro, True
+
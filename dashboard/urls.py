@@ -2,9 +2,12 @@
 from django.urls import path
 from . import views
 
-from dashboard.buscar_sincronizar import sincronizar_productos, sincronizar_test, start_product_sync, get_product_sync_progress
+from dashboard.buscar_sincronizar import sincronizar_productos, sincronizar_mas_resultados, sincronizar_test, start_product_sync, get_product_sync_progress
 from dashboard.admin_gestion import gestion_productos, sincronizar_inventarios, get_sync_progress
 from dashboard import admin_editar_detalles
+from dashboard.models import SyncJob
+from dashboard.sync_stream import sync_progress_stream
+from dashboard.historial import historial_bajadas_precio, historial_producto
 
 
 app_name = 'dashboard'
@@ -20,12 +23,19 @@ urlpatterns = [
     path('admin/renew-syscom-token/', views.renew_syscom_token, name='renew_syscom_token'),
     path('tipo-cambio/', views.tipo_cambio, name='tipo_cambio'),
     path('sincronizar/', sincronizar_productos, name='sincronizar'),
+    path('sincronizar/mas/', sincronizar_mas_resultados, name='sincronizar_mas'),
     path('sincronizar/start/', start_product_sync, name='start_product_sync'),
     path('sincronizar/progress/', get_product_sync_progress, name='product_sync_progress'),
+    path('sincronizar/progress/stream/', sync_progress_stream, {'kind': SyncJob.Kind.PRODUCTOS}, name='product_sync_stream'),
     path('sincronizar-test/', sincronizar_test, name='sincronizar_test'),
     path('gestion/', gestion_productos, name='gestion_productos'),
     path('gestion/editar-productos/<int:product_id>/', admin_editar_detalles.editar_producto, name='editar_producto'),
     path('gestion/sincronizar-inventarios/', sincronizar_inventarios, name='sincronizar_inventarios'),
     path('gestion/sync-progress/', get_sync_progress, name='sync_progress'),
+    path('gestion/sync-progress/stream/', sync_progress_stream, {'kind': SyncJob.Kind.INVENTARIO}, name='sync_progress_stream'),
+    path('sync-jobs/<int:job_id>/cancelar/', views.cancel_sync_job, name='cancel_sync_job'),
+    path('sync-jobs/<int:job_id>/reanudar/', views.resume_sync_job, name='resume_sync_job'),
+    path('historial/bajadas/', historial_bajadas_precio, name='historial_bajadas'),
+    path('historial/producto/<int:product_id>/', historial_producto, name='historial_producto'),
     
 ]
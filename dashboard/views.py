@@ -8,6 +8,7 @@
 ### - Crear un comando de Django para reset: python manage.py reset_system --full Que elimine todas las tablas y datos pero mantenga las migraciones
 
 # file dashboard/views.py
+from django.conf import settings
 from django.db import transaction, connection
 from django.contrib import messages
 from django.shortcuts import render, get_object_or_404, redirect
@@ -25,9 +26,13 @@ from products.models import SyscomCredential
 from django.utils import timezone
 from datetime import timedelta
 import requests
-from dashboard.tipo_cambio import obtener_tipo_cambio
+from dashboard.tipo_cambio import actualizar_tipo_cambio
+from dashboard.syscom_token import get_token_manager
 from django.contrib.admin.models import LogEntry, DELETION, ADDITION, CHANGE
 from django.urls import reverse
+from django.http import JsonResponse
+from dashboard.models import SyncJob
+from dashboard.tasks import cancelar_sync_job, reanudar_sync_job
 
 
 @login_required
@@ -78,6 +83,7 @@ def save_syscom_credentials(request):
             cred.save()
         else:
             SyscomCredential.objects.create(client_id=client_id, client_secret=client_secret)
+        get_token_manager().olvidar()
         
         messages.success(request, 'Credenciales guardadas correctamente')
         return redirect('dashboard:admin_panel')
@@ -86,32 +92,13 @@ def save_syscom_credentials(request):
 
 @staff_member_required
 def renew_syscom_token(request):
-    try:
-        cred = SyscomCredential.objects.latest('id')
-    except SyscomCredential.DoesNotExist:
+    if not SyscomCredential.objects.exists():
         messages.error(request, 'Primero debe configurar las credenciales')
         return redirect('dashboard:admin_panel')
     
-    # Lógica para renovar el token
+    # Renovar y actualizar la caché de token del proceso
     try:
-        url = "https://developers.syscom.mx/oauth/token"
-        data = {
-            "client_id": cred.client_id,
-            "client_secret": cred.client_secret,
-            "grant_type": "client_credentials"
-        }
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-        
-        response = requests.post(url, data=data, headers=headers)
-        response.raise_for_status()
-        token_data = response.json()
-        
-        # Actualizar credencial con nuevo token
-        cred.token = token_data['access_token']
-        cred.expires_at = timezone.now() + timedelta(seconds=token_data['expires_in'])
-        cred.save()
+        get_token_manager().renovar()
         
         messages.success(request, 'Token renovado correctamente')
     except requests.exceptions.RequestException as e:
@@ -314,36 +301,33 @@ def tipo_cambio(request):
     
     # Handle manual update
     if request.method == 'POST':
-        nuevo_tipo_cambio = obtener_tipo_cambio()
-        
-        if nuevo_tipo_cambio is not None:
-            # Create new record
-            nuevo_registro = ExchangeRate(
-                rate=nuevo_tipo_cambio,
-                updated_by=request.user.username,
-                update_type='manual'
-            )
-            nuevo_registro.save()
-            
+        nuevo_registro, creado = actualizar_tipo_cambio(
+            updated_by=request.user.username,
+            update_type='manual'
+        )
+
+        if nuevo_registro is None:
+            messages.error(request, 'Error al obtener el tipo de cambio')
+        elif creado:
             # Log the action
             LogEntry.objects.log_action(
                 user_id=request.user.id,
                 content_type_id=ContentType.objects.get_for_model(ExchangeRate).pk,
                 object_id=nuevo_registro.id,
-                object_repr=f"Tipo de Cambio {nuevo_tipo_cambio}",
+                object_repr=f"Tipo de Cambio {nuevo_registro.rate}",
                 action_flag=ADDITION,
                 change_message="Actualización manual"
             )
             
-            messages.success(request, f'Tipo de cambio actualizado a {nuevo_tipo_cambio}')
+            messages.success(request, f'Tipo de cambio actualizado a {nuevo_registro.rate}')
         else:
-            messages.error(request, 'Error al obtener el tipo de cambio')
+            messages.info(request, f'El tipo de cambio no ha cambiado ({nuevo_registro.rate})')
         return redirect('dashboard:tipo_cambio')
     
-    # Calculate next update
-    now = timezone.now()
-    next_update = now.replace(hour=9, minute=0, second=0, microsecond=0)
-    if now.hour >= 9:
+    # Next update (Celery beat, see CELERY_BEAT_SCHEDULE)
+    now = timezone.localtime()
+    next_update = now.replace(hour=settings.TIPO_CAMBIO_HORA, minute=0, second=0, microsecond=0)
+    if now >= next_update:
         next_update += timedelta(days=1)
     
     return render(request, 'dashboard/tipo_cambio.html', {
@@ -365,3 +349,26 @@ def admin_action_log(request):
     page_obj = paginator.get_page(page_number)
     
     return render(request, 'dashboard/admin_action_log.html', {'page_obj': page_obj})
+
+
+# Cancelar / reanudar trabajos de sincronización (llamadas AJAX)
+@login_required
+@staff_member_required
+def cancel_sync_job(request, job_id):
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid method'}, status=405)
+    job = get_object_or_404(SyncJob, pk=job_id)
+    if not cancelar_sync_job(job):
+        return JsonResponse({'status': 'error', 'message': 'El trabajo ya terminó'}, status=409)
+    return JsonResponse({'status': 'cancelling', 'job_id': job.pk})
+
+
+@login_required
+@staff_member_required
+def resume_sync_job(request, job_id):
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid method'}, status=405)
+    job = get_object_or_404(SyncJob, pk=job_id)
+    if not reanudar_sync_job(job):
+        return JsonResponse({'status': 'error', 'message': 'No hay nada que reanudar'}, status=409)
+    return JsonResponse({'status': 'started', 'job_id': job.pk})
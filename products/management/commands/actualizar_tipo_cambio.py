@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.tipo_cambio import actualizar_tipo_cambio
+
+
+class Command(BaseCommand):
+    help = (
+        'Consulta el tipo de cambio en Syscom y lo registra sólo si cambió. '
+        'Es lo mismo que ejecuta Celery beat cada mañana (TIPO_CAMBIO_HORA); '
+        'sirve también para cron.'
+    )
+
+    def handle(self, *args, **options):
+        registro, creado = actualizar_tipo_cambio()
+        if registro is None:
+            raise CommandError('No se pudo obtener el tipo de cambio de Syscom')
+        if creado:
+            self.stdout.write(self.style.SUCCESS(f'Tipo de cambio actualizado a {registro.rate}'))
+        else:
+            self.stdout.write(f'Sin cambios: {registro.rate}')
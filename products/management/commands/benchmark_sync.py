@@ -0,0 +1,153 @@
+import json
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from dashboard import sync_fetcher, syscom_client
+from dashboard.buscar_sincronizar import sincronizar_productos_background
+from dashboard.syscom_client import SyscomClient, percentil
+from dashboard.syscom_fake import iniciar_servidor_falso
+from dashboard.syscom_token import get_token_manager
+from dashboard.sync_progress import SyncProgress
+from products.models import SyscomCredential
+
+
+@contextmanager
+def apuntar_a_syscom_falso(base_url, rate):
+    """
+    Redirige cliente, limitador y token al servidor falso mientras dura el
+    bloque; al salir restaura todo, incluido el token guardado en BD.
+    """
+    cred = SyscomCredential.objects.order_by('-id').first()
+    creada = cred is None
+    if creada:
+        cred = SyscomCredential.objects.create(client_id='benchmark', client_secret='benchmark')
+    token_original, expira_original = cred.token, cred.expires_at
+
+    cliente, limitador = syscom_client._client, sync_fetcher._bucket
+    syscom_client._client = SyscomClient(base_url=base_url)
+    sync_fetcher._bucket = sync_fetcher.AdaptiveRateLimiter(rate=rate, capacity=max(1, int(rate)))
+    get_token_manager().olvidar()
+    try:
+        yield syscom_client._client
+    finally:
+        syscom_client._client, sync_fetcher._bucket = cliente, limitador
+        get_token_manager().olvidar()
+        if creada:
+            cred.delete()
+        else:
+            SyscomCredential.objects.filter(pk=cred.pk).update(token=token_original, expires_at=expira_original)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la sincronización completa (descarga, normalización y escritura) '
+        'contra un Syscom falso local: productos/seg, consultas SQL por producto '
+        'y p95 por etapa. Escribe productos sintéticos en la BD configurada: '
+        'úselo con una base de datos desechable.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--productos', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=None, help='Hilos de descarga')
+        parser.add_argument('--rate', type=float, default=1000.0, help='Peticiones/seg permitidas')
+        parser.add_argument('--latencia', type=float, default=0.05, help='Latencia simulada de Syscom (s)')
+        parser.add_argument('--errores', type=float, default=0.0, help='Fracción de respuestas 503/429')
+        parser.add_argument('--token-ttl', type=int, default=3600, help='Vida del token simulado (s)')
+        parser.add_argument('--forzar', action='store_true', help='Reescribir aunque los hashes no cambien')
+        parser.add_argument('--json', action='store_true', help='Imprimir el resultado en JSON')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='No pedir confirmación')
+
+    def handle(self, *args, **options):
+        n = options['productos']
+        if n < 1:
+            raise CommandError('--productos debe ser mayor que 0')
+        if options['interactive']:
+            respuesta = input(
+                f"Se escribirán {n} productos sintéticos en la BD '{connection.settings_dict['NAME']}'. "
+                "¿Continuar? [s/N] "
+            )
+            if respuesta.strip().lower() not in ('s', 'si', 'sí', 'y', 'yes'):
+                raise CommandError('Cancelado')
+
+        server = iniciar_servidor_falso(
+            productos=n,
+            latencia=options['latencia'],
+            errores=options['errores'],
+            token_ttl=options['token_ttl'],
+        )
+        try:
+            with apuntar_a_syscom_falso(server.base_url, options['rate']) as cliente:
+                resultado = self._medir(server, cliente, options)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, indent=2))
+        else:
+            self._imprimir(resultado)
+
+    def _medir(self, server, cliente, options):
+        n = options['productos']
+        ids = [str(server.config.id_inicial + i) for i in range(n)]
+        progress = SyncProgress(total=n, muestras=True)
+        consultas = 0
+
+        def contar(execute, sql, params, many, context):
+            nonlocal consultas
+            consultas += 1
+            return execute(sql, params, many, context)
+
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(contar):
+            exitosos, errores = sincronizar_productos_background(
+                ids, progress, workers=options['workers'], forzar=options['forzar']
+            )
+        transcurrido = time.perf_counter() - inicio
+
+        return {
+            'productos': n,
+            'exitosos': exitosos,
+            'errores': errores,
+            'segundos': round(transcurrido, 3),
+            'productos_por_segundo': round(n / transcurrido, 2),
+            'consultas_sql': consultas,
+            'consultas_por_producto': round(consultas / n, 2),
+            'etapas': {
+                etapa: {
+                    'total_s': round(progress.etapas[etapa], 3),
+                    'p95_ms': round(percentil(muestras, 95) * 1000, 2),
+                }
+                for etapa, muestras in progress.muestras.items()
+            },
+            'http': {
+                endpoint: {
+                    'llamadas': st['calls'],
+                    'errores': st['errors'],
+                    'avg_ms': round(st['avg_s'] * 1000, 2),
+                    'p95_ms': round(st['p95_s'] * 1000, 2),
+                }
+                for endpoint, st in cliente.stats().items()
+            },
+            'tokens_emitidos': server.contadores['token'],
+        }
+
+    def _imprimir(self, r):
+        self.stdout.write(self.style.SUCCESS(
+            f"{r['productos']} productos en {r['segundos']} s → {r['productos_por_segundo']} prod/s "
+            f"({r['exitosos']} ok, {r['errores']} con error)"
+        ))
+        self.stdout.write(f"Consultas SQL: {r['consultas_sql']} ({r['consultas_por_producto']} por producto)")
+        self.stdout.write('Etapa       total (s)    p95 (ms)')
+        for etapa, st in r['etapas'].items():
+            self.stdout.write(f"{etapa:<10} {st['total_s']:>10} {st['p95_ms']:>11}")
+        for endpoint, st in r['http'].items():
+            self.stdout.write(
+                f"{endpoint}: {st['llamadas']} llamadas, {st['errores']} errores, "
+                f"promedio {st['avg_ms']} ms, p95 {st['p95_ms']} ms"
+            )
+        self.stdout.write(f"Tokens emitidos por el servidor falso: {r['tokens_emitidos']}")
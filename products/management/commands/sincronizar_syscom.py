@@ -0,0 +1,84 @@
+from itertools import chain
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.buscar_sincronizar import sincronizar_productos_background
+from dashboard.syscom_paginacion import filtros_syscom, ids_de_paginas, paginas_syscom
+from dashboard.sync_archivo import contar_registros, resolver_segmento
+from dashboard.sync_progress import SyncProgress
+
+
+class Command(BaseCommand):
+    help = (
+        'Sincroniza todos los productos de Syscom de una marca, categoría o búsqueda. '
+        'Las páginas del listado se leen conforme avanza la sincronización, '
+        'sin cargar la lista completa en memoria. Con --replay se usa un segmento '
+        'del archivo de respuestas en lugar de la API. Con --dry-run no se escribe '
+        'nada y se reporta qué cambiaría por modelo y campo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--marca', default='', help='Marca en Syscom (p. ej. hikvision)')
+        parser.add_argument('--categoria', default='', help='ID de categoría en Syscom')
+        parser.add_argument('--busqueda', default='', help='Texto de búsqueda')
+        parser.add_argument('--workers', type=int, default=None, help='Hilos de descarga')
+        parser.add_argument('--replay', default='', help='Segmento del archivo (nombre o ruta) a reprocesar sin red')
+        parser.add_argument('--forzar', action='store_true', help='Reescribir aunque los hashes no cambien')
+        parser.add_argument('--dry-run', action='store_true', help='Sólo comparar contra la BD, sin escribir')
+
+    def handle(self, *args, **options):
+        if options['replay']:
+            return self._replay(options)
+
+        params = filtros_syscom(options['busqueda'], options['marca'], options['categoria'])
+        if not params:
+            raise CommandError('Indique --marca, --categoria o --busqueda')
+
+        # Se lee la primera página para conocer el total; el resto se pide
+        # (una página adelantada) mientras se sincroniza.
+        paginas = paginas_syscom(params, prefetch=True)
+        primera = next(paginas, None)
+        if not primera or not primera['productos']:
+            self.stdout.write(self.style.WARNING('Syscom no devolvió productos para esos filtros'))
+            return
+
+        self.stdout.write(f"{primera['cantidad']} productos en {primera['paginas']} páginas")
+        progress = SyncProgress(total=primera['cantidad'])
+        ids = ids_de_paginas(chain([primera], paginas))
+        exitosos, errores = sincronizar_productos_background(
+            ids, progress, workers=options['workers'], forzar=options['forzar'], dry_run=options['dry_run']
+        )
+        self._resumen(progress, exitosos, errores)
+
+    def _replay(self, options):
+        try:
+            segmento = resolver_segmento(options['replay'])
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+
+        progress = SyncProgress(total=contar_registros(segmento))
+        self.stdout.write(f'Reprocesando {progress.total} respuestas de {segmento.name}')
+        exitosos, errores = sincronizar_productos_background(
+            None, progress, replay=segmento, forzar=options['forzar'], dry_run=options['dry_run']
+        )
+        self._resumen(progress, exitosos, errores)
+
+    def _resumen(self, progress, exitosos, errores):
+        resumen = progress.snapshot()
+        self.stdout.write(
+            f"{progress.processed} procesados · {resumen['items_per_sec']} prod/s · "
+            f"etapas {resumen['stages']}"
+        )
+        if errores:
+            self.stdout.write(self.style.WARNING(f'{errores} productos con error'))
+        if 'diff' not in progress.extra:
+            self.stdout.write(self.style.SUCCESS(f'{exitosos} productos sincronizados'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'{exitosos} productos comparados (dry-run, sin escribir)'))
+        diff = progress.extra['diff']
+        if not diff:
+            self.stdout.write('Sin cambios')
+        for modelo, campos in diff.items():
+            detalle = ', '.join(f'{campo}: {n}' for campo, n in campos.items())
+            self.stdout.write(f'  {modelo:<16} {detalle}')
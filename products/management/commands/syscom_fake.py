@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.syscom_fake import ConfigFalsa, SyscomFakeServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Levanta un servidor local que imita la API de Syscom (token, productos, '
+        'tipo de cambio) para pruebas de carga. Apunte SYSCOM_BASE_URL a la URL que imprime.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latencia', type=float, default=0.05, help='Segundos por respuesta')
+        parser.add_argument('--errores', type=float, default=0.0, help='Fracción de respuestas 503/429')
+        parser.add_argument('--token-ttl', type=int, default=3600, help='Vida del token en segundos')
+        parser.add_argument('--productos', type=int, default=10_000, help='Tamaño del catálogo sintético')
+
+    def handle(self, *args, **options):
+        config = ConfigFalsa(
+            latencia=options['latencia'],
+            errores=options['errores'],
+            token_ttl=options['token_ttl'],
+            productos=options['productos'],
+        )
+        server = SyscomFakeServer((options['host'], options['port']), config)
+        self.stdout.write(self.style.SUCCESS(f'Syscom falso escuchando en {server.base_url} (Ctrl+C para salir)'))
+        self.stdout.write(f'IDs de producto: {config.id_inicial} a {config.id_inicial + config.productos - 1}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from core.precios import recalcular_precios_mxn
 from products.models import Price
 from users.models import CustomUser
 
@@ -8,4 +9,5 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         Price.objects.update(margen_prod=0.20, descuento_prod=0.0)
         CustomUser.objects.update(descuento_cliente=0.0)
+        recalcular_precios_mxn()
         self.stdout.write(self.style.SUCCESS('Defaults updated successfully.')) 
\ No newline at end of file
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='sync_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Hash de Sincronización'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sync_hashes',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Hashes por Sección'),
+        ),
+    ]
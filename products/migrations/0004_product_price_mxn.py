@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def calcular_price_mxn(apps, schema_editor):
+    # Misma fórmula que core.utils.calculate_mxn_price (sin usuario)
+    ExchangeRate = apps.get_model('products', 'ExchangeRate')
+    Price = apps.get_model('products', 'Price')
+    Product = apps.get_model('products', 'Product')
+
+    tipo = ExchangeRate.objects.order_by('-created_at').values_list('rate', flat=True).first()
+    if tipo is None:
+        return
+    productos = []
+    for price in Price.objects.exclude(discount=0).exclude(discount__isnull=True).iterator():
+        base = price.discount * Decimal(tipo)
+        base *= Decimal(1 + price.margen_prod)
+        base *= Decimal(1 - price.descuento_prod)
+        base *= Decimal(1 + settings.IVA)
+        productos.append(Product(pk=price.product_id, price_mxn=base.quantize(Decimal('0.01'))))
+    Product.objects.bulk_update(productos, ['price_mxn'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_sync_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='price_mxn',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True, verbose_name='Precio MXN'),
+        ),
+        migrations.RunPython(calcular_price_mxn, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_price_mxn'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Día')),
+                ('discount_min', models.DecimalField(decimal_places=2, max_digits=12, null=True, verbose_name='Mínimo')),
+                ('discount_max', models.DecimalField(decimal_places=2, max_digits=12, null=True, verbose_name='Máximo')),
+                ('discount_close', models.DecimalField(decimal_places=2, max_digits=12, null=True, verbose_name='Cierre')),
+                ('list_price_close', models.DecimalField(decimal_places=2, max_digits=12, null=True, verbose_name='Lista al cierre')),
+                ('changes', models.PositiveIntegerField(default=0, verbose_name='Cambios')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_daily', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Precio Diario',
+                'verbose_name_plural': 'Precios Diarios',
+                'indexes': [models.Index(fields=['day', 'product'], name='products_pr_day_fddf5d_idx')],
+                'unique_together': {('product', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha/Hora')),
+                ('discount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Precio con Descuento')),
+                ('list_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Precio de Lista')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Historial de Precio',
+                'verbose_name_plural': 'Historial de Precios',
+                'indexes': [models.Index(fields=['product', 'recorded_at'], name='products_pr_product_045f8f_idx'), models.Index(fields=['recorded_at'], name='products_pr_recorde_b1d7b3_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Día')),
+                ('quantity_min', models.PositiveIntegerField(default=0, verbose_name='Mínimo')),
+                ('quantity_max', models.PositiveIntegerField(default=0, verbose_name='Máximo')),
+                ('quantity_close', models.PositiveIntegerField(default=0, verbose_name='Cierre')),
+                ('changes', models.PositiveIntegerField(default=0, verbose_name='Cambios')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.branch', verbose_name='Sucursal')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_daily', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Existencia Diaria',
+                'verbose_name_plural': 'Existencias Diarias',
+                'indexes': [models.Index(fields=['day', 'product'], name='products_st_day_e84142_idx')],
+                'unique_together': {('product', 'branch', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StockHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha/Hora')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='Cantidad')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.branch', verbose_name='Sucursal')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_history', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Historial de Existencia',
+                'verbose_name_plural': 'Historial de Existencias',
+                'indexes': [models.Index(fields=['product', 'recorded_at'], name='products_st_product_31f076_idx'), models.Index(fields=['recorded_at'], name='products_st_recorde_fa0551_idx')],
+            },
+        ),
+    ]
@@ -245,7 +245,32 @@ class Product(models.Model):
         blank=True, 
         verbose_name=_("Última Sincronización")
     )
+    # Hash del payload normalizado de Syscom (global y por sección)
+    sync_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name=_("Hash de Sincronización")
+    )
+    sync_hashes = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_("Hashes por Sección")
+    )
     
+    # Precio base en MXN (con IVA, sin descuento de cliente); lo mantiene
+    # core.precios para ordenar y filtrar por precio en SQL
+    price_mxn = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name=_("Precio MXN")
+    )
+
     # Visibilidad
     visible = models.BooleanField(default=True, verbose_name=_("Visible al Público"))
 
@@ -255,6 +280,8 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['syscom_id']),
             models.Index(fields=['model']),
+            # Orden por defecto del catálogo (paginación por cursor sin filesort)
+            models.Index(fields=['title', 'id']),
         ]
         ordering = ['title']
 
@@ -658,4 +685,127 @@ class ChangeLog(models.Model):
     def __str__(self) -> str:
         return f"{self.get_action_display()} en {self.field} - {self.timestamp:%Y-%m-%d %H:%M}"
     
-    
\ No newline at end of file
+    
+
+# ------------------------------------------------------------------
+# Series de precio y existencias (sólo se agrega una fila cuando el
+# valor cambia; las gráficas leen los resúmenes diarios)
+# ------------------------------------------------------------------
+class PriceHistory(models.Model):
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='price_history',
+        verbose_name=_("Producto")
+    )
+    recorded_at = models.DateTimeField(default=timezone.now, verbose_name=_("Fecha/Hora"))
+    discount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name=_("Precio con Descuento")
+    )
+    list_price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name=_("Precio de Lista")
+    )
+
+    class Meta:
+        verbose_name = _("Historial de Precio")
+        verbose_name_plural = _("Historial de Precios")
+        indexes = [
+            models.Index(fields=['product', 'recorded_at']),
+            models.Index(fields=['recorded_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.discount} ({self.recorded_at:%Y-%m-%d %H:%M})"
+
+
+class StockHistory(models.Model):
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='stock_history',
+        verbose_name=_("Producto")
+    )
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.CASCADE,
+        verbose_name=_("Sucursal")
+    )
+    recorded_at = models.DateTimeField(default=timezone.now, verbose_name=_("Fecha/Hora"))
+    quantity = models.PositiveIntegerField(default=0, verbose_name=_("Cantidad"))
+
+    class Meta:
+        verbose_name = _("Historial de Existencia")
+        verbose_name_plural = _("Historial de Existencias")
+        indexes = [
+            models.Index(fields=['product', 'recorded_at']),
+            models.Index(fields=['recorded_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id}@{self.branch_id}: {self.quantity} ({self.recorded_at:%Y-%m-%d %H:%M})"
+
+
+class PriceDaily(models.Model):
+    """Resumen diario de `PriceHistory` (sólo días con cambios)."""
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='price_daily',
+        verbose_name=_("Producto")
+    )
+    day = models.DateField(verbose_name=_("Día"))
+    discount_min = models.DecimalField(max_digits=12, decimal_places=2, null=True, verbose_name=_("Mínimo"))
+    discount_max = models.DecimalField(max_digits=12, decimal_places=2, null=True, verbose_name=_("Máximo"))
+    discount_close = models.DecimalField(max_digits=12, decimal_places=2, null=True, verbose_name=_("Cierre"))
+    list_price_close = models.DecimalField(max_digits=12, decimal_places=2, null=True, verbose_name=_("Lista al cierre"))
+    changes = models.PositiveIntegerField(default=0, verbose_name=_("Cambios"))
+
+    class Meta:
+        verbose_name = _("Precio Diario")
+        verbose_name_plural = _("Precios Diarios")
+        unique_together = ('product', 'day')
+        indexes = [
+            models.Index(fields=['day', 'product']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} {self.day}: {self.discount_close}"
+
+
+class StockDaily(models.Model):
+    """Resumen diario de `StockHistory` por sucursal (sólo días con cambios)."""
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='stock_daily',
+        verbose_name=_("Producto")
+    )
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.CASCADE,
+        verbose_name=_("Sucursal")
+    )
+    day = models.DateField(verbose_name=_("Día"))
+    quantity_min = models.PositiveIntegerField(default=0, verbose_name=_("Mínimo"))
+    quantity_max = models.PositiveIntegerField(default=0, verbose_name=_("Máximo"))
+    quantity_close = models.PositiveIntegerField(default=0, verbose_name=_("Cierre"))
+    changes = models.PositiveIntegerField(default=0, verbose_name=_("Cambios"))
+
+    class Meta:
+        verbose_name = _("Existencia Diaria")
+        verbose_name_plural = _("Existencias Diarias")
+        unique_together = ('product', 'branch', 'day')
+        indexes = [
+            models.Index(fields=['day', 'product']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id}@{self.branch_id} {self.day}: {self.quantity_close}"
@@ -0,0 +1,53 @@
+# file: products/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalogo.facetas import invalidar_catalogo
+from core.precios import recalcular_precios_mxn
+from core.tipo_cambio import invalidar_tipo_cambio, tipo_cambio_actual, tipo_cambio_cambiado
+from products.models import Brand, Category, ExchangeRate, Price, Product, ProductCategory
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def exchange_rate_changed(sender, **kwargs):
+    """Un tipo de cambio nuevo (o borrado) invalida la caché de precios."""
+    invalidar_tipo_cambio()
+    # Al confirmar: otra vez (una lectura concurrente pudo cachear el valor
+    # previo) y avisar a quien tenga datos calculados con el tipo de cambio
+    transaction.on_commit(_publicar_tipo_cambio)
+
+
+def _publicar_tipo_cambio():
+    invalidar_tipo_cambio()
+    if ExchangeRate.objects.exists():
+        tipo_cambio_cambiado.send(sender=ExchangeRate, rate=tipo_cambio_actual())
+
+
+@receiver(tipo_cambio_cambiado)
+def recalcular_catalogo(sender, **kwargs):
+    # Todo el catálogo: en el worker, no en la petición que guardó el tipo de cambio
+    from dashboard.tasks import recalcular_precios_catalogo
+
+    recalcular_precios_catalogo.delay()
+
+
+@receiver(post_save, sender=Price)
+def price_saved(sender, instance, **kwargs):
+    recalcular_precios_mxn([instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def catalogo_cambiado(sender, **kwargs):
+    """Ediciones desde el admin: facetas, totales y listas del catálogo se recalculan."""
+    invalidar_catalogo()
+    # Al confirmar: otra vez, por si una lectura concurrente cacheó lo anterior
+    transaction.on_commit(invalidar_catalogo)